@@ -0,0 +1,255 @@
+import json
+import sys
+import os
+import random
+import argparse
+from statistics import NormalDist
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.run_eval import run_prepared, aggregate_results
+from function_calling.prepared import prepare_category
+from function_calling.records import EvalRecord, INFRA_ERROR_TYPES
+from function_calling.faults import SampleFailure, DeadLetterFile, run_jobs_isolated
+from function_calling.fc_utils import CATEGORIES
+
+INTERVAL_METHODS = ("wilson", "bayes")
+
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion
+    """
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def bayes_interval(successes: int, n: int, confidence: float = 0.95, prior: Tuple[float, float] = (1.0, 1.0), draws: int = 20000) -> Tuple[float, float]:
+    """
+    Equal-tailed credible interval of the Beta posterior over accuracy
+
+    The quantiles are estimated from posterior draws with a fixed seed, so the
+    interval is reproducible.
+    """
+    rng = np.random.default_rng(0)
+    samples = rng.beta(prior[0] + successes, prior[1] + n - successes, size=draws)
+    low, high = np.quantile(samples, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return float(low), float(high)
+
+
+def confidence_interval(successes: int, n: int, confidence: float = 0.95, method: str = "wilson") -> Tuple[float, float]:
+    if method == "wilson":
+        return wilson_interval(successes, n, confidence)
+    elif method == "bayes":
+        return bayes_interval(successes, n, confidence)
+    raise ValueError(f"Invalid interval method: {method}")
+
+
+def stratified_order(samples_by_category: Dict[str, List[Any]], seed: int = 0) -> Dict[str, List[Any]]:
+    """
+    Shuffle each category's samples with a fixed seed
+
+    Drawing prefixes of these lists keeps every category represented in
+    proportion while the order within a category is random.
+    """
+    rng = random.Random(seed)
+    shuffled = {}
+    for category, samples in samples_by_category.items():
+        samples = list(samples)
+        rng.shuffle(samples)
+        shuffled[category] = samples
+    return shuffled
+
+
+def stop_reason(interval: Tuple[float, float], n: int, total: int, target_width: float, baseline: float = None, min_samples: int = 10) -> str:
+    """
+    Decide whether a category can stop sampling
+
+    Returns:
+        "exhausted", "narrow", "above_baseline", "below_baseline", or None to keep going
+    """
+    if n >= total:
+        return "exhausted"
+    if n < min_samples:
+        return None
+    if baseline is not None:
+        if interval[0] > baseline:
+            return "above_baseline"
+        if interval[1] < baseline:
+            return "below_baseline"
+    if interval[1] - interval[0] <= target_width:
+        return "narrow"
+    return None
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    """
+    Read baseline accuracies from a JSON file
+
+    Accepts either {"simple": 0.8, ...} or a saved report whose categories hold an "accuracy" field.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    return {
+        category: value["accuracy"] if isinstance(value, dict) else value
+        for category, value in data.items()
+        if category in CATEGORIES
+    }
+
+
+def run_adaptive_evaluation(
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        mode: str = "text",
+        template: str = "full",
+        concurrency: int = 1,
+        target_width: float = 0.1,
+        confidence: float = 0.95,
+        method: str = "wilson",
+        baseline: Dict[str, float] = None,
+        min_samples: int = 10,
+        seed: int = 0,
+        max_attempts: int = 3,
+        retry_queue_size: int = 100,
+        retry_backoff: float = 1.0,
+        dead_letter_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate categories in randomized, stratified order and stop each one early once its accuracy is pinned down
+
+    Samples are drawn in rounds of concurrency per active category. After each
+    round every category's confidence interval is updated, and a category stops
+    when the interval is at most target_width wide or lies entirely above or
+    below the baseline accuracy for that category.
+
+    Args:
+        test_categories: Categories to evaluate
+        data_dir: Directory holding FC-samples/ and FC-answers/
+        api_client: Optional client to use instead of the shared one
+        mode: "text" or "native" function calling
+        template: Text-mode system prompt template
+        concurrency: Requests in flight at once, also the round size per category
+        target_width: Stop once the interval is at most this wide
+        confidence: Confidence level of the interval
+        method: "wilson" (Wilson score) or "bayes" (Beta posterior credible interval)
+        baseline: Optional category -> accuracy of a previous run
+        min_samples: Never stop a category before this many samples
+        seed: Seed of the randomized order
+        max_attempts, retry_queue_size, retry_backoff, dead_letter_path: Fault isolation, as in run_evaluations;
+            samples given up on count as infra failures and stay out of the interval
+
+    Returns:
+        Category -> result dict with the interval, stop reason and API calls saved
+    """
+    baseline = baseline or {}
+    dead_letters = DeadLetterFile(dead_letter_path) if dead_letter_path else None
+    prepare_failures = {category: [] for category in test_categories}
+    samples_by_category = stratified_order({
+        category: prepare_category(category, data_dir, mode, template, failures=prepare_failures[category]) for category in test_categories
+    }, seed)
+    eval_results = {category: [] for category in test_categories}
+    reasons = {category: None for category in test_categories}
+    round_size = max(1, concurrency)
+
+    def run_sample(category, sample):
+        return run_prepared(sample, api_client, keep_content=False)
+
+    while any(reason is None for reason in reasons.values()):
+        jobs = []
+        for category in test_categories:
+            if reasons[category] is None:
+                drawn = len(eval_results[category])
+                jobs.extend((category, sample) for sample in samples_by_category[category][drawn:drawn + round_size])
+        outcomes = run_jobs_isolated(jobs, run_sample, concurrency, max_attempts, retry_queue_size, retry_backoff, dead_letters)
+        for (category, sample), eval_result in zip(jobs, outcomes):
+            if isinstance(eval_result, SampleFailure):
+                eval_result = EvalRecord(sample.id, False, eval_result.message, "infra_error")
+            eval_results[category].append(eval_result)
+
+        for category in test_categories:
+            if reasons[category] is not None:
+                continue
+            scored = [record for record in eval_results[category] if record.error_type not in INFRA_ERROR_TYPES]
+            successes = sum(1 for record in scored if record.is_valid)
+            interval = confidence_interval(successes, len(scored), confidence, method)
+            # Samples given up on leave the suite, so a category whose every sample was drawn is exhausted
+            scorable = len(samples_by_category[category]) - (len(eval_results[category]) - len(scored))
+            reasons[category] = stop_reason(interval, len(scored), scorable, target_width, baseline.get(category), min_samples)
+
+    report = {}
+    for category in test_categories:
+        drawn = len(eval_results[category])
+        for sample_id, failure in prepare_failures[category]:
+            if dead_letters is not None:
+                dead_letters.write(category, sample_id, failure)
+            eval_results[category].append(EvalRecord(sample_id, False, failure.message, "infra_error"))
+        result = {"category": category, "mode": mode, "template": template}
+        result.update(aggregate_results(eval_results[category]))
+        successes = result["total_count"] - result["error_count"]
+        interval = confidence_interval(successes, result["total_count"], confidence, method)
+        result["adaptive"] = {
+            "interval": interval,
+            "interval_method": method,
+            "confidence": confidence,
+            "stop_reason": reasons[category],
+            "baseline_accuracy": baseline.get(category),
+            "suite_size": len(samples_by_category[category]),
+            "api_calls_saved": len(samples_by_category[category]) - drawn
+        }
+        print(result)
+        report[category] = result
+
+    total_saved = sum(result["adaptive"]["api_calls_saved"] for result in report.values())
+    total_size = sum(result["adaptive"]["suite_size"] for result in report.values())
+    print(f"API calls saved: {total_saved}/{total_size}")
+    return report
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Sequential early-stopping evaluation with confidence intervals")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--target-width", type=float, default=0.1, help="Stop once the interval is at most this wide")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--method", default="wilson", choices=INTERVAL_METHODS)
+    parser.add_argument("--baseline", default=None, help="JSON file with the baseline accuracy per category")
+    parser.add_argument("--min-samples", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the report as JSON, usable as a later --baseline")
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+
+    api_client = StubClient.from_data_dir(args.data_dir, args.categories) if args.stub else None
+    report = run_adaptive_evaluation(
+        args.categories,
+        data_dir=args.data_dir,
+        api_client=api_client,
+        concurrency=args.concurrency,
+        target_width=args.target_width,
+        confidence=args.confidence,
+        method=args.method,
+        baseline=load_baseline(args.baseline) if args.baseline else None,
+        min_samples=args.min_samples,
+        seed=args.seed
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=float)
+
+
+if __name__ == "__main__":
+    main()
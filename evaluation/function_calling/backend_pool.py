@@ -0,0 +1,223 @@
+import json
+import sys
+import os
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from openai import OpenAI
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from function_calling.faults import is_transient
+
+# Weight of the newest observation in the error-rate and latency moving averages
+HEALTH_SMOOTHING = 0.2
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker
+
+    After failure_threshold consecutive failures the circuit opens and the backend
+    gets no traffic for cooldown seconds. Then a single trial request is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a request may go to the backend now; claims the trial slot when half-open."""
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+        return self.state != "open"
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+
+    def release(self):
+        """Give back the trial slot of a request that ended without a verdict on the backend's health."""
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class Backend:
+    """
+    One (base_url, key, model alias) endpoint with its breaker and health statistics
+    """
+
+    def __init__(self, name: str, api_client: Any, model: str = None, weight: float = 1.0, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.api_client = api_client
+        self.model = model
+        self.weight = weight
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self.requests = 0
+        self.failures = 0
+        self.error_rate = 0.0
+        self.latency = None
+
+    def record(self, latency: float = None, failed: bool = False):
+        self.requests += 1
+        self.error_rate += HEALTH_SMOOTHING * ((1.0 if failed else 0.0) - self.error_rate)
+        if failed:
+            self.failures += 1
+            self.breaker.record_failure()
+            return
+        self.breaker.record_success()
+        self.latency = latency if self.latency is None else self.latency + HEALTH_SMOOTHING * (latency - self.latency)
+
+
+class ServedResponse:
+    """
+    A backend's response together with the name of the backend that served it and the model it was asked for
+
+    Attribute access is forwarded to the response, so it scores like the response itself.
+    """
+
+    def __init__(self, response: Any, served_by: str, served_model: str = None):
+        self.response = response
+        self.served_by = served_by
+        self.served_model = served_model
+
+    def __getattr__(self, name):
+        if name == "response":
+            raise AttributeError(name)
+        return getattr(self.response, name)
+
+
+class BackendPool:
+    """
+    Client that spreads requests over several backends
+
+    Each request goes to a backend drawn at random with probability proportional
+    to its health score: the configured weight, scaled down by the backend's
+    recent error rate and by how much slower it is than the fastest backend.
+    Backends with an open circuit get no traffic. A request failing with a
+    transient error (faults.is_transient: network, 429, 5xx) counts against the
+    backend's breaker and fails over to the remaining backends before the error
+    is raised; any other error (a 400 for a malformed request, say) says nothing
+    about the backend and is raised at once. Responses are wrapped in
+    ServedResponse, whose served_by names the backend and served_model the model
+    alias sent to it. Only client.chat.completions.create is implemented.
+    """
+
+    def __init__(self, backends: List[Backend], seed: int = 0):
+        if not backends:
+            raise ValueError("A backend pool needs at least one backend")
+        self.backends = backends
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    @classmethod
+    def from_config(cls, backend_configs: List[Dict[str, Any]], seed: int = 0) -> "BackendPool":
+        """
+        Build a pool from entries like
+        {"name": "sf-1", "base_url": "https://api.siliconflow.cn/v1", "api_key": "...", "model": "Qwen/...", "weight": 2}
+
+        model defaults to MODEL_NAME, weight to 1, name to the entry's position;
+        failure_threshold and cooldown tune the circuit breaker.
+        """
+        backends = []
+        for index, backend_config in enumerate(backend_configs):
+            backends.append(Backend(
+                name=backend_config.get("name", f"backend-{index}"),
+                api_client=OpenAI(api_key=backend_config["api_key"], base_url=backend_config["base_url"]),
+                model=backend_config.get("model"),
+                weight=backend_config.get("weight", 1.0),
+                failure_threshold=backend_config.get("failure_threshold", 5),
+                cooldown=backend_config.get("cooldown", 30.0)
+            ))
+        return cls(backends, seed)
+
+    def health_score(self, backend: Backend) -> float:
+        latencies = [other.latency for other in self.backends if other.latency]
+        speed = min(latencies) / backend.latency if backend.latency and latencies else 1.0
+        # Never quite zero, so a recovering backend still sees some traffic
+        return backend.weight * max(1.0 - backend.error_rate, 0.01) * speed
+
+    def _choose(self, exclude: List[Backend]) -> Backend:
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend not in exclude]
+            while candidates:
+                backend = self._rng.choices(candidates, weights=[self.health_score(candidate) for candidate in candidates])[0]
+                if backend.breaker.allow():
+                    return backend
+                candidates.remove(backend)
+            return None
+
+    def create(self, **kwargs) -> ServedResponse:
+        tried = []
+        error = None
+        while True:
+            backend = self._choose(tried)
+            if backend is None:
+                raise error or RuntimeError("Every backend has an open circuit")
+            tried.append(backend)
+            request = dict(kwargs, model=backend.model) if backend.model else kwargs
+            start_time = time.time()
+            try:
+                response = backend.api_client.chat.completions.create(**request)
+            except Exception as e:
+                if not is_transient(e):
+                    with self._lock:
+                        backend.breaker.release()
+                    raise
+                with self._lock:
+                    backend.record(failed=True)
+                error = e
+                continue
+            with self._lock:
+                backend.record(time.time() - start_time)
+            return ServedResponse(response, backend.name, request.get("model"))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                backend.name: {
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "error_rate": backend.error_rate,
+                    "latency (seconds)": backend.latency,
+                    "circuit": backend.breaker.state,
+                    "health_score": self.health_score(backend)
+                }
+                for backend in self.backends
+            }
+
+
+def load_backend_pool(path: str = None, seed: int = 0) -> BackendPool:
+    """
+    Pool from a JSON file of backend entries, or from BACKENDS in config.py
+
+    Returns:
+        BackendPool, or None when neither is configured
+    """
+    if path is not None:
+        with open(path, "r") as f:
+            return BackendPool.from_config(json.load(f), seed)
+    backend_configs = getattr(config, "BACKENDS", None)
+    return BackendPool.from_config(backend_configs, seed) if backend_configs else None
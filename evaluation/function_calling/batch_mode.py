@@ -0,0 +1,251 @@
+import json
+import os
+import time
+import itertools
+import threading
+from types import SimpleNamespace
+from typing import List, Dict, Any, Tuple
+
+DEFAULT_BATCH_DIR = "../results/batches"
+DEFAULT_POLL_INTERVAL = 30.0
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def to_dict(obj: Any) -> Any:
+    """
+    Turn a response object (OpenAI model or SimpleNamespace) into plain JSON data
+    """
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, SimpleNamespace):
+        return {key: to_dict(value) for key, value in vars(obj).items()}
+    if isinstance(obj, dict):
+        return {key: to_dict(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_dict(value) for value in obj]
+    return obj
+
+
+def to_namespace(obj: Any) -> Any:
+    """
+    Turn a JSON response body back into an object with attribute access like the OpenAI response
+    """
+    if isinstance(obj, dict):
+        return SimpleNamespace(**{key: to_namespace(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return [to_namespace(value) for value in obj]
+    return obj
+
+
+def write_batch_file(path: str, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+    """
+    Serialize chat completion requests into a batch JSONL file
+
+    Args:
+        path: Output file path
+        requests: List of (custom_id, request body) pairs, bodies as built by build_request
+
+    Returns:
+        The path written
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for custom_id, body in requests:
+            line = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+            f.write(json.dumps(line) + "\n")
+    return path
+
+
+def submit_batch(api_client: Any, path: str, completion_window: str = "24h") -> Any:
+    """
+    Upload a batch file and create the batch job
+
+    Returns:
+        The batch object returned by the API
+    """
+    with open(path, "rb") as f:
+        input_file = api_client.files.create(file=f, purpose="batch")
+    return api_client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=completion_window
+    )
+
+
+def wait_for_batch(api_client: Any, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: float = None) -> Any:
+    """
+    Poll a batch until it reaches a terminal status
+
+    Raises:
+        TimeoutError: If timeout seconds pass before the batch finishes
+    """
+    start_time = time.time()
+    while True:
+        batch = api_client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        if timeout is not None and time.time() - start_time > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout} seconds")
+        time.sleep(poll_interval)
+
+
+def read_batch_output(api_client: Any, file_id: str) -> Dict[str, Any]:
+    """
+    Download a batch output (or error) file
+
+    Returns:
+        custom_id -> response object, or an error message string for failed requests
+    """
+    results = {}
+    for line in api_client.files.content(file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response")
+        if record.get("error"):
+            results[record["custom_id"]] = f"Batch request failed: {record['error']}"
+        elif response is None or response.get("status_code") != 200:
+            results[record["custom_id"]] = f"Batch request failed: {response}"
+        else:
+            results[record["custom_id"]] = to_namespace(response["body"])
+    return results
+
+
+def run_batch(
+        requests: List[Tuple[str, Dict[str, Any]]],
+        api_client: Any,
+        work_dir: str = DEFAULT_BATCH_DIR,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        timeout: float = None
+) -> Dict[str, Any]:
+    """
+    Write, submit and wait for one batch, then download its results
+
+    Args:
+        requests: List of (custom_id, request body) pairs
+        api_client: Client offering files and batches (the OpenAI client or a LocalBatchProcessor)
+        work_dir: Directory for the request file
+        poll_interval: Seconds between status checks
+        timeout: Optional limit on the wait in seconds
+
+    Returns:
+        custom_id -> response object, or an error message string for failed requests
+
+    Raises:
+        RuntimeError: If the batch ends without producing any output
+    """
+    path = write_batch_file(os.path.join(work_dir, f"batch_{int(time.time() * 1000)}.jsonl"), requests)
+    batch = submit_batch(api_client, path)
+    batch = wait_for_batch(api_client, batch.id, poll_interval, timeout)
+
+    results = {}
+    for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+        if file_id:
+            results.update(read_batch_output(api_client, file_id))
+    if not results and batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+    return results
+
+
+class LocalBatchProcessor:
+    """
+    Offline stand-in for a provider's batch endpoint
+
+    Wraps any chat client (e.g. a StubClient): uploaded batch files are replayed
+    request by request through client.chat.completions.create on a background
+    thread, and the results are exposed as an output file in the provider's
+    batch output format. Chat calls pass straight through, so it can be used as
+    a regular api_client too.
+    """
+
+    def __init__(self, chat_client: Any, processing_delay: float = 0.0):
+        self.chat_client = chat_client
+        self.chat = chat_client.chat
+        self.processing_delay = processing_delay
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self._stored_files = {}
+        self._batches = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _create_file(self, file: Any, purpose: str) -> Any:
+        content = file.read()
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        file_id = f"file-local-{next(self._ids)}"
+        with self._lock:
+            self._stored_files[file_id] = content
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(content))
+
+    def _file_content(self, file_id: str) -> Any:
+        with self._lock:
+            return SimpleNamespace(text=self._stored_files[file_id])
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str, **kwargs) -> Any:
+        batch_id = f"batch-local-{next(self._ids)}"
+        with self._lock:
+            self._batches[batch_id] = {
+                "status": "validating",
+                "input_file_id": input_file_id,
+                "output_file_id": None,
+                "error_file_id": None,
+                "total": 0,
+                "completed": 0,
+                "failed": 0,
+            }
+        threading.Thread(target=self._process, args=(batch_id,), daemon=True).start()
+        return self._retrieve_batch(batch_id)
+
+    def _retrieve_batch(self, batch_id: str) -> Any:
+        with self._lock:
+            state = dict(self._batches[batch_id])
+        return SimpleNamespace(
+            id=batch_id,
+            status=state["status"],
+            input_file_id=state["input_file_id"],
+            output_file_id=state["output_file_id"],
+            error_file_id=state["error_file_id"],
+            request_counts=SimpleNamespace(total=state["total"], completed=state["completed"], failed=state["failed"])
+        )
+
+    def _process(self, batch_id: str) -> None:
+        with self._lock:
+            state = self._batches[batch_id]
+            lines = [json.loads(line) for line in self._stored_files[state["input_file_id"]].splitlines() if line.strip()]
+            state["status"] = "in_progress"
+            state["total"] = len(lines)
+        if self.processing_delay:
+            time.sleep(self.processing_delay)
+
+        output_lines = []
+        error_lines = []
+        for i, line in enumerate(lines):
+            try:
+                response = self.chat_client.chat.completions.create(**line["body"])
+                output_lines.append({
+                    "id": f"batch_req_{i}",
+                    "custom_id": line["custom_id"],
+                    "response": {"status_code": 200, "request_id": f"req_{i}", "body": to_dict(response)},
+                    "error": None
+                })
+                counter = "completed"
+            except Exception as e:
+                error_lines.append({
+                    "id": f"batch_req_{i}",
+                    "custom_id": line["custom_id"],
+                    "response": None,
+                    "error": {"code": type(e).__name__, "message": str(e)}
+                })
+                counter = "failed"
+            with self._lock:
+                state[counter] += 1
+
+        with self._lock:
+            for key, records in (("output_file_id", output_lines), ("error_file_id", error_lines)):
+                if records:
+                    file_id = f"file-local-{next(self._ids)}"
+                    self._stored_files[file_id] = "\n".join(json.dumps(record) for record in records) + "\n"
+                    state[key] = file_id
+            state["status"] = "completed"
@@ -0,0 +1,262 @@
+import io
+import ast
+import json
+import sys
+import os
+import time
+import argparse
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List
+
+from openai import OpenAI
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import send_request, convert_message
+from function_calling.run_eval import run_evaluations, score_response
+from function_calling.prepared import prepare_category
+from function_calling.records import ResultColumns
+from function_calling.batch_mode import to_dict
+from function_calling.synthetic_data import StubClient, CATEGORIES, generate_samples, write_dataset
+from json_processing.ast_checker import ast_checker
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.3
+STAGES = ("prepare", "request", "parse", "check", "aggregate")
+# Stage slowdowns below this many baseline microseconds are timer noise on stages that take a few microseconds
+MIN_STAGE_DELTA_US = 5.0
+# A tool call rendered as the model writes it, parsed and round-tripped through JSON by the calibration loop
+CALIBRATION_CALL = '[get_weather(city=London, days=3, units=metric), convert_currency(amount=12.5, currency=EUR)]'
+CALIBRATION_ITERATIONS = 2000
+
+
+class LocalFakeServer:
+    """
+    Zero-latency chat completions endpoint on localhost, answered by a StubClient
+
+    The harness talks to it through a real OpenAI client, so request serialization,
+    HTTP and response parsing are all part of what is measured.
+    """
+
+    def __init__(self, stub: StubClient):
+        self.stub = stub
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like a provider endpoint; without TCP_NODELAY the separate header
+            # and body writes wait on delayed ACKs and every request takes about 40ms
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(handler):
+                body = json.loads(handler.rfile.read(int(handler.headers["Content-Length"])))
+                response = to_dict(stub.create(**body))
+                response.update({"object": "chat.completion", "created": int(time.time())})
+                payload = json.dumps(response).encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "application/json")
+                handler.send_header("Content-Length", str(len(payload)))
+                handler.end_headers()
+                handler.wfile.write(payload)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def client(self) -> OpenAI:
+        return OpenAI(api_key="local", base_url=self.base_url, max_retries=0)
+
+    def __enter__(self) -> "LocalFakeServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def calibrate(repeat: int = 3) -> float:
+    """
+    Microseconds per iteration of a fixed parse and JSON workload, the fastest of repeat runs
+
+    Benchmark timings are divided by it, so a baseline recorded on one machine
+    gates runs on a faster or slower one.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(CALIBRATION_ITERATIONS):
+            tree = ast.parse(CALIBRATION_CALL, mode="eval")
+            calls = [{call.func.id: {keyword.arg: ast.unparse(keyword.value) for keyword in call.keywords}} for call in tree.body.elts]
+            json.loads(json.dumps(calls))
+        elapsed = (time.perf_counter() - start) / CALIBRATION_ITERATIONS * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_stages(test_categories: List[str], data_dir: str, api_client: Any, mode: str = "text") -> Dict[str, float]:
+    """
+    Microseconds per sample spent in each stage of the pipeline, run one stage at a time
+
+    prepare is loading, prompt building and schema validation (prepare_category);
+    request is the client round trip to the fake backend; parse is convert_message;
+    check is ast_checker; aggregate is scoring into records and the columnar aggregate.
+    """
+    totals = dict.fromkeys(STAGES, 0.0)
+    sample_count = 0
+    for category in test_categories:
+        start = time.perf_counter()
+        samples = prepare_category(category, data_dir, mode)
+        totals["prepare"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        responses = [send_request(sample.request, api_client) for sample in samples]
+        totals["request"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        outputs = [convert_message(response.choices[0].message, mode) for response in responses]
+        totals["parse"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for sample, output in zip(samples, outputs):
+            # Only outputs that converted cleanly reach the checker, as in score_response
+            if (isinstance(output, dict) and "function_name" in output) or (isinstance(output, list) and not any(isinstance(call, dict) and "error" in call for call in output)):
+                ast_checker(sample.function_description, output, sample.possible_answer, category, sample.function_lookup)
+        totals["check"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        records = [
+            score_response(category, sample.function_description, sample.possible_answer, response, 0.0, mode,
+                           function_lookup=sample.function_lookup, keep_content=False)
+            for sample, response in zip(samples, responses)
+        ]
+        ResultColumns.from_records(records).aggregate()
+        totals["aggregate"] += time.perf_counter() - start
+        sample_count += len(samples)
+    return {stage: totals[stage] / sample_count * 1e6 if sample_count else 0.0 for stage in STAGES}
+
+
+def benchmark_suite(test_categories: List[str], data_dir: str, mode: str = "text", concurrency: int = 1, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Benchmark the full fc_score pipeline (run_evaluations) on one suite against a local zero-latency backend
+
+    Each measurement is repeated and the fastest run kept, which is the least disturbed
+    by other load on the machine. run_evaluations' own report is not printed.
+
+    Returns:
+        Dictionary with the sample count, the per-category accuracy, samples/sec of the
+        end-to-end run, the microseconds per sample of each stage and the calibration
+        loop's microseconds (see calibrate)
+    """
+    stub = StubClient.from_data_dir(data_dir, test_categories)
+    calibration_us = calibrate(repeat)
+    with LocalFakeServer(stub) as server:
+        api_client = server.client()
+        best_wall_time = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                results = run_evaluations(test_categories, data_dir=data_dir, api_client=api_client, mode=mode, concurrency=concurrency)
+            wall_time = time.perf_counter() - start
+            best_wall_time = wall_time if best_wall_time is None else min(best_wall_time, wall_time)
+        stage_runs = [time_stages(test_categories, data_dir, api_client, mode) for _ in range(repeat)]
+    sample_count = sum(results[category]["total_count"] for category in test_categories)
+    return {
+        "samples": sample_count,
+        "accuracy": {category: results[category]["accuracy"] for category in test_categories},
+        "samples_per_second": sample_count / best_wall_time,
+        "stage_us": {stage: min(run[stage] for run in stage_runs) for stage in STAGES},
+        "calibration_us": calibration_us
+    }
+
+
+def compare_to_baseline(report: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Regressions of a benchmark report against a baseline report
+
+    Accuracy must match exactly (the fake backend is deterministic). Timings are
+    compared in units of each report's own calibration loop, not in seconds, so the
+    gate follows the code rather than the host: samples/sec may drop and each stage
+    may slow down by at most tolerance (or MIN_STAGE_DELTA_US of the baseline).
+
+    Returns:
+        One message per regression, empty when the report passes
+    """
+    regressions = []
+    for suite, base in baseline.items():
+        if suite not in report:
+            continue
+        current = report[suite]
+        for category, accuracy in base["accuracy"].items():
+            if current["accuracy"].get(category) != accuracy:
+                regressions.append(f"{suite}: {category} accuracy {current['accuracy'].get(category)} != baseline {accuracy}")
+        # Expressed at the baseline's calibration speed
+        speed = current["calibration_us"] / base["calibration_us"]
+        samples_per_second = current["samples_per_second"] * speed
+        if samples_per_second < base["samples_per_second"] * (1 - tolerance):
+            regressions.append(f"{suite}: {samples_per_second:.1f} samples/sec calibrated, baseline {base['samples_per_second']:.1f}")
+        for stage, micros in base["stage_us"].items():
+            stage_us = current["stage_us"][stage] / speed
+            if stage_us > max(micros * (1 + tolerance), micros + MIN_STAGE_DELTA_US):
+                regressions.append(f"{suite}: {stage} {stage_us:.1f} µs/sample calibrated, baseline {micros:.1f}")
+    return regressions
+
+
+def run_benchmark(data_dir: str = "..", synthetic_size: int = 300, mode: str = "text", concurrency: int = 1, repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark the bundled suite and a synthetic suite of synthetic_size samples per category
+    """
+    report = {"bundled": benchmark_suite(list(CATEGORIES), data_dir, mode, concurrency, repeat)}
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        for category in CATEGORIES:
+            samples, answers = generate_samples(category, synthetic_size, seed=0)
+            write_dataset(synthetic_dir, category, samples, answers)
+        report["synthetic"] = benchmark_suite(list(CATEGORIES), synthetic_dir, mode, concurrency, repeat)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the harness with a regression gate")
+    parser.add_argument("--data-dir", default="..", help="Directory holding the bundled FC-samples/ and FC-answers/")
+    parser.add_argument("--synthetic-size", type=int, default=300, help="Synthetic samples per category")
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the fastest is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's report as the new baseline")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.data_dir, args.synthetic_size, args.mode, args.concurrency, args.repeat)
+    for suite, result in report.items():
+        stages = ", ".join(f"{stage} {micros:.1f} µs" for stage, micros in result["stage_us"].items())
+        print(f"{suite}: {result['samples']} samples, {result['samples_per_second']:.1f} samples/sec; per sample: {stages}; calibration {result['calibration_us']:.1f} µs")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline, "r") as f:
+        regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import sys
+import os
+import argparse
+from typing import Dict, Any, List
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.run_eval import run_evaluation, run_evaluations
+from function_calling.scheduler import ORDERING_POLICIES
+from function_calling.fc_utils import CATEGORIES, PROMPT_TEMPLATES
+
+COMPARED_METRICS = ["accuracy", "input_tokens", "output_tokens", "total_tokens", "input_tokens_per_sample", "cost", "average_latency"]
+
+# Prices per million tokens; only their ratio matters for comparing variants
+DEFAULT_INPUT_PRICE = 1.0
+DEFAULT_OUTPUT_PRICE = 1.0
+
+
+def summarize_result(result: Dict[str, Any], input_price: float = DEFAULT_INPUT_PRICE, output_price: float = DEFAULT_OUTPUT_PRICE) -> Dict[str, Any]:
+    """
+    Reduce a run_evaluation result to the metrics compared between variants
+
+    Args:
+        result: run_evaluation result
+        input_price: Price per million prompt tokens
+        output_price: Price per million completion tokens
+    """
+    input_tokens = result["token_usage"]["total_input_tokens"]
+    output_tokens = result["token_usage"]["total_output_tokens"]
+    return {
+        "total_count": result["total_count"],
+        "accuracy": result["accuracy"],
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": result["token_usage"]["total_tokens"],
+        "input_tokens_per_sample": input_tokens / result["total_count"] if result["total_count"] > 0 else 0,
+        "cost": (input_tokens * input_price + output_tokens * output_price) / 1_000_000,
+        "average_latency": result["average_time_taken_per_call (seconds)"],
+    }
+
+
+def compare_variants(
+        variants: Dict[str, Dict[str, Any]],
+        baseline: str,
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        input_price: float = DEFAULT_INPUT_PRICE,
+        output_price: float = DEFAULT_OUTPUT_PRICE
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every variant on the same samples and compute deltas against a baseline variant
+
+    Args:
+        variants: Variant name -> extra keyword arguments for run_evaluation
+        baseline: Name of the variant the others are compared to
+        test_categories: Categories to evaluate
+        data_dir: Directory holding FC-samples/ and FC-answers/
+        api_client: Optional client to use instead of the shared one
+        input_price: Price per million prompt tokens
+        output_price: Price per million completion tokens
+
+    Returns:
+        Category -> variant name -> summary, where each summary carries a "delta" dict
+    """
+    if baseline not in variants:
+        raise ValueError(f"Baseline variant {baseline} is not one of {list(variants)}")
+    report = {}
+    for category in test_categories:
+        summaries = {
+            name: summarize_result(run_evaluation(category, data_dir=data_dir, api_client=api_client, **kwargs), input_price, output_price)
+            for name, kwargs in variants.items()
+        }
+        for summary in summaries.values():
+            summary["delta"] = {metric: summary[metric] - summaries[baseline][metric] for metric in COMPARED_METRICS}
+        report[category] = summaries
+    return report
+
+
+def print_comparison(report: Dict[str, Dict[str, Any]], baseline: str) -> None:
+    """
+    Print one row per (category, variant) with deltas against the baseline
+    """
+    header = f"{'category':<10} {'variant':<10} {'accuracy':>9} {'input_tok':>10} {'output_tok':>11} {'cost':>10} {'latency_s':>10}   delta vs {baseline}"
+    print(header)
+    print("-" * len(header))
+    for category, summaries in report.items():
+        for name, summary in summaries.items():
+            delta = summary["delta"]
+            delta_text = "" if name == baseline else (
+                f"acc {delta['accuracy']:+.4f}, in {delta['input_tokens']:+d} "
+                f"({-delta['input_tokens_per_sample']:.1f} saved/sample), out {delta['output_tokens']:+d}, "
+                f"cost {delta['cost']:+.6f}, latency {delta['average_latency']:+.4f}s"
+            )
+            print(f"{category:<10} {name:<10} {summary['accuracy']:>9.4f} {summary['input_tokens']:>10} "
+                  f"{summary['output_tokens']:>11} {summary['cost']:>10.6f} {summary['average_latency']:>10.4f}   {delta_text}")
+
+
+def compare_modes(test_categories: List[str] = CATEGORIES, data_dir: str = "..", api_client: Any = None, **prices) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare text-mode function calling against native tools= / tool_calls mode on the same samples
+    """
+    variants = {"text": {"mode": "text"}, "native": {"mode": "native"}}
+    report = compare_variants(variants, "text", test_categories, data_dir, api_client, **prices)
+    print_comparison(report, "text")
+    return report
+
+
+def compare_templates(
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        templates: List[str] = None,
+        **prices
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare text-mode prompt templates against the full template on the same samples
+
+    The report shows prompt tokens saved per sample, the cost delta and the accuracy
+    delta per category, so the cheapest template that holds accuracy can be picked.
+    """
+    templates = templates or list(PROMPT_TEMPLATES)
+    variants = {"full": {"template": "full"}}
+    variants.update({template: {"template": template} for template in templates})
+    report = compare_variants(variants, "full", test_categories, data_dir, api_client, **prices)
+    print_comparison(report, "full")
+    return report
+
+
+def cheapest_template(report: Dict[str, Dict[str, Any]], tolerance: float = 0.0) -> str:
+    """
+    Pick the cheapest template whose accuracy is within tolerance of the full template in every category
+    """
+    candidates = []
+    for template in next(iter(report.values())):
+        holds = all(summaries[template]["delta"]["accuracy"] >= -tolerance for summaries in report.values())
+        if holds:
+            candidates.append((sum(summaries[template]["cost"] for summaries in report.values()), template))
+    return min(candidates)[1]
+
+
+def compare_orderings(
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        concurrency: int = 8,
+        policies: List[str] = ("fifo", "longest_first")
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the makespan of job ordering policies on the same suite and pool size
+
+    Each policy runs every category in one overlapped run; the makespan is the
+    time until the last category finished. The first policy is the baseline.
+
+    Returns:
+        Policy -> {"makespan", "accuracy", "makespan_delta"}
+    """
+    report = {}
+    for policy in policies:
+        results = run_evaluations(test_categories, data_dir=data_dir, api_client=api_client, concurrency=concurrency, ordering=policy)
+        report[policy] = {
+            "makespan": max(result["wall_time (seconds)"] for result in results.values()),
+            "accuracy": sum(result["accuracy"] for result in results.values()) / len(results),
+        }
+    baseline = policies[0]
+    print(f"{'ordering':<14} {'makespan_s':>11} {'accuracy':>9}   delta vs {baseline}")
+    for policy, summary in report.items():
+        summary["makespan_delta"] = summary["makespan"] - report[baseline]["makespan"]
+        change = summary["makespan_delta"] / report[baseline]["makespan"] if report[baseline]["makespan"] else 0
+        delta_text = "" if policy == baseline else f"makespan {summary['makespan_delta']:+.3f}s ({change:+.1%})"
+        print(f"{policy:<14} {summary['makespan']:>11.3f} {summary['accuracy']:>9.4f}   {delta_text}")
+    return report
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Compare evaluation variants on the same samples")
+    parser.add_argument("comparison", choices=["modes", "templates", "orderings"])
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    parser.add_argument("--templates", nargs="+", default=None, choices=list(PROMPT_TEMPLATES))
+    parser.add_argument("--input-price", type=float, default=DEFAULT_INPUT_PRICE, help="Price per million prompt tokens")
+    parser.add_argument("--output-price", type=float, default=DEFAULT_OUTPUT_PRICE, help="Price per million completion tokens")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Accuracy drop allowed when picking the cheapest template")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pool size for the orderings comparison")
+    parser.add_argument("--policies", nargs="+", default=["fifo", "longest_first"], choices=ORDERING_POLICIES)
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="StubClient fixed seconds per request")
+    parser.add_argument("--stub-output-token-latency", type=float, default=0.0, help="StubClient seconds per completion token")
+    parser.add_argument("--stub-prompt-token-latency", type=float, default=0.0, help="StubClient seconds per prompt token")
+    args = parser.parse_args()
+
+    api_client = None
+    if args.stub:
+        api_client = StubClient.from_data_dir(
+            args.data_dir,
+            args.categories,
+            latency=args.stub_latency,
+            prompt_token_latency=args.stub_prompt_token_latency,
+            output_token_latency=args.stub_output_token_latency
+        )
+    prices = {"input_price": args.input_price, "output_price": args.output_price}
+    if args.comparison == "modes":
+        compare_modes(args.categories, args.data_dir, api_client, **prices)
+    elif args.comparison == "templates":
+        report = compare_templates(args.categories, args.data_dir, api_client, args.templates, **prices)
+        print(f"Cheapest template holding accuracy: {cheapest_template(report, args.tolerance)}")
+    elif args.comparison == "orderings":
+        compare_orderings(args.categories, args.data_dir, api_client, args.concurrency, args.policies)
+
+
+if __name__ == "__main__":
+    main()
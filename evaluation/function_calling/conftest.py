@@ -0,0 +1,58 @@
+"""
+Shared setup of the offline tests: the import path and synthetic suites answered by StubClient
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add parent directory to Python path, once for every test module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.synthetic_data import generate_samples, write_dataset, StubClient
+from function_calling.run_eval import run_evaluation
+
+# StubClient ratios under which every completion is the ground truth
+PERFECT = {"correct_ratio": 1.0, "near_miss_ratio": 0.0, "malformed_ratio": 0.0}
+
+
+class Suite:
+    """
+    One synthetic category written to a test's data directory
+    """
+
+    def __init__(self, data_dir: str, category: str, samples: list, answers: list):
+        self.data_dir = data_dir
+        self.category = category
+        self.samples = samples
+        self.answers = answers
+
+    def write(self):
+        """Write the samples and answers again, after a test edited them."""
+        write_dataset(self.data_dir, self.category, self.samples, self.answers)
+
+    def stub(self, **kwargs) -> StubClient:
+        """A StubClient answering this suite, with the default outcome ratios unless given."""
+        return StubClient(self.samples, self.answers, **kwargs)
+
+    def perfect_stub(self, **kwargs) -> StubClient:
+        """A StubClient answering every sample of this suite with its ground truth."""
+        return StubClient(self.samples, self.answers, **dict(PERFECT, **kwargs))
+
+    def run(self, api_client=None, **eval_kwargs) -> dict:
+        """run_evaluation of this suite, with a default stub unless api_client is given."""
+        return run_evaluation(self.category, data_dir=self.data_dir, api_client=api_client or self.stub(), **eval_kwargs)
+
+
+@pytest.fixture
+def make_suite(tmp_path):
+    """
+    Factory of synthetic suites in tmp_path: make_suite(category, count, seed, **generate_samples options)
+    """
+    def make(category: str, count: int, seed: int = 0, **kwargs) -> Suite:
+        samples, answers = generate_samples(category, count, seed=seed, **kwargs)
+        suite = Suite(str(tmp_path), category, samples, answers)
+        suite.write()
+        return suite
+    return make
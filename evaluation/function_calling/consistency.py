@@ -0,0 +1,185 @@
+import json
+import sys
+import os
+import time
+import argparse
+from collections import Counter
+from typing import Any, Dict, List
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import CATEGORIES, send_request, convert_message
+from function_calling.run_eval import score_response
+from function_calling.prepared import prepare_category
+from function_calling.faults import SampleFailure, DeadLetterFile, run_jobs_isolated
+from json_processing.parse_output import parse_query_response_FC
+
+
+def canonical_output(converted_output: Any) -> str:
+    """
+    Serialize a converted output so that equivalent answers compare equal
+
+    Keys are sorted, and for several calls the order of the calls is ignored.
+    """
+    if isinstance(converted_output, list):
+        return json.dumps(sorted(json.dumps(call, sort_keys=True) for call in converted_output))
+    return json.dumps(converted_output, sort_keys=True)
+
+
+def consistency_runner(sample, k=5, temperature=0.7, api_client=None):
+    """
+    Sample k choices for one prepared sample in a single request and score every choice
+
+    Returns:
+        Dictionary with the validity of each choice, whether the majority answer is
+        valid, the share of choices agreeing with the majority, and the token usage
+        of the one request
+    """
+    request = dict(sample.request, temperature=temperature)
+    if k != 1:
+        request["n"] = k
+    start_time = time.time()
+    full_response = send_request(request, api_client)
+    time_taken = time.time() - start_time
+
+    choice_results = []
+    answers = []
+    for choice_index in range(len(full_response.choices)):
+        record = score_response(sample.category, sample.function_description, sample.possible_answer, full_response, time_taken, sample.mode, choice_index, sample.function_lookup, keep_content=False)
+        choice_results.append(record.is_valid)
+        answers.append(canonical_output(convert_message(full_response.choices[choice_index].message, sample.mode)))
+
+    # Ties go to the answer seen first
+    majority_answer, majority_count = Counter(answers).most_common(1)[0]
+    token_info = parse_query_response_FC(full_response)
+    return {
+        "choice_results": choice_results,
+        "majority_valid": choice_results[answers.index(majority_answer)],
+        "agreement": majority_count / len(answers),
+        "token_usage": {
+            "input_tokens": token_info["input_token"],
+            "output_tokens": token_info["output_token"],
+            "total_tokens": token_info["input_token"] + token_info["output_token"]
+        },
+        "time_taken": time_taken
+    }
+
+
+def aggregate_consistency(consistency_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize the per-sample consistency results of a category
+
+    pass@1 is the share of valid choices, pass@k the share of samples with at least
+    one valid choice, majority_accuracy the share whose majority answer is valid and
+    agreement_rate the mean share of choices agreeing with the majority.
+    """
+    total_count = len(consistency_results)
+    choice_count = sum(len(result["choice_results"]) for result in consistency_results)
+    input_tokens = sum(result["token_usage"]["input_tokens"] for result in consistency_results)
+    output_tokens = sum(result["token_usage"]["output_tokens"] for result in consistency_results)
+    return {
+        "total_count": total_count,
+        "pass@1": sum(sum(result["choice_results"]) for result in consistency_results) / choice_count if choice_count else 0,
+        "pass@k": sum(1 for result in consistency_results if any(result["choice_results"])) / total_count if total_count else 0,
+        "majority_accuracy": sum(1 for result in consistency_results if result["majority_valid"]) / total_count if total_count else 0,
+        "agreement_rate": sum(result["agreement"] for result in consistency_results) / total_count if total_count else 0,
+        "total_input_tokens": input_tokens,
+        "total_output_tokens": output_tokens,
+        "average_time_taken_per_call (seconds)": sum(result["time_taken"] for result in consistency_results) / total_count if total_count else 0
+    }
+
+
+def run_consistency_evaluation(
+        test_categories: List[str] = CATEGORIES,
+        k: int = 5,
+        temperature: float = 0.7,
+        data_dir: str = "..",
+        api_client: Any = None,
+        mode: str = "text",
+        template: str = "full",
+        concurrency: int = 1,
+        max_attempts: int = 3,
+        retry_queue_size: int = 100,
+        retry_backoff: float = 1.0,
+        dead_letter_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate sampling stability with k choices per sample from a single request each
+
+    Asking for n=k choices bills the prompt tokens once per sample instead of k times.
+
+    Args:
+        test_categories: Categories to evaluate
+        k: Choices sampled per request
+        temperature: Sampling temperature, must be above 0 for the choices to differ
+        data_dir: Directory holding FC-samples/ and FC-answers/
+        api_client: Optional client to use instead of the shared one
+        mode: "text" or "native" function calling
+        template: Text-mode system prompt template
+        concurrency: Requests in flight at once
+        max_attempts, retry_queue_size, retry_backoff, dead_letter_path: Fault isolation, as in run_evaluations;
+            samples given up on are counted in infra_failure_count and left out of the rates
+
+    Returns:
+        Category -> result dict with pass@1, pass@k, majority_accuracy and agreement_rate
+    """
+    dead_letters = DeadLetterFile(dead_letter_path) if dead_letter_path else None
+    prepare_failures = {category: [] for category in test_categories}
+    jobs = [
+        (category, sample) for category in test_categories
+        for sample in prepare_category(category, data_dir, mode, template, failures=prepare_failures[category])
+    ]
+
+    def run_sample(category, sample):
+        return consistency_runner(sample, k, temperature, api_client)
+
+    results_by_category = {category: [] for category in test_categories}
+    failure_counts = {category: len(prepare_failures[category]) for category in test_categories}
+    for category, failures in prepare_failures.items():
+        for sample_id, failure in failures:
+            if dead_letters is not None:
+                dead_letters.write(category, sample_id, failure)
+    for (category, _), consistency_result in zip(jobs, run_jobs_isolated(jobs, run_sample, concurrency, max_attempts, retry_queue_size, retry_backoff, dead_letters)):
+        if isinstance(consistency_result, SampleFailure):
+            failure_counts[category] += 1
+        else:
+            results_by_category[category].append(consistency_result)
+
+    report = {}
+    for category in test_categories:
+        result = {"category": category, "mode": mode, "template": template, "k": k, "temperature": temperature}
+        result.update(aggregate_consistency(results_by_category[category]))
+        result["infra_failure_count"] = failure_counts[category]
+        print(result)
+        report[category] = result
+    return report
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="pass@k and consistency evaluation with n choices per request")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--k", type=int, default=5, help="Choices sampled per request")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+
+    api_client = StubClient.from_data_dir(args.data_dir, args.categories) if args.stub else None
+    run_consistency_evaluation(
+        args.categories,
+        k=args.k,
+        temperature=args.temperature,
+        data_dir=args.data_dir,
+        api_client=api_client,
+        mode=args.mode,
+        concurrency=args.concurrency
+    )
+
+
+if __name__ == "__main__":
+    main()
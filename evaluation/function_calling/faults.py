@@ -0,0 +1,176 @@
+import json
+import sys
+import os
+import time
+import threading
+import traceback
+from collections import deque
+from typing import Any, Callable, List, Tuple
+
+import openai
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.scheduler import run_jobs
+
+DEFAULT_DEAD_LETTER_PATH = "../results/dead_letter.jsonl"
+# Request timeout, conflict, rate limit and server-side errors are worth another attempt
+TRANSIENT_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether an exception is likely to go away on retry (network trouble, 429, 5xx)
+
+    Anything else, such as a ValueError for a missing answer id or a KeyError from a
+    malformed function definition, fails the same way every time.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError, openai.APIConnectionError)):
+        return True
+    return getattr(error, "status_code", None) in TRANSIENT_STATUS_CODES
+
+
+class SampleFailure:
+    """
+    An exception raised while evaluating one sample, with its traceback
+    """
+    __slots__ = ("error", "traceback", "transient", "stage")
+
+    def __init__(self, error: Exception, stage: str = "request"):
+        self.error = error
+        self.traceback = traceback.format_exc()
+        self.transient = is_transient(error)
+        self.stage = stage
+
+    @property
+    def message(self) -> str:
+        return f"{type(self.error).__name__}: {self.error}"
+
+
+def run_isolated(function: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Call function, returning a SampleFailure instead of raising
+    """
+    try:
+        return function(*args, **kwargs)
+    except Exception as e:
+        return SampleFailure(e)
+
+
+class RetryQueue:
+    """
+    Bounded queue of jobs whose evaluation failed with a transient error
+
+    A job is accepted while it has attempts left and the queue has room; jobs are
+    drained in rounds, with the delay doubling from backoff after each round.
+    """
+
+    def __init__(self, max_size: int = 100, max_attempts: int = 3, backoff: float = 1.0):
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.rounds = 0
+        self.retried = 0
+        self._queue = deque()
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def offer(self, key: Any, job: Any, failure: SampleFailure) -> bool:
+        """Queue a failed job for another attempt; False when it must be given up."""
+        with self._lock:
+            attempts = self._attempts.get(key, 1)
+            if not failure.transient or attempts >= self.max_attempts or len(self._queue) >= self.max_size:
+                return False
+            self._attempts[key] = attempts + 1
+            self._queue.append(job)
+            self.retried += 1
+            return True
+
+    def attempts(self, key: Any) -> int:
+        with self._lock:
+            return self._attempts.get(key, 1)
+
+    def drain(self) -> List[Any]:
+        """Wait out the backoff of the next round and return its jobs."""
+        with self._lock:
+            jobs = list(self._queue)
+            self._queue.clear()
+        if jobs:
+            time.sleep(self.backoff * 2 ** self.rounds)
+            self.rounds += 1
+        return jobs
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+
+class DeadLetterFile:
+    """
+    JSONL file of samples given up on, one line per sample with the error and traceback
+    """
+
+    def __init__(self, path: str = DEFAULT_DEAD_LETTER_PATH, run_id: str = None):
+        self.path = path
+        self.run_id = run_id
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, category: str, sample_id: str, failure: SampleFailure, attempts: int = 1):
+        entry = {
+            "run_id": self.run_id,
+            "category": category,
+            "sample_id": sample_id,
+            "stage": failure.stage,
+            "transient": failure.transient,
+            "attempts": attempts,
+            "error": failure.message,
+            "traceback": failure.traceback,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        with self._lock:
+            if self.count == 0:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.count += 1
+
+
+def run_jobs_isolated(
+        ordered_jobs: List[Tuple[str, Any]],
+        worker: Callable[[str, Any], Any],
+        concurrency: int = 1,
+        max_attempts: int = 3,
+        retry_queue_size: int = 100,
+        retry_backoff: float = 1.0,
+        dead_letters: DeadLetterFile = None
+) -> List[Any]:
+    """
+    run_jobs with every job isolated: a job that raises is retried through a RetryQueue
+    while its error is transient, and given up on otherwise
+
+    Jobs given up on are written to dead_letters (if any) under their id attribute.
+
+    Returns:
+        Results aligned with ordered_jobs, the last SampleFailure for jobs given up on
+    """
+    results = [None] * len(ordered_jobs)
+    retry_queue = RetryQueue(retry_queue_size, max_attempts, retry_backoff)
+
+    def run(category, indexed_job):
+        return run_isolated(worker, category, indexed_job[1])
+
+    def on_result(category, indexed_job, result):
+        index, job = indexed_job
+        if isinstance(result, SampleFailure):
+            if retry_queue.offer(index, (category, indexed_job), result):
+                return
+            if dead_letters is not None:
+                dead_letters.write(category, getattr(job, "id", str(index)), result, retry_queue.attempts(index))
+        results[index] = result
+
+    run_jobs([(category, (index, job)) for index, (category, job) in enumerate(ordered_jobs)], run, concurrency, on_result)
+    while len(retry_queue):
+        run_jobs(retry_queue.drain(), run, concurrency, on_result)
+    return results
@@ -1,8 +1,3 @@
-from fc_utils import load_and_prepare_data, make_function_call, print_tool_calls, convert_output_to_json, convert_functions_to_tools
-from FCsimple import main
-from json_processing.parse_output import parse_output, parse_query_response_FC
-from json_processing.ast_checker import ast_checker
-from run_eval import run_evaluation, get_possible_answer, eval_runner
 import json
 import sys
 import os
@@ -11,19 +6,31 @@ import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from fc_utils import CATEGORIES, load_and_prepare_data, make_function_call, print_tool_calls, convert_output_to_json, convert_functions_to_tools
+from FCsimple import main
+from json_processing.parse_output import parse_output, parse_query_response_FC
+from json_processing.ast_checker import ast_checker
+from run_eval import run_evaluation, run_evaluations, get_possible_answer, eval_runner
+from significance import macro_accuracy_ci
+
 
-def fc_score():
-    simple_result = run_evaluation("simple")
-    parallel_result = run_evaluation("parallel")
-    multiple_result = run_evaluation("multiple")
+def fc_score(test_categories=CATEGORIES, **eval_kwargs):
+    """
+    Evaluate all categories in one overlapped run and print the average accuracy
 
-    simple_score = simple_result["accuracy"]
-    parallel_score = parallel_result["accuracy"]
-    multiple_score = multiple_result["accuracy"]
+    Args:
+        test_categories: Categories to evaluate, simple, parallel and multiple by default
+        eval_kwargs: Extra keyword arguments for run_evaluations (data_dir, api_client, mode, template, batch, ...)
+    """
+    results = run_evaluations(test_categories, **eval_kwargs)
 
-    average_score = (simple_score + parallel_score + multiple_score) / 3
-    print(f"Average score: {average_score}")
+    average_score = sum(results[category]["accuracy"] for category in test_categories) / len(test_categories)
+    low, high = macro_accuracy_ci(
+        [results[category]["total_count"] - results[category]["error_count"] for category in test_categories],
+        [results[category]["total_count"] for category in test_categories]
+    )
+    print(f"Average score: {average_score} (95% bootstrap CI {low:.4f} - {high:.4f})")
     return average_score
 
 if __name__ == "__main__":
-    fc_score()
\ No newline at end of file
+    fc_score()
@@ -1,8 +1,10 @@
 from openai import OpenAI
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from config import MODEL_NAME, SILICONFLOW_API_KEY
 
+CATEGORIES = ("simple", "parallel", "multiple")
+
 # Shared OpenAI client
 client = OpenAI(
     api_key = SILICONFLOW_API_KEY,
@@ -32,6 +34,30 @@ def convert_functions_to_tools(functions: List[Dict[str, Any]]) -> List[Dict[str
         tools.append(tool)
     return tools
 
+def render_value(value: Any) -> str:
+    """Render a value the way the system prompt asks the model to (strings unquoted)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def render_call(function_name: str, arguments: Dict[str, Any]) -> str:
+    """Render one call as func_name(param=value, ...)."""
+    params = ", ".join(f"{key}={render_value(value)}" for key, value in arguments.items())
+    return f"{function_name}({params})"
+
+def render_calls(ground_truth: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
+    """Render a ground truth entry as the bracketed call string the model should produce."""
+    calls = ground_truth if isinstance(ground_truth, list) else [ground_truth]
+    rendered = []
+    for call in calls:
+        function_name = list(call.keys())[0]
+        rendered.append(render_call(function_name, call[function_name]))
+    return "[" + ", ".join(rendered) + "]"
+
+def turn_answers(function_description: Dict[str, Any], ground_truth: Any) -> List[Any]:
+    """Ground truth of each user turn: a multi-turn sample holds one entry per turn, a single-turn sample is one turn."""
+    return ground_truth if len(function_description["question"]) > 1 else [ground_truth]
+
 def load_and_prepare_data(json_file: str) -> tuple:
     """
     Load JSON data and pre-convert all functions to tools format for efficiency
@@ -72,34 +98,25 @@ def load_and_prepare_data(json_file: str) -> tuple:
     
     return data, all_tools, function_names
 
-def make_function_call(category: str, prompt: str, tools: List[Dict[str, Any]] = None, function_name: str = None, system_message: str = None) -> Any:
+NATIVE_SYSTEM_MESSAGE = """You are an expert in composing functions. You are given a question and a set of tools. Based on the question, call one or more tools to achieve the purpose, using the exact function and parameter names and the correct data types. Make every call needed to fulfil the request in this turn."""
+
+def render_full_prompt(tools: List[Dict[str, Any]] = None) -> str:
     """
-    Make a function call
-    
-    Args:
-        category: Type of function calling (simple, parallel, multiple)
-        prompt: The user prompt
-        tools: Pre-converted tools in OpenAI format (used to inform system message)
-        function_name: Specific function name (not used in BFCL)
-        system_message: Optional custom system message
-        
-    Returns:
-        Full OpenAI response object (to access token usage)
+    Full system prompt: rules, correct/incorrect examples and every parameter description
     """
-    if system_message is None:
-        # Create system message that includes information about available functions
-        tools_info = ""
-        if tools:
-            tools_info = "\n\nAvailable functions:\n"
-            for tool in tools:
-                func = tool["function"]
-                tools_info += f"- {func['name']}: {func['description']}\n"
-                if "parameters" in func and "properties" in func["parameters"]:
-                    tools_info += "  Parameters:\n"
-                    for param_name, param_info in func["parameters"]["properties"].items():
-                        tools_info += f"    - {param_name} ({param_info['type']}): {param_info['description']}\n"
-        
-        system_message = f"""You are an expert in composing functions. You are given a question and a set of possible functions. Based on the question, you will need to make one or more function/tool calls to achieve the purpose.
+    # Create system message that includes information about available functions
+    tools_info = ""
+    if tools:
+        tools_info = "\n\nAvailable functions:\n"
+        for tool in tools:
+            func = tool["function"]
+            tools_info += f"- {func['name']}: {func['description']}\n"
+            if "parameters" in func and "properties" in func["parameters"]:
+                tools_info += "  Parameters:\n"
+                for param_name, param_info in func["parameters"]["properties"].items():
+                    tools_info += f"    - {param_name} ({param_info['type']}): {param_info['description']}\n"
+    
+    return f"""You are an expert in composing functions. You are given a question and a set of possible functions. Based on the question, you will need to make one or more function/tool calls to achieve the purpose.
     If none of the functions can be used, point it out. If the given question lacks the parameters required by the function, also point it out.
     You should only return the function calls in your response.
 
@@ -131,6 +148,68 @@ def make_function_call(category: str, prompt: str, tools: List[Dict[str, Any]] =
 
     At each turn, you should try your best to complete the tasks requested by the user within the current turn. Continue to output functions to call until you have fulfilled the user's request to the best of your ability. Once you have no more functions to call, the system will consider the current turn complete and proceed to the next turn or task.{tools_info}"""
 
+def render_compact_prompt(tools: List[Dict[str, Any]] = None) -> str:
+    """
+    Compact system prompt: the format rules without examples, one line per function
+    """
+    tools_info = ""
+    if tools:
+        tools_info = "\nFunctions:\n"
+        for tool in tools:
+            func = tool["function"]
+            params = ", ".join(
+                f"{param_name}: {param_info['type']}"
+                for param_name, param_info in func.get("parameters", {}).get("properties", {}).items()
+            )
+            tools_info += f"- {func['name']}({params}): {func['description']}\n"
+    
+    return f"""Answer only with function calls as [func_name(param=value, ...), func_name2(...)].
+Use exact function and parameter names, no extra parameters, unquoted strings, decimal percentages (5% = 0.05), plain decimals instead of scientific notation and arrays as [v1, v2].
+If no function fits or required parameters are missing, say so.{tools_info}"""
+
+def render_minimal_prompt(tools: List[Dict[str, Any]] = None) -> str:
+    """
+    Minimal system prompt: the output format and bare function signatures
+    """
+    signatures = ""
+    if tools:
+        signatures = "\n" + "\n".join(
+            f"{tool['function']['name']}(" + ", ".join(
+                f"{param_name}:{param_info['type']}"
+                for param_name, param_info in tool["function"].get("parameters", {}).get("properties", {}).items()
+            ) + ")"
+            for tool in tools
+        )
+    return f"Reply only with [func(param=value, ...)] calls, strings unquoted.{signatures}"
+
+# Text-mode system prompt templates, selectable per run
+PROMPT_TEMPLATES = {
+    "full": render_full_prompt,
+    "compact": render_compact_prompt,
+    "minimal": render_minimal_prompt,
+}
+
+def build_messages(prompt: str, tools: List[Dict[str, Any]] = None, system_message: str = None, mode: str = "text", template: str = "full") -> List[Dict[str, str]]:
+    """
+    Build the chat messages for a function call request
+    
+    Args:
+        prompt: The user prompt
+        tools: Pre-converted tools in OpenAI format
+        system_message: Optional custom system message
+        mode: "text" describes the tools in the system prompt, "native" leaves them to the tools parameter
+        template: Text-mode system prompt template, one of PROMPT_TEMPLATES
+        
+    Returns:
+        List of chat messages
+    """
+    if template not in PROMPT_TEMPLATES:
+        raise ValueError(f"Invalid prompt template: {template}")
+    if system_message is None and mode == "native":
+        system_message = NATIVE_SYSTEM_MESSAGE
+    if system_message is None:
+        system_message = PROMPT_TEMPLATES[template](tools)
+
     messages = [
         {
             "role": "system",
@@ -141,15 +220,81 @@ def make_function_call(category: str, prompt: str, tools: List[Dict[str, Any]] =
             "content": prompt
         }
     ]
+    return messages
+
+def build_request(prompt: str, tools: List[Dict[str, Any]] = None, system_message: str = None, mode: str = "text", template: str = "full", temperature: float = 0.0, n: int = 1, max_tokens: int = None) -> Dict[str, Any]:
+    """
+    Build the chat completion request body for a function call
+    
+    Shared by make_function_call and the batch mode, so both send identical requests.
     
-    # For BFCL, we use regular text completion without tools (SiliconFlow API limitation)
-    response = client.chat.completions.create(
-        model = MODEL_NAME,
-        messages = messages,
-        temperature = 0.0,
-        top_p = 0.95,
-        stream = False
-    )
+    Args:
+        prompt: The user prompt
+        tools: Pre-converted tools in OpenAI format
+        system_message: Optional custom system message
+        mode: "text" parses calls from the content, "native" sends tools= and reads message.tool_calls
+        template: Text-mode system prompt template (full, compact, minimal)
+        temperature: Sampling temperature, greedy by default
+        n: Number of choices to sample from the one prompt
+        max_tokens: Optional cap on the completion length; a response cut off by it ends with finish_reason "length"
+        
+    Returns:
+        Keyword arguments for client.chat.completions.create (without stream)
+    """
+    if mode not in ("text", "native"):
+        raise ValueError(f"Invalid function calling mode: {mode}")
+    request = {
+        "model": MODEL_NAME,
+        "messages": build_messages(prompt, tools, system_message, mode, template),
+        "temperature": temperature,
+        "top_p": 0.95
+    }
+    if n != 1:
+        request["n"] = n
+    if max_tokens is not None:
+        request["max_tokens"] = max_tokens
+    if mode == "native":
+        # Native mode lets the API render the tools and return structured tool_calls
+        request["tools"] = tools
+        request["tool_choice"] = "auto"
+    # Otherwise, for BFCL, we use regular text completion without tools (SiliconFlow API limitation)
+    return request
+
+def make_function_call(category: str, prompt: str, tools: List[Dict[str, Any]] = None, function_name: str = None, system_message: str = None, api_client: Any = None, mode: str = "text", template: str = "full", temperature: float = 0.0, n: int = 1) -> Any:
+    """
+    Make a function call
+    
+    Args:
+        category: Type of function calling (simple, parallel, multiple)
+        prompt: The user prompt
+        tools: Pre-converted tools in OpenAI format (used to inform system message)
+        function_name: Specific function name (not used in BFCL)
+        system_message: Optional custom system message
+        api_client: Optional client to use instead of the shared one (e.g. a StubClient)
+        mode: "text" parses calls from the content, "native" sends tools= and reads message.tool_calls
+        template: Text-mode system prompt template (full, compact, minimal)
+        temperature: Sampling temperature, greedy by default
+        n: Number of choices to sample in this one call (the prompt is billed once)
+        
+    Returns:
+        Full OpenAI response object (to access token usage)
+    """
+    request = build_request(prompt, tools, system_message, mode, template, temperature, n)
+    return send_request(request, api_client)
+
+def send_request(request: Dict[str, Any], api_client: Any = None) -> Any:
+    """
+    Send a request built by build_request
+    
+    Args:
+        request: Keyword arguments for client.chat.completions.create
+        api_client: Optional client to use instead of the shared one
+        
+    Returns:
+        Full OpenAI response object
+    """
+    api_client = api_client or client
+    response = api_client.chat.completions.create(**request, stream = False)
     return response
 
 def print_tool_calls(response: Any) -> None:
@@ -270,4 +415,65 @@ def convert_output_to_json(response: Any) -> dict:
             return parsed_calls
         
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def convert_tool_calls_to_json(response: Any) -> Any:
+    """
+    Convert native tool_calls to the same shape convert_output_to_json returns
+    
+    Args:
+        response: OpenAI response message with tool_calls
+        
+    Returns:
+        Dictionary for a single call, list for several calls, or {"error": ...}
+    """
+    try:
+        if not response.tool_calls:
+            return {"error": f"No tool calls found in response: {response.content}"}
+        
+        parsed_calls = []
+        for tool_call in response.tool_calls:
+            arguments = tool_call.function.arguments
+            if isinstance(arguments, str):
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            if not isinstance(arguments, dict):
+                return {"error": f"Arguments of {tool_call.function.name} are not an object: {arguments}"}
+            parsed_calls.append({
+                "function_name": tool_call.function.name,
+                "arguments": arguments
+            })
+        
+        # Return single call or list of calls
+        if len(parsed_calls) == 1:
+            return parsed_calls[0]
+        else:
+            return parsed_calls
+        
+    except Exception as e:
+        return {"error": str(e)}
+
+def convert_message(response: Any, mode: str = "text") -> Any:
+    """
+    Convert a response message with the converter of the function calling mode
+    
+    Args:
+        response: OpenAI response message
+        mode: "text" parses the content, "native" reads tool_calls
+        
+    Returns:
+        Dictionary for a single call, list for several calls, or {"error": ...}
+    """
+    if mode == "native":
+        return convert_tool_calls_to_json(response)
+    return convert_output_to_json(response)
+
+def message_content(response: Any) -> str:
+    """
+    Raw text of a response message, with native tool_calls serialized as JSON
+    """
+    if getattr(response, "tool_calls", None):
+        return json.dumps([
+            {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+            for tool_call in response.tool_calls
+        ])
+    return response.content
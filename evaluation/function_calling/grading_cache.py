@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+DEFAULT_GRADING_CACHE = "../results/grading_cache.db"
+
+_EVALUATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Source files whose code decides a grade: output conversion, the checker and the scoring glue
+CHECKER_FILES = (
+    os.path.join(_EVALUATION_DIR, "function_calling", "fc_utils.py"),
+    os.path.join(_EVALUATION_DIR, "function_calling", "run_eval.py"),
+    os.path.join(_EVALUATION_DIR, "json_processing", "ast_checker.py"),
+    os.path.join(_EVALUATION_DIR, "json_processing", "parse_output.py"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grades (
+    key TEXT PRIMARY KEY,
+    is_valid INTEGER NOT NULL,
+    error TEXT,
+    error_type TEXT
+) WITHOUT ROWID;
+"""
+
+
+def checker_version() -> str:
+    """
+    Hash of the checker source files, so any change to the grading code starts a fresh cache
+    """
+    digest = hashlib.sha256()
+    for path in CHECKER_FILES:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def answer_hash(function_description: Dict[str, Any], possible_answer: Any) -> str:
+    """
+    Hash of a sample's ground truth and function definitions, the inputs of the checker besides the output
+    """
+    payload = json.dumps([function_description["function"], possible_answer], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class GradingCache:
+    """
+    Memoized grades keyed by (sample id, answer hash, checker version, mode, output text)
+
+    A bounded in-memory LRU sits in front of an optional SQLite file, so grades
+    survive across runs. The checker version is part of every key, so editing the
+    checker, and the answer hash, so editing a sample's answer or functions, makes
+    old entries unreachable instead of stale. The output text is the raw message
+    content (or native tool_calls as JSON) with surrounding whitespace stripped.
+    New grades are written to disk batch_size at a time. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 100000, batch_size: int = 500):
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.version = checker_version()
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self.connection = None
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def key(self, test_category: str, function_description: Dict[str, Any], possible_answer: Any, mode: str, output_text: str) -> str:
+        parts = [test_category, function_description["id"], answer_hash(function_description, possible_answer), self.version, mode, (output_text or "").strip()]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any, str]:
+        """The cached (is_valid, error, error_type), or None."""
+        with self._lock:
+            grade = self._entries.get(key)
+            if grade is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return grade
+            if self.connection is not None:
+                row = self.connection.execute("SELECT is_valid, error, error_type FROM grades WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    grade = (bool(row[0]), json.loads(row[1]), row[2])
+                    self._remember(key, grade)
+                    self.hits += 1
+                    return grade
+            self.misses += 1
+            return None
+
+    def put(self, key: str, grade: Tuple[bool, Any, str]):
+        with self._lock:
+            self._remember(key, grade)
+            if self.connection is not None:
+                self._pending.append((key, int(grade[0]), json.dumps(grade[1], default=str), grade[2]))
+                if len(self._pending) >= self.batch_size:
+                    self._write()
+
+    def _remember(self, key: str, grade: Tuple[bool, Any, str]):
+        self._entries[key] = grade
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write(self):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO grades (key, is_valid, error, error_type) VALUES (?, ?, ?, ?)", self._pending)
+        self._pending = []
+
+    def flush(self):
+        with self._lock:
+            if self.connection is not None and self._pending:
+                self._write()
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0, "entries": len(self._entries)}
@@ -0,0 +1,135 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from types import SimpleNamespace
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+
+
+class LatencyTracker:
+    """
+    Rolling latency history of a run, used to pick the hedge delay
+
+    Until min_samples latencies are known there is no delay, so nothing is hedged.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_HEDGE_PERCENTILE, min_samples: int = 20, window: int = 1000):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.percentile))
+
+
+class HedgedClient:
+    """
+    Client wrapper that sends a duplicate of a request that is slower than usual
+
+    When a request has not completed after the configured percentile of the
+    latencies seen so far (and at least min_delay seconds), the same request is
+    sent again and whichever response arrives first is returned. Every attempt
+    runs on a thread of its own, so the hedge timer counts from the moment the
+    request is sent, never from time spent queued, and a losing attempt still on
+    the wire (the sync client cannot abort it) holds no worker that a later
+    request needs. Its response is discarded and its tokens are counted as the
+    extra cost of hedging. Only client.chat.completions.create is wrapped.
+    """
+
+    def __init__(self, api_client: Any, percentile: float = DEFAULT_HEDGE_PERCENTILE, min_samples: int = 20, min_delay: float = 0.0):
+        self.api_client = api_client
+        self.tracker = LatencyTracker(percentile, min_samples)
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.extra_input_tokens = 0
+        self.extra_output_tokens = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _attempt(self, kwargs: Dict[str, Any], future: Future, started: threading.Event):
+        future.set_running_or_notify_cancel()
+        start_time = time.time()
+        started.set()
+        try:
+            response = self.api_client.chat.completions.create(**kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.tracker.record(time.time() - start_time)
+        future.set_result(response)
+
+    def _start(self, kwargs: Dict[str, Any]) -> Tuple[Future, threading.Event]:
+        """Send one attempt on its own daemon thread; the event is set once the request is on its way."""
+        future = Future()
+        started = threading.Event()
+        threading.Thread(target=self._attempt, args=(kwargs, future, started), daemon=True).start()
+        return future, started
+
+    def _count_discarded(self, future: Future):
+        if future.exception() is not None:
+            return
+        usage = getattr(future.result(), "usage", None)
+        with self._lock:
+            self.extra_input_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.extra_output_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def create(self, **kwargs) -> Any:
+        with self._lock:
+            self.requests += 1
+        delay = self.tracker.hedge_delay()
+        primary, started = self._start(kwargs)
+        if delay is None:
+            return primary.result()
+        started.wait()
+        done, _ = wait([primary], timeout=max(delay, self.min_delay))
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedged += 1
+        hedge, _ = self._start(kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = future
+                    break
+                # A failed attempt only matters if the other one fails too
+                error = error or future.exception()
+            else:
+                continue
+            if winner is hedge:
+                with self._lock:
+                    self.hedge_wins += 1
+            for loser in pending:
+                loser.add_done_callback(self._count_discarded)
+            return winner.result()
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0,
+                "hedge_wins": self.hedge_wins,
+                "hedge_delay (seconds)": self.tracker.hedge_delay(),
+                "extra_input_tokens": self.extra_input_tokens,
+                "extra_output_tokens": self.extra_output_tokens
+            }
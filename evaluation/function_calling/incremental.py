@@ -0,0 +1,100 @@
+import json
+import sys
+import os
+import hashlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.records import EvalRecord, INFRA_ERROR_TYPES
+from function_calling.grading_cache import answer_hash
+
+
+def request_fingerprint(request: Dict[str, Any]) -> str:
+    """
+    Hash of a rendered request: model, messages (system prompt included), tools and sampling parameters
+    """
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def grade_fingerprint(sample: Any, version: str) -> str:
+    """
+    Hash of what decides a stored output's grade: the ground truth and functions, the checker version and the mode
+
+    Args:
+        sample: PreparedSample
+        version: checker_version() of the parser and checker sources
+    """
+    parts = [answer_hash(sample.function_description, sample.possible_answer), version, sample.mode]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def stored_message(content: str, mode: str = "text") -> Any:
+    """
+    Rebuild a response message from the content stored by ResultsStore
+
+    Native outputs were stored as a JSON list of {name, arguments}; they become tool_calls again.
+    """
+    if mode == "native":
+        try:
+            calls = json.loads(content)
+        except json.JSONDecodeError:
+            calls = None
+        if isinstance(calls, list) and calls and all(isinstance(call, dict) and "name" in call and "arguments" in call for call in calls):
+            return SimpleNamespace(role="assistant", content=None, tool_calls=[
+                SimpleNamespace(id=f"call_{i}", type="function", function=SimpleNamespace(name=call["name"], arguments=call["arguments"]))
+                for i, call in enumerate(calls)
+            ])
+    return SimpleNamespace(role="assistant", content=content, tool_calls=None)
+
+
+def stored_record(row: Dict[str, Any]) -> EvalRecord:
+    """
+    EvalRecord of a sample stored by a previous run (see ResultsStore.fingerprints)
+    """
+    return EvalRecord(
+        row["sample_id"],
+        row["is_valid"],
+        row["error"],
+        row["error_type"],
+        input_tokens=row["input_tokens"],
+        output_tokens=row["output_tokens"],
+        time_taken=row["latency"],
+        content=row["content"],
+        backend=row["backend"],
+        truncated=row["error_type"] == "truncated",
+        model=row["model"]
+    )
+
+
+def plan_incremental(jobs: List[Tuple[int, Any]], prior: Dict[str, Dict[str, Any]], version: str) -> Dict[str, List[Tuple[int, Any, Dict[str, Any]]]]:
+    """
+    Split a category's (index, sample) jobs by what changed since a previous run
+
+    "reuse": same request and same grade fingerprint, the stored result stands;
+    "regrade": same request but a changed answer, function list or checker, the
+    stored output is graded again; "send": a new or changed request, or a stored
+    infra failure or no stored output to grade, the model is called.
+
+    Args:
+        jobs: (index, PreparedSample) pairs
+        prior: Sample id -> stored row of the previous run, with its fingerprints
+        version: checker_version() of this run
+
+    Returns:
+        Dictionary of reuse, regrade and send lists of (index, sample, stored row or None)
+    """
+    plan = {"reuse": [], "regrade": [], "send": []}
+    for index, sample in jobs:
+        row = prior.get(sample.id)
+        if row is None or row["error_type"] in INFRA_ERROR_TYPES or row["request_hash"] != request_fingerprint(sample.request):
+            plan["send"].append((index, sample, None))
+        elif row["grade_hash"] == grade_fingerprint(sample, version):
+            plan["reuse"].append((index, sample, row))
+        elif row["content"] is not None:
+            plan["regrade"].append((index, sample, row))
+        else:
+            plan["send"].append((index, sample, None))
+    return plan
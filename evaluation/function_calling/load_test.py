@@ -0,0 +1,202 @@
+import json
+import sys
+import os
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import CATEGORIES, send_request, PROMPT_TEMPLATES
+from function_calling.run_eval import score_response
+from function_calling.prepared import prepare_category
+from function_calling.scheduler import fair_order
+
+ARRIVAL_PROCESSES = ("poisson", "constant")
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def arrival_offsets(rate: float, duration: float, process: str = "poisson", rng: random.Random = None) -> List[float]:
+    """
+    Intended send times, in seconds from the start of a step, of requests arriving at rate per second
+
+    "constant" spaces the requests evenly; "poisson" draws exponential gaps with the
+    same mean, which gives the bursts real traffic has.
+    """
+    if process not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Invalid arrival process: {process}")
+    rng = rng or random.Random(0)
+    offsets = []
+    offset = 0.0 if process == "constant" else rng.expovariate(rate)
+    while offset < duration:
+        offsets.append(offset)
+        offset += 1.0 / rate if process == "constant" else rng.expovariate(rate)
+    return offsets
+
+
+def summarize_step(rate: float, duration: float, outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Throughput, error rate, latency percentiles and accuracy of one rate step
+
+    latency is measured from each request's intended send time, so time spent waiting
+    behind a saturated endpoint or client counts (no coordinated omission);
+    service_latency is from the actual send and shows how much of it was queueing.
+    """
+    offered = len(outcomes)
+    completed = [outcome for outcome in outcomes if outcome["error"] is None]
+    latencies = np.array([outcome["latency"] for outcome in outcomes])
+    service_latencies = np.array([outcome["service_latency"] for outcome in outcomes])
+    # Throughput over the span from the step start until its last response
+    span = max(duration, max((outcome["finished"] for outcome in outcomes), default=0.0))
+    return {
+        "rate": rate,
+        "offered": offered,
+        "completed": len(completed),
+        "throughput (requests/second)": len(completed) / span if span else 0,
+        "error_rate": (offered - len(completed)) / offered if offered else 0,
+        "errors": dict(Counter(outcome["error"] for outcome in outcomes if outcome["error"] is not None)),
+        "accuracy": sum(1 for outcome in completed if outcome["record"].is_valid) / len(completed) if completed else 0,
+        "latency (seconds)": {
+            f"p{percentile}": float(np.percentile(latencies, percentile)) if offered else 0 for percentile in LATENCY_PERCENTILES
+        },
+        "service_latency (seconds)": {
+            f"p{percentile}": float(np.percentile(service_latencies, percentile)) if offered else 0 for percentile in LATENCY_PERCENTILES
+        },
+        "max_latency (seconds)": float(latencies.max()) if offered else 0
+    }
+
+
+def run_load_test(
+        rates: List[float],
+        step_duration: float = 30.0,
+        process: str = "poisson",
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        mode: str = "text",
+        template: str = "full",
+        max_in_flight: int = 256,
+        seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Open-loop load test: send requests at the given arrival rates regardless of completions
+
+    Each rate is held for step_duration seconds, one step after the other, so a rising
+    list of rates is a ramp. Samples of every category are sent round-robin, cycling
+    through the suite as often as needed, and every response is still scored.
+    Requests are dispatched on their schedule even while earlier ones are outstanding;
+    if more than max_in_flight are outstanding the extra ones wait in the client, and
+    that wait is part of their latency.
+
+    Args:
+        rates: Arrival rates in requests per second, one per step
+        step_duration: Seconds each rate is held
+        process: "poisson" or "constant" arrivals
+        test_categories: Categories whose samples are sent
+        data_dir: Directory holding FC-samples/ and FC-answers/
+        api_client: Optional client to use instead of the shared one
+        mode: "text" or "native" function calling
+        template: Text-mode system prompt template
+        max_in_flight: Client threads sending requests
+        seed: Seed of the Poisson arrivals
+
+    Returns:
+        One summary per step, see summarize_step
+    """
+    samples = [sample for _, sample in fair_order({
+        category: prepare_category(category, data_dir, mode, template) for category in test_categories
+    })]
+    if not samples:
+        raise ValueError("No samples to send")
+    rng = random.Random(seed)
+    outcomes_by_step = [[] for _ in rates]
+    lock = threading.Lock()
+
+    def send(step, sample, intended, step_start):
+        sent = time.monotonic()
+        outcome = {"error": None, "record": None}
+        try:
+            full_response = send_request(sample.request, api_client)
+            finished = time.monotonic()
+            outcome["record"] = score_response(sample.category, sample.function_description, sample.possible_answer, full_response, finished - sent,
+                                               sample.mode, function_lookup=sample.function_lookup, keep_content=False)
+        except Exception as e:
+            finished = time.monotonic()
+            outcome["error"] = type(e).__name__
+        outcome["latency"] = finished - intended
+        outcome["service_latency"] = finished - sent
+        outcome["finished"] = finished - step_start
+        with lock:
+            outcomes_by_step[step].append(outcome)
+
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    sent_count = 0
+    try:
+        step_start = time.monotonic()
+        for step, rate in enumerate(rates):
+            for offset in arrival_offsets(rate, step_duration, process, rng):
+                intended = step_start + offset
+                delay = intended - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(send, step, samples[sent_count % len(samples)], intended, step_start)
+                sent_count += 1
+            # The next step starts on schedule, whether or not this one's requests have finished
+            step_start += step_duration
+    finally:
+        executor.shutdown(wait=True)
+
+    report = []
+    for rate, outcomes in zip(rates, outcomes_by_step):
+        summary = {"process": process, "mode": mode}
+        summary.update(summarize_step(rate, step_duration, outcomes))
+        print(summary)
+        report.append(summary)
+    return report
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Open-loop load test at fixed or ramping arrival rates")
+    parser.add_argument("--rates", type=float, nargs="+", required=True, help="Requests per second of each step, e.g. 1 2 4 8")
+    parser.add_argument("--step-duration", type=float, default=30.0, help="Seconds each rate is held")
+    parser.add_argument("--arrival", default="poisson", choices=ARRIVAL_PROCESSES)
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--template", default="full", choices=list(PROMPT_TEMPLATES))
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Client threads sending requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the per-step report to this JSON file")
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+
+    api_client = StubClient.from_data_dir(args.data_dir, args.categories, latency=0.2) if args.stub else None
+    report = run_load_test(
+        args.rates,
+        step_duration=args.step_duration,
+        process=args.arrival,
+        test_categories=args.categories,
+        data_dir=args.data_dir,
+        api_client=api_client,
+        mode=args.mode,
+        template=args.template,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed
+    )
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
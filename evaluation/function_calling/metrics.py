@@ -0,0 +1,244 @@
+import sys
+import os
+import time
+import bisect
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, TextIO
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.records import INFRA_ERROR_TYPES
+
+# Upper bounds (seconds) of the request latency histogram buckets, +Inf is implied
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class EvalMetrics:
+    """
+    Live counters of a running evaluation, updated by the worker threads
+
+    Each update is a few integer additions under one short lock, so workers never
+    wait on a reader; renders and progress lines work on a snapshot copied under
+    the same lock.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.start_time = time.monotonic()
+        self.in_flight = 0
+        self.expected = {}
+        self.outcomes = Counter()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+        self.throttled = 0
+        self.latency_buckets = {}
+        self.latency_sum = Counter()
+        self._lock = threading.Lock()
+
+    def expect(self, category: str, count: int):
+        with self._lock:
+            self.expected[category] = self.expected.get(category, 0) + count
+            self.latency_buckets.setdefault(category, [0] * (len(self.buckets) + 1))
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe(self, category: str, record: Any):
+        """Count a finished sample: correct, incorrect or failed (an infra failure), with its tokens and latency."""
+        bucket = bisect.bisect_left(self.buckets, record.time_taken)
+        failed = record.error_type in INFRA_ERROR_TYPES
+        with self._lock:
+            self.outcomes[(category, "failed" if failed else "correct" if record.is_valid else "incorrect")] += 1
+            if failed:
+                return
+            self.input_tokens += record.input_tokens
+            self.output_tokens += record.output_tokens
+            self.latency_buckets.setdefault(category, [0] * (len(self.buckets) + 1))[bucket] += 1
+            self.latency_sum[category] += record.time_taken
+
+    def failure(self, error: Exception, retried: bool):
+        """Count a failed attempt: retried or not, and whether the endpoint throttled it (HTTP 429)."""
+        with self._lock:
+            self.retries += int(retried)
+            self.throttled += int(getattr(error, "status_code", None) == 429)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Consistent copy of every counter, with the derived rates and ETA
+
+        The ETA is the remaining samples at the completion rate since the start.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.start_time
+            snapshot = {
+                "elapsed": elapsed,
+                "in_flight": self.in_flight,
+                "expected": dict(self.expected),
+                "outcomes": dict(self.outcomes),
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "latency_buckets": {category: list(counts) for category, counts in self.latency_buckets.items()},
+                "latency_sum": dict(self.latency_sum)
+            }
+        categories = snapshot["expected"]
+        completed = {category: sum(snapshot["outcomes"].get((category, outcome), 0) for outcome in ("correct", "incorrect", "failed")) for category in categories}
+        scored = {category: snapshot["outcomes"].get((category, "correct"), 0) + snapshot["outcomes"].get((category, "incorrect"), 0) for category in categories}
+        done = sum(completed.values())
+        remaining = sum(categories.values()) - done
+        snapshot["completed"] = completed
+        snapshot["accuracy"] = {category: snapshot["outcomes"].get((category, "correct"), 0) / scored[category] if scored[category] else 0 for category in categories}
+        snapshot["tokens_per_second"] = (snapshot["input_tokens"] + snapshot["output_tokens"]) / elapsed if elapsed else 0
+        snapshot["eta"] = remaining * elapsed / done if done else None
+        return snapshot
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP fc_eval_in_flight Requests currently in flight",
+            "# TYPE fc_eval_in_flight gauge",
+            f"fc_eval_in_flight {snapshot['in_flight']}",
+            "# HELP fc_eval_samples_expected Samples to evaluate per category",
+            "# TYPE fc_eval_samples_expected gauge"
+        ]
+        lines += [f'fc_eval_samples_expected{{category="{category}"}} {count}' for category, count in snapshot["expected"].items()]
+        lines += ["# HELP fc_eval_samples_total Finished samples per category and outcome", "# TYPE fc_eval_samples_total counter"]
+        lines += [f'fc_eval_samples_total{{category="{category}",outcome="{outcome}"}} {count}' for (category, outcome), count in sorted(snapshot["outcomes"].items())]
+        lines += ["# HELP fc_eval_accuracy Running accuracy of the scored samples per category", "# TYPE fc_eval_accuracy gauge"]
+        lines += [f'fc_eval_accuracy{{category="{category}"}} {accuracy}' for category, accuracy in snapshot["accuracy"].items()]
+        lines += [
+            "# HELP fc_eval_tokens_total Tokens of the scored samples",
+            "# TYPE fc_eval_tokens_total counter",
+            f'fc_eval_tokens_total{{direction="input"}} {snapshot["input_tokens"]}',
+            f'fc_eval_tokens_total{{direction="output"}} {snapshot["output_tokens"]}',
+            "# HELP fc_eval_tokens_per_second Tokens per second since the start of the run",
+            "# TYPE fc_eval_tokens_per_second gauge",
+            f"fc_eval_tokens_per_second {snapshot['tokens_per_second']}",
+            "# HELP fc_eval_request_latency_seconds Latency of the scored samples' requests",
+            "# TYPE fc_eval_request_latency_seconds histogram"
+        ]
+        for category, counts in snapshot["latency_buckets"].items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'fc_eval_request_latency_seconds_bucket{{category="{category}",le="{bound}"}} {cumulative}')
+            lines.append(f'fc_eval_request_latency_seconds_sum{{category="{category}"}} {snapshot["latency_sum"].get(category, 0.0)}')
+            lines.append(f'fc_eval_request_latency_seconds_count{{category="{category}"}} {cumulative}')
+        lines += [
+            "# HELP fc_eval_retries_total Failed attempts queued for a retry",
+            "# TYPE fc_eval_retries_total counter",
+            f"fc_eval_retries_total {snapshot['retries']}",
+            "# HELP fc_eval_throttled_total Attempts rejected with HTTP 429",
+            "# TYPE fc_eval_throttled_total counter",
+            f"fc_eval_throttled_total {snapshot['throttled']}",
+            "# HELP fc_eval_eta_seconds Estimated seconds until every sample has finished",
+            "# TYPE fc_eval_eta_seconds gauge",
+            f"fc_eval_eta_seconds {snapshot['eta'] if snapshot['eta'] is not None else 'NaN'}"
+        ]
+        return "\n".join(lines) + "\n"
+
+    def progress_line(self) -> str:
+        """
+        One compact status line: per-category progress and accuracy, in flight, tokens/sec, retries, ETA
+        """
+        snapshot = self.snapshot()
+        categories = " | ".join(
+            f"{category} {snapshot['completed'][category]}/{count} acc {snapshot['accuracy'][category]:.3f}" for category, count in snapshot["expected"].items()
+        )
+        eta = f"{snapshot['eta']:.0f}s" if snapshot["eta"] is not None else "?"
+        return (f"{categories} | in flight {snapshot['in_flight']} | {snapshot['tokens_per_second']:.0f} tok/s"
+                f" | retries {snapshot['retries']} throttled {snapshot['throttled']} | ETA {eta}")
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving EvalMetrics.render() on GET /metrics, for Prometheus to scrape
+    """
+
+    def __init__(self, metrics: EvalMetrics, port: int = 9464, host: str = "127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                payload = metrics.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(payload)))
+                handler.end_headers()
+                handler.wfile.write(payload)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def __enter__(self) -> "MetricsServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ProgressLine:
+    """
+    Terminal progress line redrawn in place every interval seconds from a background thread
+
+    The workers only update EvalMetrics; formatting and writing happen here. On a
+    stream that is not a terminal each refresh is printed on its own line.
+    """
+
+    def __init__(self, metrics: EvalMetrics, interval: float = 1.0, stream: TextIO = None):
+        self.metrics = metrics
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._width = 0
+
+    def _draw(self):
+        line = self.metrics.progress_line()
+        if self.stream.isatty():
+            self.stream.write("\r" + line.ljust(self._width))
+            self._width = len(line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._draw()
+
+    def __enter__(self) -> "ProgressLine":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._draw()
+        if self.stream.isatty():
+            self.stream.write("\n")
+            self.stream.flush()
@@ -0,0 +1,227 @@
+import json
+import sys
+import os
+import time
+import argparse
+from typing import Any, Dict, List
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import CATEGORIES, send_request, convert_message, turn_answers, PROMPT_TEMPLATES
+from function_calling.run_eval import score_response
+from function_calling.prepared import prepare_category
+from function_calling.faults import SampleFailure, DeadLetterFile, run_jobs_isolated
+
+
+def simulate_tool_result(function_name: str, arguments: Any) -> Dict[str, Any]:
+    """
+    Deterministic stand-in for executing a called function
+
+    The same call always gives the same result, so replays of a conversation
+    send byte-identical messages and keep hitting the provider's prefix cache.
+    """
+    return {"function": function_name, "status": "success", "result": {"echo": arguments}}
+
+
+def follow_up_messages(message: Any, mode: str = "text") -> List[Dict[str, Any]]:
+    """
+    The assistant turn and the simulated tool results to append after a response
+
+    Native mode replays the tool_calls and answers each with a tool message; text
+    mode keeps the assistant content and reports the results in one user message.
+    Nothing is appended for calls that could not be parsed.
+    """
+    if mode == "native" and message.tool_calls:
+        messages = [{
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": [
+                {"id": call.id, "type": "function", "function": {"name": call.function.name, "arguments": call.function.arguments}}
+                for call in message.tool_calls
+            ]
+        }]
+        for call in message.tool_calls:
+            try:
+                arguments = json.loads(call.function.arguments)
+            except json.JSONDecodeError:
+                arguments = call.function.arguments
+            messages.append({
+                "role": "tool",
+                "tool_call_id": call.id,
+                "content": json.dumps(simulate_tool_result(call.function.name, arguments))
+            })
+        return messages
+
+    messages = [{"role": "assistant", "content": message.content or ""}]
+    converted_output = convert_message(message, mode)
+    calls = converted_output if isinstance(converted_output, list) else [converted_output]
+    results = [
+        simulate_tool_result(call["function_name"], call["arguments"])
+        for call in calls
+        if isinstance(call, dict) and "function_name" in call
+    ]
+    if results:
+        messages.append({"role": "user", "content": "Function results: " + json.dumps(results)})
+    return messages
+
+
+def conversation_runner(sample, api_client=None):
+    """
+    Replay every user turn of a prepared sample and score the calls of each turn
+
+    The first request is the sample's prepared request; each later request appends
+    the previous response, its simulated tool results and the next user turn to the
+    same message list. Earlier messages are never re-rendered, so the system prompt,
+    tools and all earlier turns form a stable prefix that providers can cache.
+
+    Returns:
+        List of EvalRecord, one per turn, with ids "{sample id}:turn{n}"
+    """
+    turns = sample.function_description["question"]
+    messages = list(sample.request["messages"])
+    records = []
+    for turn, possible_answer in enumerate(turn_answers(sample.function_description, sample.possible_answer)):
+        if turn > 0:
+            messages.extend(turns[turn])
+        request = dict(sample.request, messages=list(messages))
+        start_time = time.time()
+        full_response = send_request(request, api_client)
+        time_taken = time.time() - start_time
+
+        record = score_response(sample.category, sample.function_description, possible_answer, full_response, time_taken, sample.mode,
+                                function_lookup=sample.function_lookup, keep_content=False)
+        record.id = f"{sample.id}:turn{turn + 1}"
+        records.append(record)
+        messages.extend(follow_up_messages(full_response.choices[0].message, sample.mode))
+    return records
+
+
+def aggregate_turns(conversations: List[List[Any]]) -> Dict[str, Any]:
+    """
+    Summarize the per-turn records of a category's conversations
+
+    turn_accuracy is the share of valid turns, conversation_accuracy the share of
+    conversations with every turn valid. per_turn breaks accuracy, latency and
+    cached versus uncached prompt tokens down by turn position.
+    """
+    turn_count = sum(len(records) for records in conversations)
+    cached_tokens = sum(record.cached_input_tokens for records in conversations for record in records)
+    input_tokens = sum(record.input_tokens for records in conversations for record in records)
+
+    per_turn = []
+    for turn in range(max((len(records) for records in conversations), default=0)):
+        turn_records = [records[turn] for records in conversations if len(records) > turn]
+        turn_cached = sum(record.cached_input_tokens for record in turn_records)
+        per_turn.append({
+            "turn": turn + 1,
+            "count": len(turn_records),
+            "accuracy": sum(1 for record in turn_records if record.is_valid) / len(turn_records),
+            "average_time_taken_per_call (seconds)": sum(record.time_taken for record in turn_records) / len(turn_records),
+            "cached_input_tokens": turn_cached,
+            "uncached_input_tokens": sum(record.input_tokens for record in turn_records) - turn_cached
+        })
+
+    return {
+        "conversations": len(conversations),
+        "turns": turn_count,
+        "turn_accuracy": sum(1 for records in conversations for record in records if record.is_valid) / turn_count if turn_count else 0,
+        "conversation_accuracy": sum(1 for records in conversations if all(record.is_valid for record in records)) / len(conversations) if conversations else 0,
+        "total_input_tokens": input_tokens,
+        "total_output_tokens": sum(record.output_tokens for records in conversations for record in records),
+        "cached_input_tokens": cached_tokens,
+        "uncached_input_tokens": input_tokens - cached_tokens,
+        "cache_hit_ratio": cached_tokens / input_tokens if input_tokens else 0,
+        "per_turn": per_turn
+    }
+
+
+def run_multi_turn_evaluation(
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        mode: str = "text",
+        template: str = "full",
+        concurrency: int = 1,
+        max_attempts: int = 3,
+        retry_queue_size: int = 100,
+        retry_backoff: float = 1.0,
+        dead_letter_path: str = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate multi-turn conversations turn by turn
+
+    Turns of one conversation run in order; conversations run concurrently.
+    Single-turn samples are evaluated as one-turn conversations.
+
+    Args:
+        test_categories: Categories to evaluate
+        data_dir: Directory holding FC-samples/ and FC-answers/
+        api_client: Optional client to use instead of the shared one
+        mode: "text" or "native" function calling
+        template: Text-mode system prompt template
+        concurrency: Conversations in flight at once
+        max_attempts, retry_queue_size, retry_backoff, dead_letter_path: Fault isolation, as in run_evaluations;
+            a conversation is retried from its first turn, and conversations given up on are counted in
+            infra_failure_count and left out of the accuracies
+
+    Returns:
+        Category -> result dict with turn and conversation accuracy, cache usage and per_turn
+    """
+    dead_letters = DeadLetterFile(dead_letter_path) if dead_letter_path else None
+    prepare_failures = {category: [] for category in test_categories}
+    jobs = [
+        (category, sample) for category in test_categories
+        for sample in prepare_category(category, data_dir, mode, template, failures=prepare_failures[category])
+    ]
+
+    def run_sample(category, sample):
+        return conversation_runner(sample, api_client)
+
+    conversations_by_category = {category: [] for category in test_categories}
+    failure_counts = {category: len(prepare_failures[category]) for category in test_categories}
+    for category, failures in prepare_failures.items():
+        for sample_id, failure in failures:
+            if dead_letters is not None:
+                dead_letters.write(category, sample_id, failure)
+    for (category, _), records in zip(jobs, run_jobs_isolated(jobs, run_sample, concurrency, max_attempts, retry_queue_size, retry_backoff, dead_letters)):
+        if isinstance(records, SampleFailure):
+            failure_counts[category] += 1
+        else:
+            conversations_by_category[category].append(records)
+
+    report = {}
+    for category in test_categories:
+        result = {"category": category, "mode": mode, "template": template}
+        result.update(aggregate_turns(conversations_by_category[category]))
+        result["infra_failure_count"] = failure_counts[category]
+        print(result)
+        report[category] = result
+    return report
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Multi-turn evaluation with simulated tool results")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--template", default="full", choices=list(PROMPT_TEMPLATES))
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+
+    api_client = StubClient.from_data_dir(args.data_dir, args.categories) if args.stub else None
+    run_multi_turn_evaluation(
+        args.categories,
+        data_dir=args.data_dir,
+        api_client=api_client,
+        mode=args.mode,
+        template=args.template,
+        concurrency=args.concurrency
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import sys
+import os
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import CATEGORIES, convert_functions_to_tools, build_request, render_calls, turn_answers
+from function_calling.faults import SampleFailure
+from json_processing.schema_validator import validate_functions, schema_hash
+
+
+# Output budget: rough tokens of the expected calls plus per-call formatting, times a safety factor
+DEFAULT_MAX_TOKENS_FACTOR = 3.0
+CALL_OVERHEAD_TOKENS = 8
+MIN_OUTPUT_BUDGET = 32
+
+
+def output_budget(possible_answer, factor=DEFAULT_MAX_TOKENS_FACTOR):
+    """
+    max_tokens for a sample, from the number of expected calls and the rendered length of the ground truth
+
+    The rendered call string is counted at about four characters per token, each call
+    adds CALL_OVERHEAD_TOKENS for names, quoting and JSON punctuation, and the sum is
+    multiplied by factor. The budget is never below MIN_OUTPUT_BUDGET.
+
+    possible_answer is the ground truth of one turn; see turn_answers.
+    """
+    call_count = len(possible_answer) if isinstance(possible_answer, list) else 1
+    expected_tokens = len(render_calls(possible_answer)) / 4 + call_count * CALL_OVERHEAD_TOKENS
+    return max(MIN_OUTPUT_BUDGET, math.ceil(factor * expected_tokens))
+
+
+def load_samples(test_category, data_dir=".."):
+    if test_category not in CATEGORIES:
+        raise ValueError(f"Invalid test category: {test_category}")
+    return json.load(open(os.path.join(data_dir, "FC-samples", f"{test_category}_FC.json")))
+
+
+def load_answers(test_category, data_dir=".."):
+    """
+    Load the answers of a category once, indexed by sample id
+    """
+    if test_category not in CATEGORIES:
+        raise ValueError(f"Invalid test category: {test_category}")
+    answer_table = json.load(open(os.path.join(data_dir, "FC-answers", f"{test_category}_FC_answers.json")))
+    return {answer["id"]: answer["ground_truth"] for answer in answer_table}
+
+
+def lookup_answer(answers, function_description):
+    """
+    Same as get_possible_answer, against an answer index from load_answers
+    """
+    function_id = function_description["id"]
+    if function_id not in answers:
+        raise ValueError(f"No answer found for function ID: {function_id}")
+    return answers[function_id]
+
+
+@dataclass(frozen=True)
+class PreparedSample:
+    """
+    Everything the inference and scoring paths need for one sample, computed once
+
+    Instances are frozen and shared between worker threads; the request, tools
+    and function_description must be treated as read-only.
+    """
+    id: str
+    category: str
+    mode: str
+    template: str
+    function_description: Dict[str, Any]
+    possible_answer: Any
+    prompt: str
+    tools: List[Dict[str, Any]]
+    function_name: str
+    request: Dict[str, Any]
+    function_lookup: Mapping[str, Dict[str, Any]]
+    schema_errors: Tuple[str, ...] = ()
+    max_tokens: int = None
+
+
+def prepare_sample(test_category, function_description, possible_answer, mode="text", template="full", schema_checks=None, max_tokens_factor=None):
+    """
+    Compile one sample into a PreparedSample
+
+    Args:
+        test_category: Category of the sample
+        function_description: Sample from FC-samples ({"id", "question", "function"})
+        possible_answer: Its ground truth
+        mode: "text" or "native" function calling
+        template: Text-mode system prompt template
+        schema_checks: Optional schema hash -> (is_valid, message) from validate_functions,
+            shared by the samples of a category; checked here when missing
+        max_tokens_factor: Send max_tokens from output_budget with this safety factor (None sends no cap)
+
+    Returns:
+        PreparedSample
+    """
+    functions = function_description["function"]
+    if schema_checks is None:
+        schema_checks = validate_functions(functions)
+    prompt = function_description["question"][0][0]["content"]
+    tools = convert_functions_to_tools(functions)
+    # Every turn of a conversation is sent with the same request settings, so the cap fits the longest turn
+    max_tokens = max(output_budget(answer, max_tokens_factor) for answer in turn_answers(function_description, possible_answer)) if max_tokens_factor is not None else None
+    function_lookup = {}
+    for function in functions:
+        # First definition wins, like find_function_description
+        function_lookup.setdefault(function["name"], function)
+    return PreparedSample(
+        id=function_description["id"],
+        category=test_category,
+        mode=mode,
+        template=template,
+        function_description=function_description,
+        possible_answer=possible_answer,
+        prompt=prompt,
+        tools=tools,
+        function_name=functions[0]["name"],
+        request=build_request(prompt, tools, mode=mode, template=template, max_tokens=max_tokens),
+        function_lookup=MappingProxyType(function_lookup),
+        schema_errors=tuple(
+            f"{function['name']}: {schema_checks[schema_hash(function)][1]}"
+            for function in functions
+            if not schema_checks[schema_hash(function)][0]
+        ),
+        max_tokens=max_tokens
+    )
+
+
+def prepare_category(test_category, data_dir="..", mode="text", template="full", max_tokens_factor=None, failures=None):
+    """
+    Preflight a category once: load the samples, join the answers, convert the tools,
+    render the requests, validate the schemas and build the function lookup tables
+
+    Every distinct schema of the category is validated once; samples with an invalid
+    schema keep the messages in schema_errors and are still evaluated (run_evaluations
+    prints them and reports schema_error_count per category). With a failures
+    list, a sample that cannot be prepared (a missing answer id, a malformed function
+    definition) is left out and appended to it as (sample id, SampleFailure) instead of
+    failing the whole category.
+
+    Returns:
+        List of PreparedSample in file order
+    """
+    samples = load_samples(test_category, data_dir)
+    answers = load_answers(test_category, data_dir)
+    schema_checks = validate_functions([function for sample in samples for function in sample["function"]])
+    prepared = []
+    for position, sample in enumerate(samples):
+        if failures is None:
+            prepared.append(prepare_sample(test_category, sample, lookup_answer(answers, sample), mode, template, schema_checks, max_tokens_factor))
+            continue
+        try:
+            prepared.append(prepare_sample(test_category, sample, lookup_answer(answers, sample), mode, template, schema_checks, max_tokens_factor))
+        except Exception as e:
+            failures.append((sample.get("id", f"{test_category}#{position}"), SampleFailure(e, stage="prepare")))
+    return prepared
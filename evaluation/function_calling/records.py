@@ -0,0 +1,154 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Error types of samples that failed in the harness or the infrastructure, not in the model
+INFRA_ERROR_TYPES = ("infra_error", "batch_error")
+
+
+class EvalRecord:
+    """
+    Compact per-sample result
+
+    Holds only what reporting needs, never the response object, so large runs
+    do not keep every response alive. to_dict gives the older nested dict shape.
+    """
+    __slots__ = ("id", "is_valid", "error", "error_type", "input_tokens", "output_tokens", "time_taken", "content", "coalesced", "backend",
+                 "cached_input_tokens", "truncated", "model")
+
+    def __init__(self, id: str, is_valid: bool, error: Any = None, error_type: str = None, input_tokens: int = 0, output_tokens: int = 0,
+                 time_taken: float = 0.0, content: str = None, coalesced: bool = False, backend: str = None,
+                 cached_input_tokens: int = 0, truncated: bool = False, model: str = None):
+        self.id = id
+        self.is_valid = is_valid
+        self.error = error
+        self.error_type = error_type
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.time_taken = time_taken
+        self.content = content
+        self.coalesced = coalesced
+        self.backend = backend
+        # Prompt tokens the provider served from its prefix cache, part of input_tokens
+        self.cached_input_tokens = cached_input_tokens
+        # The completion hit max_tokens (finish_reason "length")
+        self.truncated = truncated
+        # Model alias a BackendPool sent the request to, None for the configured MODEL_NAME
+        self.model = model
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ast_result": {"isValid": self.is_valid, "error": self.error, "type": self.error_type},
+            "token_usage": {
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": self.total_tokens
+            },
+            "time_taken": self.time_taken,
+            "content": self.content,
+            "coalesced": self.coalesced,
+            "backend": self.backend,
+            "truncated": self.truncated
+        }
+
+    def __repr__(self):
+        return f"EvalRecord({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+
+class ResultColumns:
+    """
+    Numeric columns of a category's results in preallocated NumPy arrays
+
+    Records are written by position as they finish and the record itself can be
+    dropped; aggregate computes the report over the whole columns at once.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.valid = np.zeros(size, dtype=bool)
+        self.coalesced = np.zeros(size, dtype=bool)
+        self.truncated = np.zeros(size, dtype=bool)
+        self.failed = np.zeros(size, dtype=bool)
+        self.input_tokens = np.zeros(size, dtype=np.int64)
+        self.output_tokens = np.zeros(size, dtype=np.int64)
+        self.time_taken = np.zeros(size, dtype=np.float64)
+
+    @classmethod
+    def from_records(cls, records: List[EvalRecord]) -> "ResultColumns":
+        columns = cls(len(records))
+        for index, record in enumerate(records):
+            columns.set(index, record)
+        return columns
+
+    def set(self, index: int, record: EvalRecord):
+        self.valid[index] = record.is_valid
+        self.coalesced[index] = record.coalesced
+        self.truncated[index] = record.truncated
+        self.failed[index] = record.error_type in INFRA_ERROR_TYPES
+        self.input_tokens[index] = record.input_tokens
+        self.output_tokens[index] = record.output_tokens
+        self.time_taken[index] = record.time_taken
+
+    def aggregate(self) -> Dict[str, Any]:
+        """
+        Accuracy, token usage and latency statistics, as plain Python numbers
+
+        Infra failures (INFRA_ERROR_TYPES) are counted on their own and left out of
+        the accuracy, token and latency statistics, which only cover scored samples.
+        """
+        scored = ~self.failed
+        total_count = int(scored.sum())
+        correct_count = int(self.valid[scored].sum())
+        input_tokens = self.input_tokens[scored]
+        output_tokens = self.output_tokens[scored]
+        total_tokens = input_tokens + output_tokens
+        return {
+            "accuracy": correct_count / total_count if total_count > 0 else 0,
+            "total_count": total_count,
+            "error_count": total_count - correct_count,
+            "truncated_count": int(self.truncated.sum()),
+            "infra_failure_count": self.size - total_count,
+            "token_usage": {
+                "total_input_tokens": int(input_tokens.sum()),
+                "total_output_tokens": int(output_tokens.sum()),
+                "total_tokens": int(total_tokens.sum()),
+                "average_tokens_per_call": float(total_tokens.mean()) if total_count > 0 else 0,
+                "std_token_usage": float(total_tokens.std(ddof=1)) if total_count > 1 else 0,
+                "mean_token_usage": float(total_tokens.mean()) if total_count > 0 else 0,
+                "percentile_95_token_usage": float(np.percentile(total_tokens, 95)) if total_count > 0 else 0
+            },
+            "average_time_taken_per_call (seconds)": float(self.time_taken[scored].mean()) if total_count > 0 else 0
+        }
+
+    def truncation_savings(self, unbounded_output_tokens: int = 4096) -> Dict[str, Any]:
+        """
+        Estimate what the output budget saved on the truncated results
+
+        Without a cap a runaway completion would have decoded up to unbounded_output_tokens
+        (the provider's default limit), so each truncated result saved the difference to
+        its billed output. The decode time per output token is the least-squares slope of
+        latency over output tokens across the category's scored results; infra failures
+        carry no output and an arbitrary timeout latency, so they are left out of the fit.
+        """
+        saved_tokens = int(np.clip(unbounded_output_tokens - self.output_tokens[self.truncated], 0, None).sum())
+        scored = ~self.failed
+        output_tokens = self.output_tokens[scored]
+        seconds_per_token = 0.0
+        if output_tokens.size > 1 and np.ptp(output_tokens) > 0:
+            seconds_per_token = max(float(np.polyfit(output_tokens, self.time_taken[scored], 1)[0]), 0.0)
+        return {
+            "truncated_count": int(self.truncated.sum()),
+            "estimated_output_tokens_saved": saved_tokens,
+            "estimated_decode_time_saved (seconds)": saved_tokens * seconds_per_token
+        }
+
+    def coalescing(self) -> Dict[str, int]:
+        """Hits and the tokens they would have cost, for results marked coalesced."""
+        return {
+            "hits": int(self.coalesced.sum()),
+            "tokens_saved": int((self.input_tokens + self.output_tokens)[self.coalesced].sum())
+        }
@@ -0,0 +1,77 @@
+import sys
+import os
+import argparse
+from typing import Any, Dict
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.run_eval import grade_message
+from function_calling.prepared import load_samples, load_answers
+from function_calling.results_store import ResultsStore, DEFAULT_RESULTS_DB
+from function_calling.grading_cache import GradingCache, DEFAULT_GRADING_CACHE
+from function_calling.incremental import stored_message
+
+
+def rescore_run(store: ResultsStore, run_id: str, data_dir: str = "..", mode: str = None, grading_cache: GradingCache = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Grade the stored outputs of a run again with the current checker and answers
+
+    Each output is parsed in the mode stored with it. Outputs whose sample, answer,
+    checker version and text were graded before are answered from the grading cache.
+
+    Args:
+        mode: Mode of outputs stored without one (runs recorded before the store kept
+            it); a stored mode that differs from it is an error
+
+    Returns:
+        Category -> total_count, accuracy and the number of samples whose grade changed
+    """
+    samples_by_category = {}
+    answers_by_category = {}
+    report = {}
+    for output in store.outputs(run_id):
+        output_mode = output["mode"] or mode
+        if output_mode is None:
+            raise ValueError(f"Run {run_id} was stored without its mode; pass the mode it was made in")
+        if mode is not None and output_mode != mode:
+            raise ValueError(f"Run {run_id} was made in {output_mode} mode, not {mode}")
+        category = output["category"]
+        if category not in samples_by_category:
+            samples_by_category[category] = {sample["id"]: sample for sample in load_samples(category, data_dir)}
+            answers_by_category[category] = load_answers(category, data_dir)
+        function_description = samples_by_category[category].get(output["sample_id"])
+        if function_description is None or output["sample_id"] not in answers_by_category[category]:
+            continue
+        is_valid, _, _ = grade_message(category, function_description, answers_by_category[category][output["sample_id"]],
+                                       stored_message(output["content"], output_mode), output_mode, grading_cache=grading_cache)
+        result = report.setdefault(category, {"category": category, "total_count": 0, "valid_count": 0, "changed_count": 0})
+        result["total_count"] += 1
+        result["valid_count"] += int(is_valid)
+        result["changed_count"] += int(is_valid != output["is_valid"])
+    for result in report.values():
+        result["accuracy"] = result["valid_count"] / result["total_count"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score the stored outputs of runs with the current checker and answers")
+    parser.add_argument("run_ids", nargs="+")
+    parser.add_argument("--db", default=DEFAULT_RESULTS_DB)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--mode", default=None, choices=["text", "native"], help="Mode of runs stored without one; the stored mode is used otherwise")
+    parser.add_argument("--grading-cache", default=DEFAULT_GRADING_CACHE, help="SQLite file of cached grades")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    grading_cache = GradingCache(args.grading_cache)
+    for run_id in args.run_ids:
+        for result in rescore_run(store, run_id, args.data_dir, args.mode, grading_cache).values():
+            print(dict(result, run_id=run_id))
+    print(f"Grading cache: {grading_cache.stats()}")
+    grading_cache.close()
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import sys
+import os
+import time
+import secrets
+import sqlite3
+import argparse
+import threading
+from typing import Any, Dict, List
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.significance import compare_runs
+
+DEFAULT_RESULTS_DB = "../results/results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    category TEXT NOT NULL,
+    sample_id TEXT NOT NULL,
+    is_valid INTEGER NOT NULL,
+    error TEXT,
+    error_type TEXT,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    content TEXT,
+    backend TEXT,
+    request_hash TEXT,
+    grade_hash TEXT,
+    mode TEXT,
+    PRIMARY KEY (run_id, model, category, sample_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_by_sample ON samples (run_id, category, sample_id, is_valid);
+CREATE INDEX IF NOT EXISTS samples_by_validity ON samples (run_id, is_valid, category, sample_id);
+CREATE INDEX IF NOT EXISTS samples_by_latency ON samples (run_id, latency DESC);
+CREATE TABLE IF NOT EXISTS category_totals (
+    run_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total_count INTEGER NOT NULL,
+    valid_count INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    PRIMARY KEY (run_id, model, category)
+) WITHOUT ROWID;
+"""
+
+# Running totals kept next to the rows, so per-run aggregates never scan the samples
+UPDATE_TOTALS = """
+INSERT INTO category_totals (run_id, model, category, total_count, valid_count, input_tokens, output_tokens, latency_sum)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_id, model, category) DO UPDATE SET
+    total_count = total_count + excluded.total_count,
+    valid_count = valid_count + excluded.valid_count,
+    input_tokens = input_tokens + excluded.input_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    latency_sum = latency_sum + excluded.latency_sum
+"""
+
+# Keys of the batch being written, in a connection-local table, to find the rows it replaces
+BATCH_KEYS = """
+CREATE TEMP TABLE IF NOT EXISTS batch_keys (
+    run_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    category TEXT NOT NULL,
+    sample_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, model, category, sample_id)
+) WITHOUT ROWID
+"""
+
+# Totals of the stored rows a batch replaces, per (run_id, model, category)
+REPLACED_TOTALS = """
+SELECT samples.run_id, samples.model, samples.category, COUNT(*), SUM(samples.is_valid),
+       SUM(samples.input_tokens), SUM(samples.output_tokens), SUM(samples.latency)
+FROM batch_keys JOIN samples
+ON samples.run_id = batch_keys.run_id AND samples.model = batch_keys.model
+AND samples.category = batch_keys.category AND samples.sample_id = batch_keys.sample_id
+GROUP BY samples.run_id, samples.model, samples.category
+"""
+
+
+def new_run_id() -> str:
+    """Time-ordered run id with microseconds and a random suffix, so runs started together never share rows."""
+    now = time.time()
+    return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now % 1 * 1e6):06d}-{secrets.token_hex(2)}"
+
+
+def sample_row(run_id: str, model: str, category: str, sample_id: str, record: Any, request_hash: str = None, grade_hash: str = None, mode: str = None) -> tuple:
+    """
+    Flatten an EvalRecord, the sample's fingerprints (see incremental.py) and the run's mode into a samples row
+    """
+    error = record.error
+    return (
+        run_id,
+        model,
+        category,
+        sample_id,
+        int(record.is_valid),
+        None if record.is_valid else (error if isinstance(error, str) or error is None else str(error)),
+        None if record.is_valid else record.error_type,
+        record.input_tokens,
+        record.output_tokens,
+        record.time_taken,
+        record.content,
+        record.backend,
+        request_hash,
+        grade_hash,
+        mode
+    )
+
+
+class ResultsStore:
+    """
+    SQLite warehouse of per-sample results across runs and models
+
+    Rows are buffered and written batch_size at a time, each batch in one
+    transaction, so recording during a concurrent run costs one commit per
+    batch rather than per sample. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_DB, batch_size: int = 500):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Databases written before the backend, fingerprint and mode columns existed
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(samples)")]
+        for column in ("backend", "request_hash", "grade_hash", "mode"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE samples ADD COLUMN {column} TEXT")
+        self.connection.execute(BATCH_KEYS)
+
+    def record(self, run_id: str, model: str, category: str, sample_id: str, record: Any, request_hash: str = None, grade_hash: str = None, mode: str = None):
+        """
+        Queue one EvalRecord; the batch is written once batch_size rows are pending
+
+        mode ("text" or "native") says how the stored content is to be parsed when re-scored.
+        """
+        with self._lock:
+            self._pending.append(sample_row(run_id, model, category, sample_id, record, request_hash, grade_hash, mode))
+            if len(self._pending) >= self.batch_size:
+                self._write(self._pending)
+                self._pending = []
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write(self._pending)
+                self._pending = []
+
+    def _write(self, rows: List[tuple]):
+        # Only the last result of a sample recorded twice in one batch counts
+        rows = list({row[:4]: row for row in rows}.values())
+        totals = {}
+        for row in rows:
+            key = row[:3]
+            total = totals.setdefault(key, [0, 0, 0, 0, 0.0])
+            total[0] += 1
+            total[1] += row[4]
+            total[2] += row[7]
+            total[3] += row[8]
+            total[4] += row[9]
+        with self.connection:
+            # A re-recorded sample replaces its old row, so its old contribution leaves the totals first;
+            # the batch's keys are joined against the stored rows in one query
+            self.connection.execute("DELETE FROM batch_keys")
+            self.connection.executemany("INSERT INTO batch_keys (run_id, model, category, sample_id) VALUES (?, ?, ?, ?)", [row[:4] for row in rows])
+            replaced = self.connection.execute(REPLACED_TOTALS).fetchall()
+            for run_id, model, category, *old in replaced:
+                total = totals[(run_id, model, category)]
+                for i, value in enumerate(old):
+                    total[i] -= value
+            self.connection.executemany("INSERT OR REPLACE INTO samples (run_id, model, category, sample_id, is_valid, error, error_type, input_tokens, output_tokens, latency, content, backend, request_hash, grade_hash, mode) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.executemany(UPDATE_TOTALS, [key + tuple(total) for key, total in totals.items()])
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def run_summary(self, run_id: str) -> List[Dict[str, Any]]:
+        """
+        Per-category accuracy, tokens and mean latency of a run
+        """
+        rows = self.connection.execute(
+            "SELECT model, category, total_count, valid_count, input_tokens, output_tokens, latency_sum "
+            "FROM category_totals WHERE run_id = ? ORDER BY model, category",
+            (run_id,)
+        ).fetchall()
+        return [
+            {
+                "run_id": run_id,
+                "model": model,
+                "category": category,
+                "accuracy": valid_count / total_count if total_count else 0,
+                "total_count": total_count,
+                "error_count": total_count - valid_count,
+                "total_input_tokens": input_tokens,
+                "total_output_tokens": output_tokens,
+                "average_time_taken_per_call (seconds)": latency_sum / total_count if total_count else 0
+            }
+            for model, category, total_count, valid_count, input_tokens, output_tokens, latency_sum in rows
+        ]
+
+    def regressions(self, base_run_id: str, new_run_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Samples valid in the base run but invalid in the new one (e.g. another prompt), model by model
+        """
+        rows = self.connection.execute(
+            "SELECT new.model, new.category, new.sample_id, new.error_type, new.error, new.content "
+            "FROM samples AS new INDEXED BY samples_by_validity "
+            "JOIN samples AS base INDEXED BY samples_by_sample "
+            "ON base.run_id = ? AND base.category = new.category AND base.sample_id = new.sample_id AND base.model = new.model AND base.is_valid = 1 "
+            "WHERE new.run_id = ? AND new.is_valid = 0 "
+            "ORDER BY new.model, new.category, new.sample_id LIMIT ?",
+            (base_run_id, new_run_id, limit)
+        ).fetchall()
+        return [
+            {"model": model, "category": category, "sample_id": sample_id, "error_type": error_type, "error": error, "content": content}
+            for model, category, sample_id, error_type, error, content in rows
+        ]
+
+    def compare(self, base_run_id: str, new_run_id: str) -> List[Dict[str, Any]]:
+        """
+        Per-model, per-category paired bootstrap and McNemar test of the new run against the base run
+
+        Only samples recorded in both runs are compared, see significance.compare_runs.
+        """
+        self.flush()
+        correctness = {}
+        for run_id in (base_run_id, new_run_id):
+            for model, category, sample_id, is_valid in self.connection.execute(
+                "SELECT model, category, sample_id, is_valid FROM samples WHERE run_id = ? ORDER BY model, category, sample_id",
+                (run_id,)
+            ):
+                ids, valid = correctness.setdefault((run_id, model, category), ([], []))
+                ids.append(sample_id)
+                valid.append(bool(is_valid))
+        groups = sorted({key[1:] for key in correctness if key[0] == base_run_id} & {key[1:] for key in correctness if key[0] == new_run_id})
+        return [
+            dict(model=model, category=category, **compare_runs(*correctness[(base_run_id, model, category)], *correctness[(new_run_id, model, category)]))
+            for model, category in groups
+        ]
+
+    def fingerprints(self, run_id: str, category: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored results of a run's category with their fingerprints, by sample id, for an incremental run
+
+        Rows of every model of the run are included: a BackendPool files each row under
+        the model alias that answered it, while the request fingerprint covers the model asked for.
+        """
+        self.flush()
+        rows = self.connection.execute(
+            "SELECT sample_id, model, is_valid, error, error_type, input_tokens, output_tokens, latency, content, backend, request_hash, grade_hash "
+            "FROM samples WHERE run_id = ? AND category = ?",
+            (run_id, category)
+        ).fetchall()
+        return {
+            row[0]: {
+                "sample_id": row[0], "model": row[1], "is_valid": bool(row[2]), "error": row[3], "error_type": row[4], "input_tokens": row[5],
+                "output_tokens": row[6], "latency": row[7], "content": row[8], "backend": row[9], "request_hash": row[10], "grade_hash": row[11]
+            }
+            for row in rows
+        }
+
+    def outputs(self, run_id: str) -> List[Dict[str, Any]]:
+        """
+        Stored raw outputs of a run with the mode they were produced in, for re-scoring without calling the model again
+
+        mode is None for rows recorded before the store kept it.
+        """
+        self.flush()
+        rows = self.connection.execute(
+            "SELECT model, category, sample_id, is_valid, content, mode FROM samples WHERE run_id = ? AND content IS NOT NULL ORDER BY model, category, sample_id",
+            (run_id,)
+        ).fetchall()
+        return [
+            {"model": model, "category": category, "sample_id": sample_id, "is_valid": bool(is_valid), "content": content, "mode": mode}
+            for model, category, sample_id, is_valid, content, mode in rows
+        ]
+
+    def slowest(self, run_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        The samples with the highest latency in a run
+        """
+        rows = self.connection.execute(
+            "SELECT model, category, sample_id, latency, output_tokens, backend FROM samples INDEXED BY samples_by_latency "
+            "WHERE run_id = ? ORDER BY latency DESC LIMIT ?",
+            (run_id, limit)
+        ).fetchall()
+        return [
+            {"model": model, "category": category, "sample_id": sample_id, "latency": latency, "output_tokens": output_tokens, "backend": backend}
+            for model, category, sample_id, latency, output_tokens, backend in rows
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the SQLite results warehouse")
+    parser.add_argument("--db", default=DEFAULT_RESULTS_DB)
+    subparsers = parser.add_subparsers(dest="query", required=True)
+    summary_parser = subparsers.add_parser("summary", help="Per-category aggregates of a run")
+    summary_parser.add_argument("run_id")
+    regressions_parser = subparsers.add_parser("regressions", help="Samples that passed in the base run and fail in the new one")
+    regressions_parser.add_argument("base_run_id")
+    regressions_parser.add_argument("new_run_id")
+    regressions_parser.add_argument("--limit", type=int, default=100)
+    compare_parser = subparsers.add_parser("compare", help="Paired bootstrap and McNemar test of the new run against the base run")
+    compare_parser.add_argument("base_run_id")
+    compare_parser.add_argument("new_run_id")
+    slowest_parser = subparsers.add_parser("slowest", help="Slowest samples of a run")
+    slowest_parser.add_argument("run_id")
+    slowest_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.query == "summary":
+        rows = store.run_summary(args.run_id)
+    elif args.query == "regressions":
+        rows = store.regressions(args.base_run_id, args.new_run_id, args.limit)
+    elif args.query == "compare":
+        rows = store.compare(args.base_run_id, args.new_run_id)
+    else:
+        rows = store.slowest(args.run_id, args.limit)
+    for row in rows:
+        print(row)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
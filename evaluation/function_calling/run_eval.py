@@ -1,107 +1,192 @@
 import json
 import sys
 import os
-import statistics
-import numpy as np
 import time
+import argparse
+from collections import Counter
+from contextlib import ExitStack
 
 # Add parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from function_calling.fc_utils import load_and_prepare_data, make_function_call, print_tool_calls, convert_output_to_json, convert_functions_to_tools
-from function_calling.FCsimple import main
+from function_calling.fc_utils import CATEGORIES, MODEL_NAME, client, load_and_prepare_data, send_request, print_tool_calls, convert_message, message_content, PROMPT_TEMPLATES
+from function_calling.batch_mode import run_batch, LocalBatchProcessor, DEFAULT_BATCH_DIR, DEFAULT_POLL_INTERVAL
+from function_calling.scheduler import order_jobs, run_jobs, predict_job_cost, ORDERING_POLICIES
+from function_calling.single_flight import REQUEST_COALESCER, request_key, is_deterministic
+from function_calling.results_store import ResultsStore, DEFAULT_RESULTS_DB, new_run_id
+from function_calling.hedging import HedgedClient
+from function_calling.backend_pool import load_backend_pool
+from function_calling.tune import tuned_concurrency, DEFAULT_PROFILES_PATH
+from function_calling.records import EvalRecord, ResultColumns, INFRA_ERROR_TYPES
+from function_calling.significance import column_intervals, macro_accuracy_ci
+from function_calling.grading_cache import GradingCache, DEFAULT_GRADING_CACHE, checker_version
+from function_calling.incremental import request_fingerprint, grade_fingerprint, plan_incremental, stored_record, stored_message
+from function_calling.metrics import EvalMetrics, MetricsServer, ProgressLine
+from function_calling.faults import SampleFailure, RetryQueue, DeadLetterFile, run_isolated, DEFAULT_DEAD_LETTER_PATH
+from function_calling.prepared import prepare_sample, prepare_category
 from json_processing.parse_output import parse_output, parse_query_response_FC
 from json_processing.ast_checker import ast_checker
+from json_processing.schema_validator import validate_sample_files, sample_file_paths, print_report
 
 def eval_runner(
         test_category,
         function_description,
-        possible_answer
+        possible_answer,
+        api_client=None,
+        mode="text",
+        template="full",
+        coalescer=None
 ):
     """
     Run the evaluation for a given test category and function description
+
+    Returns:
+        The result in the nested dict shape of EvalRecord.to_dict
+    """
+    sample = prepare_sample(test_category, function_description, possible_answer, mode, template)
+    return run_prepared(sample, api_client, coalescer).to_dict()
+
+
+def run_prepared(sample, api_client=None, coalescer=None, keep_content=True, grading_cache=None):
+    """
+    Send a prepared sample's request and score the response into an EvalRecord
+
+    With a coalescer (SingleFlight), a deterministic request that is byte-identical
+    to one already in flight waits for that call's response instead of sending its own;
+    such results are marked coalesced.
     """
-    prompt = function_description["question"][0][0]["content"]
-    tools = function_description["function"]  # This is already a list
-    tools = convert_functions_to_tools(tools)  # Convert to tools format for system message
-    function_name = function_description["function"][0]["name"]  # Get the first function's name
     start_time = time.time()
-    full_response = make_function_call(test_category, prompt, tools, function_name)
+    if coalescer is not None and is_deterministic(sample.request):
+        full_response, coalesced = coalescer.do(
+            request_key(sample.request, api_client or client),
+            lambda: send_request(sample.request, api_client)
+        )
+    else:
+        full_response = send_request(sample.request, api_client)
+        coalesced = False
     end_time = time.time()
     time_taken = end_time - start_time
     
-    # Extract the message from the full response
-    response_message = full_response.choices[0].message
-    
-    # Extract token information from the full response
-    token_info = parse_query_response_FC(full_response)
+    record = score_response(sample.category, sample.function_description, sample.possible_answer, full_response, time_taken, sample.mode,
+                            function_lookup=sample.function_lookup, keep_content=keep_content, grading_cache=grading_cache)
+    record.coalesced = coalesced
+    # Set when a BackendPool served the request
+    record.backend = getattr(full_response, "served_by", None)
+    record.model = getattr(full_response, "served_model", None)
+    return record
+
+
+def grade_message(test_category, function_description, possible_answer, response_message, mode="text", function_lookup=None, grading_cache=None):
+    """
+    Convert a response message and check it against the possible answer with ast_checker
+
+    With a GradingCache, an output already graded for this sample, answer and checker
+    version is not converted and checked again.
+
+    Returns:
+        Tuple of (is_valid, error, error_type)
+    """
+    if grading_cache is not None:
+        key = grading_cache.key(test_category, function_description, possible_answer, mode, message_content(response_message))
+        grade = grading_cache.get(key)
+        if grade is not None:
+            return grade
     
-    converted_output = convert_output_to_json(response_message)
+    converted_output = convert_message(response_message, mode)
     
     # Handle both single function calls (dict) and parallel/multiple calls (list)
+    error_msg = None
     if isinstance(converted_output, dict):
         if "function_name" not in converted_output:
             error_msg = converted_output.get("error", "Missing 'function_name' in converted_output")
-            return {
-                "ast_result": {"isValid": False, "error": error_msg, "type": "conversion_error"},
-                "token_usage": {
-                    "input_tokens": token_info["input_token"],
-                    "output_tokens": token_info["output_token"],
-                    "total_tokens": token_info["input_token"] + token_info["output_token"]
-                },
-                "time_taken": time_taken
-            }
     elif isinstance(converted_output, list):
         # For parallel/multiple calls, check if any have errors
         for i, call in enumerate(converted_output):
             if isinstance(call, dict) and "error" in call:
                 error_msg = f"Error in call {i+1}: {call['error']}"
-                return {
-                    "ast_result": {"isValid": False, "error": error_msg, "type": "conversion_error"},
-                    "token_usage": {
-                        "input_tokens": token_info["input_token"],
-                        "output_tokens": token_info["output_token"],
-                        "total_tokens": token_info["input_token"] + token_info["output_token"]
-                    },
-                    "time_taken": time_taken
-                }
+                break
     else:
         error_msg = f"Unexpected output type: {type(converted_output)}"
-        return {
-            "ast_result": {"isValid": False, "error": error_msg, "type": "conversion_error"},
-            "token_usage": {
-                "input_tokens": token_info["input_token"],
-                "output_tokens": token_info["output_token"],
-                "total_tokens": token_info["input_token"] + token_info["output_token"]
-            },
-            "time_taken": time_taken
-        }
-    
-    ast_result = ast_checker(function_description, converted_output, possible_answer, test_category)
-    
-    # Add token information to the result
-    result = {
-        "ast_result": ast_result,
-        "token_usage": {
-            "input_tokens": token_info["input_token"],
-            "output_tokens": token_info["output_token"],
-            "total_tokens": token_info["input_token"] + token_info["output_token"]
-        },
-        "time_taken": time_taken
-    }
+    if error_msg is not None:
+        grade = (False, error_msg, "conversion_error")
+    else:
+        ast_result = ast_checker(function_description, converted_output, possible_answer, test_category, function_lookup)
+        grade = (ast_result["isValid"] == True, ast_result["error"], ast_result.get("type", ast_result.get("error_type")))
     
-    return result
+    if grading_cache is not None:
+        grading_cache.put(key, grade)
+    return grade
 
 
-def get_possible_answer(function_description, test_category):
-    if test_category == "simple":
-        answer_table = json.load(open("../FC-answers/simple_FC_answers.json"))
-    elif test_category == "multiple":
-        answer_table = json.load(open("../FC-answers/multiple_FC_answers.json"))
-    elif test_category == "parallel":
-        answer_table = json.load(open("../FC-answers/parallel_FC_answers.json"))
-    else:
+def regrade_stored(sample, row, grading_cache=None):
+    """
+    Grade a previous run's stored output of a sample again, keeping its tokens and latency
+
+    Returns:
+        EvalRecord
+    """
+    record = stored_record(row)
+    record.is_valid, record.error, record.error_type = grade_message(
+        sample.category, sample.function_description, sample.possible_answer, stored_message(row["content"], sample.mode), sample.mode,
+        sample.function_lookup, grading_cache
+    )
+    if record.truncated and not record.is_valid:
+        record.error_type = "truncated"
+    return record
+
+
+def score_response(
+        test_category,
+        function_description,
+        possible_answer,
+        full_response,
+        time_taken,
+        mode="text",
+        choice_index=0,
+        function_lookup=None,
+        keep_content=True,
+        grading_cache=None
+):
+    """
+    Convert a model response and check it against the possible answer with ast_checker
+
+    choice_index selects which choice of an n>1 response is scored; function_lookup is
+    the name -> description table of a PreparedSample. The response itself is not kept,
+    only its raw content when keep_content is set. grading_cache is passed to grade_message.
+
+    Returns:
+        EvalRecord
+    """
+    # Extract the message from the full response
+    response_message = full_response.choices[choice_index].message
+    truncated = getattr(full_response.choices[choice_index], "finish_reason", None) == "length"
+    
+    # Extract token information from the full response
+    token_info = parse_query_response_FC(full_response)
+    record = EvalRecord(
+        function_description["id"],
+        False,
+        input_tokens=token_info["input_token"],
+        output_tokens=token_info["output_token"],
+        time_taken=time_taken,
+        content=message_content(response_message) if keep_content else None,
+        cached_input_tokens=token_info["cached_input_token"],
+        truncated=truncated
+    )
+    
+    record.is_valid, record.error, record.error_type = grade_message(
+        test_category, function_description, possible_answer, response_message, mode, function_lookup, grading_cache
+    )
+    if truncated and not record.is_valid:
+        # Cut off by max_tokens, not a wrong answer
+        record.error_type = "truncated"
+    return record
+
+
+def get_possible_answer(function_description, test_category, data_dir=".."):
+    if test_category not in CATEGORIES:
         raise ValueError(f"Invalid test category: {test_category}")
+    answer_table = json.load(open(os.path.join(data_dir, "FC-answers", f"{test_category}_FC_answers.json")))
     
     # Find the matching answer by ID
     function_id = function_description["id"]
@@ -112,85 +197,430 @@ def get_possible_answer(function_description, test_category):
     raise ValueError(f"No answer found for function ID: {function_id}")
 
 
+def run_evaluation(test_category, **eval_kwargs):
+    """
+    Evaluate every sample of a category and aggregate accuracy, token and latency statistics
 
-def run_evaluation(test_category):
-    correct_count = 0
-    total_count = 0
-    total_input_tokens = 0
-    total_output_tokens = 0
-    total_tokens = 0
-    total_time_taken = 0
-    # Lists to collect token usage for statistics
-    all_input_tokens = []
-    all_output_tokens = []
-    all_total_tokens = []
-    
-    if test_category == "simple":
-        function_descriptions = json.load(open("../FC-samples/simple_FC.json"))
-    elif test_category == "multiple":
-        function_descriptions = json.load(open("../FC-samples/multiple_FC.json"))
-    elif test_category == "parallel":
-        function_descriptions = json.load(open("../FC-samples/parallel_FC.json"))
-    else:
-        raise ValueError(f"Invalid test category: {test_category}")
+    Args:
+        test_category: Type of function calling (simple, parallel, multiple)
+        eval_kwargs: Options of run_evaluations (data_dir, api_client, mode, template, batch, concurrency, ...)
+    """
+    return run_evaluations([test_category], **eval_kwargs)[test_category]
+
+
+def run_evaluations(
+        test_categories,
+        data_dir="..",
+        api_client=None,
+        mode="text",
+        template="full",
+        batch=False,
+        batch_dir=DEFAULT_BATCH_DIR,
+        batch_poll_interval=DEFAULT_POLL_INTERVAL,
+        concurrency=1,
+        coalesce=False,
+        progress_every=0,
+        ordering="fair",
+        store=None,
+        run_id=None,
+        hedge_percentile=None,
+        max_tokens_factor=None,
+        max_attempts=3,
+        retry_queue_size=100,
+        retry_backoff=1.0,
+        dead_letter_path=None,
+        grading_cache=None,
+        incremental_base=None,
+        metrics=None
+):
+    """
+    Evaluate several categories in one overlapped run and aggregate each of them
+
+    Live requests of every category share one worker pool. Jobs are interleaved
+    round-robin across categories, so all categories progress together, and each
+    category's result is printed as soon as its last sample finishes.
+
+    Args:
+        test_categories: Categories to evaluate (simple, parallel, multiple)
+        data_dir: Directory holding FC-samples/ and FC-answers/ (e.g. a synthetic suite)
+        api_client: Optional client to use instead of the shared one (e.g. a StubClient)
+        mode: "text" (calls parsed from the content) or "native" (tools= / tool_calls)
+        template: Text-mode system prompt template (full, compact, minimal)
+        batch: Submit each category as one batch file instead of live requests;
+            api_client must then offer files/batches (the real client or a LocalBatchProcessor)
+        batch_dir: Directory for the batch request files
+        batch_poll_interval: Seconds between batch status checks
+        concurrency: Number of live requests in flight at once, shared by all categories
+        coalesce: Share one API call between identical deterministic requests in flight at the same time
+            (across every evaluation in the process); the report counts the hits and the tokens they saved
+        progress_every: Print running per-category accuracies every this many finished samples (0 disables)
+        ordering: Job order in the pool: "fair" (round-robin across categories), "fifo" (file order)
+            or "longest_first" (by predicted cost from the tool list and the ground-truth calls)
+        store: Optional ResultsStore that records every per-sample result as it finishes
+        run_id: Run name for the store, a timestamp by default
+        hedge_percentile: Send a duplicate of a live request still running after this percentile of
+            the run's latencies so far, first response wins (None disables); the hedge rate and the
+            tokens of the discarded responses are added to every category as "hedging"
+        max_tokens_factor: Cap every request at max_tokens from its ground truth (see output_budget)
+            with this safety factor (None sends no cap); truncated results get error_type "truncated"
+            and the estimated savings are added to every category as "output_budget"
+        max_attempts: Attempts per live sample that fails with a transient error (network, 429, 5xx);
+            retries run in rounds after the first pass, with the delay doubling from retry_backoff
+        retry_queue_size: Most samples waiting for a retry at once; failures beyond it are given up
+        retry_backoff: Seconds before the first retry round
+        dead_letter_path: JSONL file receiving every sample given up on, with its traceback
+        grading_cache: Optional GradingCache; outputs already graded are not converted and checked again
+        incremental_base: Run id in store to evaluate incrementally against (None evaluates everything).
+            Samples whose rendered request is unchanged since that run are not sent again: their stored
+            result is reused, or their stored output re-graded if the answer, functions or checker changed
+            (see plan_incremental); the counts are added to every category as "incremental"
+        metrics: Optional EvalMetrics updated as samples finish, for a MetricsServer or ProgressLine
+
+    Every sample is isolated: an exception while preparing or evaluating it (a missing
+    answer id, a malformed function, a network error that outlasts its retries) turns
+    that sample into an "infra_error" record, counted in infra_failure_count and left
+    out of the accuracy, instead of aborting the run.
+
+    Returns:
+        Category -> result dict
+    """
+    # Preflight: every category is compiled once into immutable prepared samples
+    prepare_failures = {category: [] for category in test_categories}
+    samples_by_category = {
+        category: prepare_category(category, data_dir, mode, template, max_tokens_factor, prepare_failures[category])
+        for category in test_categories
+    }
+    # Samples with an invalid function schema are still evaluated, but reported
+    schema_error_counts = {category: sum(1 for sample in samples if sample.schema_errors) for category, samples in samples_by_category.items()}
+    for category, samples in samples_by_category.items():
+        messages = sorted({message for sample in samples for message in sample.schema_errors})
+        if messages:
+            print(f"Schema errors in {category}: {schema_error_counts[category]} samples; " + "; ".join(messages))
+    results = {}
+    run_start = time.time()
+    if store is not None and run_id is None:
+        run_id = new_run_id()
+    if incremental_base is not None and store is None:
+        raise ValueError("An incremental run needs the results store holding its base run")
+    # Every stored result carries its fingerprints, so any stored run can be the base of an incremental one
+    version = checker_version() if store is not None else None
+    
+    def record_result(category, sample, record):
+        # Rows are filed under the model that answered, which differs from MODEL_NAME for a backend with a model alias
+        store.record(run_id, record.model or MODEL_NAME, category, sample.id, record, request_fingerprint(sample.request), grade_fingerprint(sample, version), sample.mode)
     
-    for function_description in function_descriptions:
-        possible_answer = get_possible_answer(function_description, test_category)
-        eval_result = eval_runner(test_category, function_description, possible_answer)
-    
-        # Extract AST result and token usage
-        ast_result = eval_result["ast_result"]
-        token_usage = eval_result["token_usage"]
-        time_taken = eval_result["time_taken"]
-        # Update token counters
-        total_input_tokens += token_usage["input_tokens"]
-        total_output_tokens += token_usage["output_tokens"]
-        total_tokens += token_usage["total_tokens"]
-        total_time_taken += time_taken
-        # Collect token usage for statistics
-        all_input_tokens.append(token_usage["input_tokens"])
-        all_output_tokens.append(token_usage["output_tokens"])
-        all_total_tokens.append(token_usage["total_tokens"])
-        
-        if ast_result["isValid"] == True:
-            correct_count += 1
-        total_count += 1
-    
-    # Calculate statistics
-    std_token_usage = statistics.stdev(all_total_tokens) if len(all_total_tokens) > 1 else 0
-    mean_token_usage = statistics.mean(all_total_tokens) if all_total_tokens else 0
-    percentile_95_token_usage = np.percentile(all_total_tokens, 95) if all_total_tokens else 0
-    
-    result = {
-        "accuracy": correct_count / total_count, 
-        "total_count": total_count, 
-        "error_count": total_count - correct_count,
-        "token_usage": {
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_tokens": total_tokens,
-            "average_tokens_per_call": total_tokens / total_count if total_count > 0 else 0,
-            "std_token_usage": std_token_usage,
-            "mean_token_usage": mean_token_usage,
-            "percentile_95_token_usage": percentile_95_token_usage
-        },
-        "average_time_taken_per_call (seconds)": total_time_taken / total_count if total_count > 0 else 0
+    jobs_by_category = {category: list(enumerate(samples)) for category, samples in samples_by_category.items()}
+    # (index, sample, record) of samples answered from the base run
+    carried_over = {category: [] for category in test_categories}
+    incremental_counts = {}
+    if incremental_base is not None:
+        for category, jobs in jobs_by_category.items():
+            plan = plan_incremental(jobs, store.fingerprints(incremental_base, category), version)
+            carried_over[category] = [(index, sample, stored_record(row)) for index, sample, row in plan["reuse"]] + [
+                (index, sample, regrade_stored(sample, row, grading_cache)) for index, sample, row in plan["regrade"]
+            ]
+            jobs_by_category[category] = [(index, sample) for index, sample, _ in plan["send"]]
+            incremental_counts[category] = {"base_run_id": incremental_base, **{action: len(entries) for action, entries in plan.items()}}
+        print("Incremental: " + ", ".join(
+            f"{category} {counts['reuse']} reused, {counts['regrade']} re-graded, {counts['send']} sent" for category, counts in incremental_counts.items()
+        ))
+    if metrics is not None:
+        for category, samples in samples_by_category.items():
+            metrics.expect(category, len(samples) + len(prepare_failures[category]))
+    dead_letters = DeadLetterFile(dead_letter_path, run_id) if dead_letter_path else None
+    
+    def give_up(category, sample_id, failure, attempts=1):
+        if dead_letters is not None:
+            dead_letters.write(category, sample_id, failure, attempts)
+        return EvalRecord(sample_id, False, failure.message, "infra_error")
+    
+    def report_failures():
+        infra_failures = sum(result["infra_failure_count"] for result in results.values())
+        if infra_failures:
+            print(f"Infra failures: {infra_failures}" + (f", written to {dead_letters.path}" if dead_letters is not None else ""))
+    
+    def finish_category(category, columns, extra, backends=None):
+        result = {"category": category, "mode": mode, "template": template}
+        result.update(columns.aggregate())
+        result["schema_error_count"] = schema_error_counts[category]
+        result["confidence_intervals"] = column_intervals(columns)
+        result.update(extra)
+        if category in incremental_counts:
+            result["incremental"] = incremental_counts[category]
+        if backends:
+            result["backends"] = dict(backends)
+        if max_tokens_factor is not None:
+            result["output_budget"] = dict(max_tokens_factor=max_tokens_factor, **columns.truncation_savings())
+        # Time from the start of the overlapped run until this category's last sample finished
+        result["wall_time (seconds)"] = time.time() - run_start
+        print(result)
+        results[category] = result
+    
+    if batch:
+        for category in samples_by_category:
+            sent = [sample for _, sample in jobs_by_category[category]]
+            eval_results, extra = run_batch_category(category, sent, api_client, batch_dir, batch_poll_interval, store is not None, grading_cache) if sent else ([], {})
+            eval_results += [record for _, _, record in carried_over[category]]
+            failures = [give_up(category, sample_id, failure) for sample_id, failure in prepare_failures[category]]
+            if store is not None:
+                # Infra failures stay out of the store, as in live mode, so its totals match the report
+                for sample, eval_result in zip(sent + [sample for _, sample, _ in carried_over[category]], eval_results):
+                    if eval_result.error_type not in INFRA_ERROR_TYPES:
+                        record_result(category, sample, eval_result)
+            if metrics is not None:
+                for eval_result in eval_results + failures:
+                    metrics.observe(category, eval_result)
+            finish_category(category, ResultColumns.from_records(eval_results + failures), extra)
+        if store is not None:
+            store.flush()
+        report_failures()
+        return results
+    
+    coalescer = REQUEST_COALESCER if coalesce else None
+    hedged_client = None
+    if hedge_percentile is not None:
+        hedged_client = HedgedClient(api_client or client, hedge_percentile)
+        api_client = hedged_client
+    # Finished records go into the columns (and the store) and are not kept
+    columns_by_category = {
+        category: ResultColumns(len(samples) + len(prepare_failures[category])) for category, samples in samples_by_category.items()
     }
-    print(result)
-    return result
+    backends_by_category = {category: Counter() for category in samples_by_category}
+    completed = {category: len(prepare_failures[category]) for category in samples_by_category}
+    correct = {category: 0 for category in samples_by_category}
+    # Samples that could not be prepared take the positions after the prepared ones
+    for category, failures in prepare_failures.items():
+        for offset, (sample_id, failure) in enumerate(failures):
+            record = give_up(category, sample_id, failure)
+            columns_by_category[category].set(len(samples_by_category[category]) + offset, record)
+            if metrics is not None:
+                metrics.observe(category, record)
+    retry_queue = RetryQueue(retry_queue_size, max_attempts, retry_backoff)
+    
+    def run_sample(category, job):
+        _, sample = job
+        if metrics is None:
+            return run_isolated(run_prepared, sample, api_client, coalescer, keep_content=store is not None, grading_cache=grading_cache)
+        metrics.request_started()
+        try:
+            return run_isolated(run_prepared, sample, api_client, coalescer, keep_content=store is not None, grading_cache=grading_cache)
+        finally:
+            metrics.request_finished()
+    
+    def on_result(category, job, record):
+        index, sample = job
+        if isinstance(record, SampleFailure):
+            retried = retry_queue.offer((category, index), (category, job), record)
+            if metrics is not None:
+                metrics.failure(record.error, retried)
+            if retried:
+                return
+            record = give_up(category, sample.id, record, retry_queue.attempts((category, index)))
+        columns_by_category[category].set(index, record)
+        if metrics is not None:
+            metrics.observe(category, record)
+        if record.backend:
+            backends_by_category[category][record.backend] += 1
+        if store is not None and record.error_type not in INFRA_ERROR_TYPES:
+            record_result(category, sample, record)
+        completed[category] += 1
+        if record.is_valid:
+            correct[category] += 1
+        if progress_every and sum(completed.values()) % progress_every == 0:
+            print("Progress: " + ", ".join(
+                f"{name} {correct[name] / completed[name] if completed[name] else 0:.4f} ({completed[name]}/{columns_by_category[name].size})"
+                for name in columns_by_category
+            ))
+        if completed[category] == columns_by_category[category].size:
+            columns = columns_by_category[category]
+            extra = {}
+            if coalesce:
+                extra["coalescing"] = columns.coalescing()
+            finish_category(category, columns, extra, backends_by_category[category])
+    
+    for category, entries in carried_over.items():
+        for index, sample, record in entries:
+            on_result(category, (index, sample), record)
+    
+    def predicted_cost(category, job):
+        _, sample = job
+        return predict_job_cost(sample.function_description, sample.possible_answer)
+    
+    run_jobs(order_jobs(jobs_by_category, ordering, predicted_cost), run_sample, concurrency, on_result)
+    # Transient failures get their further attempts in rounds after the first pass
+    while len(retry_queue):
+        run_jobs(retry_queue.drain(), run_sample, concurrency, on_result)
+    if store is not None:
+        store.flush()
+    
+    # Categories without samples never see a result
+    for category, columns in columns_by_category.items():
+        if category not in results:
+            finish_category(category, columns, {})
+    if hedged_client is not None:
+        hedging = hedged_client.stats()
+        print(f"Hedging: {hedging}")
+        for result in results.values():
+            result["hedging"] = hedging
+    if retry_queue.retried:
+        print(f"Retries: {retry_queue.retried} attempts in {retry_queue.rounds} rounds")
+    report_failures()
+    return {category: results[category] for category in test_categories}
 
 
-def fc_score():
-    simple_result = run_evaluation("simple")
-    parallel_result = run_evaluation("parallel")
-    multiple_result = run_evaluation("multiple")
+def run_batch_category(test_category, samples, api_client=None, work_dir=DEFAULT_BATCH_DIR, poll_interval=DEFAULT_POLL_INTERVAL, keep_content=False, grading_cache=None):
+    """
+    Evaluate a category through the batch API: one JSONL request file, one submission, one result file
 
-    simple_score = simple_result["accuracy"]
-    parallel_score = parallel_result["accuracy"]
-    multiple_score = multiple_result["accuracy"]
+    The prepared requests are the ones live mode sends, and each returned
+    response is scored by score_response exactly like a live response. A batch
+    that fails or expires as a whole turns every sample into a "batch_error"
+    record, so the other categories of the run are still reported.
 
-    average_score = (simple_score + parallel_score + multiple_score) / 3
-    print(f"Average score: {average_score}")
+    Returns:
+        Tuple of (eval_results, extra result fields)
+    """
+    requests = [(sample.id, sample.request) for sample in samples]
+    
+    start_time = time.time()
+    try:
+        batch_responses = run_batch(requests, api_client or client, os.path.join(work_dir, test_category), poll_interval)
+    except (TimeoutError, RuntimeError) as e:
+        batch_wall_time = time.time() - start_time
+        message = f"{type(e).__name__}: {e}"
+        print(f"Batch for {test_category} failed: {message}")
+        return [EvalRecord(sample.id, False, message, "batch_error") for sample in samples], {"batch_wall_time (seconds)": batch_wall_time, "batch_error": message}
+    batch_wall_time = time.time() - start_time
+    
+    eval_results = []
+    for sample in samples:
+        full_response = batch_responses.get(sample.id)
+        if isinstance(full_response, str) or full_response is None:
+            # The batch reported an error for this request, or left it out
+            eval_results.append(EvalRecord(sample.id, False, full_response or "Missing from batch output", "batch_error"))
+            continue
+        # Per-request latency does not exist in batch mode, so the wall time is amortised over the samples
+        eval_results.append(score_response(test_category, sample.function_description, sample.possible_answer, full_response, batch_wall_time / len(samples), sample.mode, function_lookup=sample.function_lookup, keep_content=keep_content, grading_cache=grading_cache))
+    
+    return eval_results, {"batch_wall_time (seconds)": batch_wall_time}
+
+
+def aggregate_results(eval_results):
+    """
+    Aggregate per-sample EvalRecords into accuracy, token usage and latency statistics
+    """
+    return ResultColumns.from_records(eval_results).aggregate()
+
+
+def fc_score(test_categories=CATEGORIES, **eval_kwargs):
+    """
+    Evaluate all categories in one overlapped run and print the average accuracy
+
+    Args:
+        test_categories: Categories to evaluate, simple, parallel and multiple by default
+        eval_kwargs: Extra keyword arguments for run_evaluations (data_dir, api_client, mode, template, batch, ...)
+    """
+    results = run_evaluations(test_categories, **eval_kwargs)
+
+    average_score = sum(results[category]["accuracy"] for category in test_categories) / len(test_categories)
+    low, high = macro_accuracy_ci(
+        [results[category]["total_count"] - results[category]["error_count"] for category in test_categories],
+        [results[category]["total_count"] for category in test_categories]
+    )
+    print(f"Average score: {average_score} (95% bootstrap CI {low:.4f} - {high:.4f})")
     return average_score
 
-fc_score()
\ No newline at end of file
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Run the function calling evaluation on all categories")
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--template", default="full", choices=list(PROMPT_TEMPLATES))
+    parser.add_argument("--batch", action="store_true", help="Submit each category through the batch API")
+    parser.add_argument("--batch-poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Live requests in flight at once; defaults to the tuned profile of this endpoint and model (see tune.py), else 1")
+    parser.add_argument("--profiles", default=DEFAULT_PROFILES_PATH, help="JSON file of concurrency profiles saved by tune.py")
+    parser.add_argument("--coalesce", action="store_true", help="Share one API call between identical in-flight requests")
+    parser.add_argument("--progress-every", type=int, default=0, help="Print running accuracies every N samples")
+    parser.add_argument("--progress", action="store_true", help="Show a live progress line (counts, accuracy, tokens/sec, retries, ETA) on stderr")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve live Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--ordering", default="fair", choices=ORDERING_POLICIES, help="Job order in the shared pool")
+    parser.add_argument("--results-db", default=None, help=f"Record every per-sample result in this SQLite file (e.g. {DEFAULT_RESULTS_DB})")
+    parser.add_argument("--run-id", default=None, help="Run name in the results database, a timestamp by default")
+    parser.add_argument("--hedge-percentile", type=float, default=None, help="Hedge live requests slower than this latency percentile, e.g. 95")
+    parser.add_argument("--max-tokens-factor", type=float, default=None,
+                        help="Cap each request at max_tokens from its ground truth times this factor, e.g. 3")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per sample failing with a network error, 429 or 5xx")
+    parser.add_argument("--retry-queue-size", type=int, default=100, help="Most samples waiting for a retry at once")
+    parser.add_argument("--dead-letter", default=DEFAULT_DEAD_LETTER_PATH, help="JSONL file receiving samples given up on, with tracebacks")
+    parser.add_argument("--grading-cache", nargs="?", const=DEFAULT_GRADING_CACHE, default=None,
+                        help=f"Reuse grades of outputs seen before, persisted in this SQLite file ({DEFAULT_GRADING_CACHE} if no path is given)")
+    parser.add_argument("--incremental", default=None, metavar="BASE_RUN_ID",
+                        help="Only call the model for samples whose request changed since this run in --results-db; re-grade or reuse the rest")
+    parser.add_argument("--backends", default=None, help="JSON file of backends to spread requests over (BACKENDS in config.py by default)")
+    parser.add_argument("--preflight", action="store_true", help="Validate every function schema first and stop if any is invalid")
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+    if args.incremental and not args.results_db:
+        parser.error("--incremental needs --results-db")
+
+    if args.preflight:
+        report = validate_sample_files(sample_file_paths(args.data_dir, CATEGORIES))
+        print_report(report)
+        if not report["valid"]:
+            sys.exit(1)
+
+    store = ResultsStore(args.results_db) if args.results_db else None
+    grading_cache = GradingCache(args.grading_cache) if args.grading_cache else None
+    api_client = None
+    if args.stub:
+        api_client = StubClient.from_data_dir(args.data_dir)
+        if args.batch:
+            api_client = LocalBatchProcessor(api_client)
+    elif not args.batch:
+        api_client = load_backend_pool(args.backends)
+    concurrency = args.concurrency
+    if concurrency is None:
+        concurrency = tuned_concurrency(api_client, path=args.profiles)
+        if concurrency is not None:
+            print(f"Concurrency {concurrency} from the tuned profile in {args.profiles}")
+    metrics = EvalMetrics() if args.progress or args.metrics_port is not None else None
+    with ExitStack() as live_views:
+        if args.metrics_port is not None:
+            print(f"Metrics at {live_views.enter_context(MetricsServer(metrics, args.metrics_port)).url}")
+        if args.progress:
+            live_views.enter_context(ProgressLine(metrics))
+        fc_score(
+            data_dir=args.data_dir,
+            api_client=api_client,
+            mode=args.mode,
+            template=args.template,
+            batch=args.batch,
+            batch_poll_interval=args.batch_poll_interval,
+            concurrency=concurrency or 1,
+            coalesce=args.coalesce,
+            progress_every=args.progress_every,
+            ordering=args.ordering,
+            store=store,
+            run_id=args.run_id,
+            hedge_percentile=args.hedge_percentile,
+            max_tokens_factor=args.max_tokens_factor,
+            max_attempts=args.max_attempts,
+            retry_queue_size=args.retry_queue_size,
+            dead_letter_path=args.dead_letter,
+            grading_cache=grading_cache,
+            incremental_base=args.incremental,
+            metrics=metrics
+        )
+    if api_client is not None and hasattr(api_client, "backends"):
+        print(f"Backends: {api_client.stats()}")
+    if store is not None:
+        store.close()
+    if grading_cache is not None:
+        print(f"Grading cache: {grading_cache.stats()}")
+        grading_cache.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
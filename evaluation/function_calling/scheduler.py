@@ -0,0 +1,130 @@
+import json
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import render_calls, turn_answers
+
+# Decoding a token takes far longer than prefilling one, so expected output weighs more
+OUTPUT_TOKEN_WEIGHT = 10.0
+
+
+def predict_job_cost(function_description: Dict[str, Any], possible_answer: Any) -> float:
+    """
+    Predict the relative cost of a sample from its request and ground truth
+
+    The prompt size comes from the question and the tool list, the expected output
+    length from the rendered ground-truth calls (so more calls cost more), both in
+    rough tokens of four characters. A multi-turn sample costs the user messages and
+    expected calls of all its turns.
+    """
+    questions = sum(len(message["content"]) for turn in function_description["question"] for message in turn)
+    prompt_tokens = (questions + len(json.dumps(function_description["function"]))) / 4
+    output_tokens = sum(len(render_calls(answer)) for answer in turn_answers(function_description, possible_answer)) / 4
+    return prompt_tokens + OUTPUT_TOKEN_WEIGHT * output_tokens
+
+
+def fifo_order(jobs_by_category: Dict[str, List[Any]]) -> List[Tuple[str, Any]]:
+    """
+    Keep file order: every job of the first category, then the next category, and so on
+    """
+    return [(category, job) for category, jobs in jobs_by_category.items() for job in jobs]
+
+
+def fair_order(jobs_by_category: Dict[str, List[Any]]) -> List[Tuple[str, Any]]:
+    """
+    Interleave the jobs of every category round-robin
+
+    Each category gets one slot per round until it runs out, so all categories
+    progress at the same rate and none waits behind another.
+
+    Returns:
+        List of (category, job) pairs in submission order
+    """
+    queues = {category: list(jobs) for category, jobs in jobs_by_category.items()}
+    order = []
+    position = 0
+    while any(position < len(jobs) for jobs in queues.values()):
+        for category, jobs in queues.items():
+            if position < len(jobs):
+                order.append((category, jobs[position]))
+        position += 1
+    return order
+
+
+def longest_first_order(jobs_by_category: Dict[str, List[Any]], cost: Callable[[str, Any], float]) -> List[Tuple[str, Any]]:
+    """
+    Order all jobs by predicted cost, most expensive first
+
+    Starting the long jobs first keeps them from landing at the end of the run,
+    where they would stretch the makespan while the rest of the pool sits idle.
+
+    Args:
+        jobs_by_category: Category -> jobs
+        cost: Called as cost(category, job), returns the predicted cost
+    """
+    order = fifo_order(jobs_by_category)
+    # sorted is stable, so equal costs keep file order
+    return sorted(order, key=lambda pair: -cost(*pair))
+
+
+ORDERING_POLICIES = ("fair", "fifo", "longest_first")
+
+
+def order_jobs(jobs_by_category: Dict[str, List[Any]], policy: str = "fair", cost: Callable[[str, Any], float] = None) -> List[Tuple[str, Any]]:
+    """
+    Order jobs with one of ORDERING_POLICIES; longest_first needs a cost function
+    """
+    if policy == "fair":
+        return fair_order(jobs_by_category)
+    elif policy == "fifo":
+        return fifo_order(jobs_by_category)
+    elif policy == "longest_first":
+        return longest_first_order(jobs_by_category, cost)
+    raise ValueError(f"Invalid ordering policy: {policy}")
+
+
+def run_jobs(
+        ordered_jobs: List[Tuple[str, Any]],
+        worker: Callable[[str, Any], Any],
+        concurrency: int = 1,
+        on_result: Callable[[str, Any, Any], None] = None
+) -> List[Any]:
+    """
+    Run jobs from every category in one shared worker pool
+
+    Jobs start in the given order (the pool queue is FIFO), at most concurrency at a time.
+
+    Args:
+        ordered_jobs: List of (category, job) pairs in submission order
+        worker: Called as worker(category, job) on a pool thread
+        concurrency: Number of jobs in flight at once
+        on_result: Optional callback on_result(category, job, result), called on the
+            submitting thread as soon as each job finishes
+
+    Returns:
+        Results aligned with ordered_jobs
+    """
+    results = [None] * len(ordered_jobs)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {
+            executor.submit(worker, category, job): index
+            for index, (category, job) in enumerate(ordered_jobs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if on_result is not None:
+                category, job = ordered_jobs[index]
+                on_result(category, job, results[index])
+    except BaseException:
+        # Drop the queued jobs instead of running them to completion before re-raising
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
@@ -0,0 +1,183 @@
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_CONFIDENCE = 0.95
+
+
+def _interval(estimates: np.ndarray, confidence: float) -> Tuple[float, float]:
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def accuracy_ci(correct: np.ndarray, resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE, seed: int = 0) -> Tuple[float, float]:
+    """
+    Percentile bootstrap interval of the accuracy of per-sample correctness
+
+    The number of correct samples in a resample of n 0/1 values is Binomial(n, accuracy),
+    so each resample is one binomial draw instead of n index lookups.
+
+    Args:
+        correct: Boolean array, one entry per scored sample
+        resamples: Bootstrap resamples
+        confidence: Coverage of the interval
+        seed: Seed of the resampling
+
+    Returns:
+        (low, high), (0, 0) for no samples
+    """
+    correct = np.asarray(correct, dtype=bool)
+    if correct.size == 0:
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    return _interval(rng.binomial(correct.size, correct.mean(), size=resamples) / correct.size, confidence)
+
+
+def macro_accuracy_ci(correct_counts: Sequence[int], total_counts: Sequence[int], resamples: int = DEFAULT_RESAMPLES,
+                      confidence: float = DEFAULT_CONFIDENCE, seed: int = 0) -> Tuple[float, float]:
+    """
+    Bootstrap interval of the mean of per-category accuracies (the average score of fc_score)
+
+    Categories are resampled independently, each with its own size, in one
+    (resamples x categories) binomial draw.
+    """
+    correct_counts = np.asarray(correct_counts, dtype=np.int64)
+    total_counts = np.asarray(total_counts, dtype=np.int64)
+    scored = total_counts > 0
+    if not scored.any():
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    draws = rng.binomial(total_counts[scored], correct_counts[scored] / total_counts[scored], size=(resamples, int(scored.sum())))
+    # Categories without samples count as 0, as in the average score
+    return _interval((draws / total_counts[scored]).sum(axis=1) / total_counts.size, confidence)
+
+
+def percentile_ci(values: np.ndarray, percentile: float, resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                  seed: int = 0) -> Tuple[float, float]:
+    """
+    Percentile bootstrap interval of a percentile (e.g. p95 latency or tokens)
+
+    A percentile only depends on two adjacent order statistics of the resample. A
+    resampled position is floor(n * U) for a uniform U, so the k-th smallest position
+    is floor(n * U_(k)), where U_(k) ~ Beta(k + 1, n - k) is the k-th smallest of n
+    uniforms, and the next one is U_(k) plus the smallest of the n - k - 1 uniforms
+    above it. Each resample is then two draws instead of n lookups and a sort.
+    Interpolates linearly, like np.percentile.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    n = values.size
+    if n == 0:
+        return 0.0, 0.0
+    position = (n - 1) * percentile / 100
+    lower = min(int(math.floor(position)), n - 1)
+    fraction = position - lower
+    rng = np.random.default_rng(seed)
+    lower_uniform = rng.beta(lower + 1, n - lower, size=resamples)
+    estimates = values[np.minimum((lower_uniform * n).astype(np.int64), n - 1)]
+    if fraction > 0:
+        upper_uniform = lower_uniform + (1 - lower_uniform) * rng.beta(1, n - lower - 1, size=resamples)
+        estimates = estimates * (1 - fraction) + values[np.minimum((upper_uniform * n).astype(np.int64), n - 1)] * fraction
+    return _interval(estimates, confidence)
+
+
+def paired_bootstrap(correct_a: np.ndarray, correct_b: np.ndarray, resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                     seed: int = 0) -> Dict[str, Any]:
+    """
+    Paired bootstrap of the accuracy difference b - a between two runs on the same samples
+
+    Resampling the pairs only changes how many of them fall in "only a correct" and
+    "only b correct", so each resample is one multinomial draw over the three kinds of
+    pair. The p-value is the two-sided share of resampled differences on the other side
+    of zero.
+
+    Args:
+        correct_a: Boolean correctness of the base run
+        correct_b: Boolean correctness of the new run, aligned with correct_a
+
+    Returns:
+        Dictionary with the difference, its interval and the p-value
+    """
+    correct_a = np.asarray(correct_a, dtype=bool)
+    correct_b = np.asarray(correct_b, dtype=bool)
+    if correct_a.shape != correct_b.shape:
+        raise ValueError(f"Runs are not aligned: {correct_a.size} and {correct_b.size} samples")
+    n = correct_a.size
+    if n == 0:
+        return {"difference": 0.0, "interval": (0.0, 0.0), "p_value": 1.0}
+    only_a = int((correct_a & ~correct_b).sum())
+    only_b = int((~correct_a & correct_b).sum())
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(n, [only_a / n, only_b / n, (n - only_a - only_b) / n], size=resamples)
+    differences = (draws[:, 1] - draws[:, 0]) / n
+    p_value = min(1.0, 2 * min(float((differences <= 0).mean()), float((differences >= 0).mean())))
+    return {"difference": (only_b - only_a) / n, "interval": _interval(differences, confidence), "p_value": p_value}
+
+
+def mcnemar(correct_a: np.ndarray, correct_b: np.ndarray) -> Dict[str, Any]:
+    """
+    Exact McNemar test between two runs on the same samples
+
+    Only the discordant pairs carry information; under the null hypothesis each of them
+    is equally likely to favour either run, so the p-value is a two-sided binomial tail.
+    """
+    correct_a = np.asarray(correct_a, dtype=bool)
+    correct_b = np.asarray(correct_b, dtype=bool)
+    if correct_a.shape != correct_b.shape:
+        raise ValueError(f"Runs are not aligned: {correct_a.size} and {correct_b.size} samples")
+    only_a = int((correct_a & ~correct_b).sum())
+    only_b = int((~correct_a & correct_b).sum())
+    discordant = only_a + only_b
+    tail = sum(math.comb(discordant, k) for k in range(min(only_a, only_b) + 1)) / 2 ** discordant if discordant else 1.0
+    return {"only_a_correct": only_a, "only_b_correct": only_b, "p_value": min(1.0, 2 * tail)}
+
+
+def align_runs(ids_a: List[str], correct_a: np.ndarray, ids_b: List[str], correct_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correctness of two runs restricted to the sample ids they share, in the same order
+    """
+    _, index_a, index_b = np.intersect1d(np.asarray(ids_a, dtype=str), np.asarray(ids_b, dtype=str), assume_unique=True, return_indices=True)
+    return np.asarray(correct_a, dtype=bool)[index_a], np.asarray(correct_b, dtype=bool)[index_b]
+
+
+def compare_runs(ids_a: List[str], correct_a: np.ndarray, ids_b: List[str], correct_b: np.ndarray, resamples: int = DEFAULT_RESAMPLES,
+                 confidence: float = DEFAULT_CONFIDENCE, seed: int = 0) -> Dict[str, Any]:
+    """
+    Paired bootstrap and McNemar test of run b against run a on their shared sample ids
+
+    Returns:
+        Dictionary with the paired sample count, both accuracies, the paired bootstrap
+        (difference, interval, p_value) and the McNemar test
+    """
+    aligned_a, aligned_b = align_runs(ids_a, correct_a, ids_b, correct_b)
+    return {
+        "paired_count": int(aligned_a.size),
+        "accuracy_a": float(aligned_a.mean()) if aligned_a.size else 0,
+        "accuracy_b": float(aligned_b.mean()) if aligned_b.size else 0,
+        "bootstrap": paired_bootstrap(aligned_a, aligned_b, resamples, confidence, seed),
+        "mcnemar": mcnemar(aligned_a, aligned_b)
+    }
+
+
+def column_intervals(columns: Any, resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE, seed: int = 0) -> Dict[str, Any]:
+    """
+    Bootstrap intervals of a category's accuracy and of its latency and token percentiles
+
+    Args:
+        columns: ResultColumns of the category; infra failures are left out, as in aggregate
+
+    Returns:
+        Dictionary of [low, high] intervals, with the confidence they were computed at
+    """
+    scored = ~columns.failed
+    latencies = columns.time_taken[scored]
+    total_tokens = (columns.input_tokens + columns.output_tokens)[scored]
+    return {
+        "confidence": confidence,
+        "accuracy": list(accuracy_ci(columns.valid[scored], resamples, confidence, seed)),
+        "latency_p50 (seconds)": list(percentile_ci(latencies, 50, resamples, confidence, seed)),
+        "latency_p95 (seconds)": list(percentile_ci(latencies, 95, resamples, confidence, seed)),
+        "percentile_95_token_usage": list(percentile_ci(total_tokens, 95, resamples, confidence, seed))
+    }
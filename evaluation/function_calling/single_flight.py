@@ -0,0 +1,89 @@
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+def request_key(request: Dict[str, Any], api_client: Any = None) -> str:
+    """
+    Fingerprint a chat completion request
+
+    Two requests share a key only if their bodies are byte-identical once
+    serialized with sorted keys and they go to the same client.
+    """
+    body = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{id(api_client)}:{body}".encode("utf-8")).hexdigest()
+
+
+def is_deterministic(request: Dict[str, Any]) -> bool:
+    """Only greedy single-choice requests are safe to share between callers."""
+    return request.get("temperature", 1.0) == 0.0 and request.get("n", 1) == 1
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-process single-flight request coalescing
+
+    While a call for a key is in flight, later callers with the same key wait
+    for it and share its result instead of issuing their own call. Nothing is
+    cached: once the call returns, the next caller starts a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.hits = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per in-flight key
+
+        Returns:
+            Tuple of (result, shared), where shared is True for callers that
+            reused another caller's result
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.hits += 1
+                leader = False
+            else:
+                call = _Call()
+                self._in_flight[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "hits": self.hits}
+
+
+# Shared by every evaluation in the process, so duplicates across categories, models and runs coalesce
+REQUEST_COALESCER = SingleFlight()
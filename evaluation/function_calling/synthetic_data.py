@@ -0,0 +1,525 @@
+import json
+import os
+import sys
+import random
+import argparse
+import itertools
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Dict, Any, Tuple, Union
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_processing.fixed_check_function_format import function_format_check
+from function_calling.fc_utils import CATEGORIES, render_value, render_calls
+
+# Parameter types that survive a round trip through convert_output_to_json and ast_checker
+DEFAULT_TYPE_MIX = {
+    "string": 0.4,
+    "integer": 0.2,
+    "float": 0.2,
+    "number": 0.1,
+    "boolean": 0.1,
+}
+
+DOMAINS = ["finance", "weather", "geometry", "physics", "travel", "nutrition", "music", "sports", "chemistry", "library"]
+VERBS = ["calculate", "get", "find", "estimate", "convert", "lookup", "schedule", "compare", "predict", "measure"]
+NOUNS = ["rate", "forecast", "area", "energy", "route", "calories", "tempo", "score", "density", "inventory",
+         "distance", "balance", "volume", "duration", "price", "ranking", "pressure", "capacity", "humidity", "yield"]
+PARAM_NAMES = ["amount", "city", "radius", "mass", "velocity", "days", "language", "currency", "height", "width",
+               "depth", "year", "count", "label", "unit", "country", "team", "genre", "temperature", "quantity",
+               "category", "level", "origin", "destination", "precision", "verbose", "limit", "ratio", "weight", "speed"]
+STRING_VALUES = ["London", "Berlin", "Tokyo", "Cape Town", "almonds", "jazz", "USD", "EUR", "Italian", "metric",
+                 "imperial", "Lakers", "oxygen", "granite", "morning", "Paris", "Nairobi", "Lima", "espresso", "violin"]
+
+
+def _pick_count(rng: random.Random, value: Union[int, Tuple[int, int]]) -> int:
+    """Resolve an exact count or an inclusive (min, max) range to a concrete count."""
+    if isinstance(value, (tuple, list)):
+        return rng.randint(value[0], value[1])
+    return value
+
+
+def generate_value(rng: random.Random, param_type: str) -> Any:
+    """
+    Generate a ground-truth value for a parameter type
+
+    Values are chosen so that their rendered form parses back to the same value
+    (no commas or quotes in strings, floats always carry a decimal point).
+    """
+    if param_type == "string":
+        return rng.choice(STRING_VALUES)
+    elif param_type == "integer":
+        return rng.randint(1, 500)
+    elif param_type in ("float", "number"):
+        return round(rng.uniform(0.5, 999.0), 2)
+    elif param_type == "boolean":
+        return rng.choice([True, False])
+    raise ValueError(f"Unsupported parameter type: {param_type}")
+
+
+def generate_function(rng: random.Random, name: str, num_params: int, type_mix: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Generate one function definition in the FC-samples schema
+
+    Args:
+        rng: Random generator
+        name: Fully qualified function name
+        num_params: Number of parameters (all required)
+        type_mix: Relative weights of parameter types
+
+    Returns:
+        Function definition that passes function_format_check
+    """
+    types = list(type_mix.keys())
+    weights = list(type_mix.values())
+    param_names = rng.sample(PARAM_NAMES, num_params)
+    properties = {}
+    for param_name in param_names:
+        param_type = rng.choices(types, weights=weights)[0]
+        properties[param_name] = {
+            "type": param_type,
+            "description": f"The {param_name.replace('_', ' ')} to use."
+        }
+    function = {
+        "name": name,
+        "description": f"{name.split('.')[-1].replace('_', ' ').capitalize()} for the {name.split('.')[0]} domain.",
+        "parameters": {
+            "type": "object",
+            "properties": properties,
+            "required": list(param_names)
+        }
+    }
+    is_valid, message = function_format_check(function)
+    if not is_valid:
+        raise ValueError(f"Generated function {name} failed format check: {message}")
+    return function
+
+
+def generate_arguments(rng: random.Random, function: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate ground-truth arguments for every parameter of a function."""
+    return {
+        param_name: generate_value(rng, param_info["type"])
+        for param_name, param_info in function["parameters"]["properties"].items()
+    }
+
+
+def _describe_arguments(arguments: Dict[str, Any]) -> str:
+    return " and ".join(f"{key} {render_value(value)}" for key, value in arguments.items())
+
+
+def generate_samples(
+        category: str,
+        n: int,
+        num_functions: Union[int, Tuple[int, int]] = (2, 4),
+        num_params: Union[int, Tuple[int, int]] = (1, 4),
+        num_calls: Union[int, Tuple[int, int]] = 2,
+        type_mix: Dict[str, float] = None,
+        seed: int = 0,
+        id_prefix: str = None,
+        num_turns: int = 1
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Generate a synthetic test suite for one category
+
+    Args:
+        category: Type of function calling (simple, parallel, multiple)
+        n: Number of samples to generate
+        num_functions: Functions offered per sample, exact or (min, max)
+        num_params: Parameters per function, exact or (min, max)
+        num_calls: Expected calls per sample for parallel/multiple, exact or (min, max)
+        type_mix: Relative weights of parameter types, defaults to DEFAULT_TYPE_MIX
+        seed: Random seed; the same arguments always produce the same suite
+        id_prefix: Sample id prefix, defaults to "{category}_synth"
+        num_turns: User turns per conversation; with more than one, ground_truth
+            holds one entry per turn, all turns sharing the sample's functions
+
+    Returns:
+        Tuple of (samples, answers) in the FC-samples / FC-answers schemas
+    """
+    if category not in CATEGORIES:
+        raise ValueError(f"Invalid test category: {category}")
+    type_mix = type_mix or DEFAULT_TYPE_MIX
+    unsupported = set(type_mix) - set(DEFAULT_TYPE_MIX)
+    if unsupported:
+        raise ValueError(f"Unsupported parameter types in type_mix: {sorted(unsupported)}")
+    id_prefix = id_prefix or f"{category}_synth"
+    rng = random.Random(f"{seed}:{category}")
+
+    samples = []
+    answers = []
+    for i in range(n):
+        sample_id = f"{id_prefix}_{i}"
+        calls = 1 if category == "simple" else max(2, _pick_count(rng, num_calls))
+        function_count = max(_pick_count(rng, num_functions), calls if category == "multiple" else 1)
+
+        names = set()
+        while len(names) < function_count:
+            names.add(f"{rng.choice(DOMAINS)}.{rng.choice(VERBS)}_{rng.choice(NOUNS)}")
+        # Sort before shuffling so the order does not depend on string hash randomisation
+        names = sorted(names)
+        rng.shuffle(names)
+        functions = [generate_function(rng, name, _pick_count(rng, num_params), type_mix) for name in names]
+
+        questions = []
+        ground_truths = []
+        for turn in range(num_turns):
+            label = f"Request {i}" if num_turns == 1 else f"Request {i}, turn {turn + 1}"
+            # ast_checker reads the target of simple and parallel samples from function[0]
+            if category == "simple":
+                arguments = generate_arguments(rng, functions[0])
+                ground_truth = {functions[0]["name"]: arguments}
+                question = f"{label}: {functions[0]['description'][:-1].lower()} with {_describe_arguments(arguments)}."
+            elif category == "parallel":
+                ground_truth = [{functions[0]["name"]: generate_arguments(rng, functions[0])} for _ in range(calls)]
+                parts = [_describe_arguments(call[functions[0]["name"]]) for call in ground_truth]
+                question = f"{label}: {functions[0]['description'][:-1].lower()} with {parts[0]}, then repeat with " + ", then with ".join(parts[1:]) + "."
+            else:
+                targets = rng.sample(functions, calls)
+                ground_truth = [{target["name"]: generate_arguments(rng, target)} for target in targets]
+                parts = [
+                    f"{target['description'][:-1].lower()} with {_describe_arguments(call[target['name']])}"
+                    for target, call in zip(targets, ground_truth)
+                ]
+                question = f"{label}: " + ". Also, ".join(parts) + "."
+            questions.append(question)
+            ground_truths.append(ground_truth)
+
+        samples.append({
+            "id": sample_id,
+            "question": [[{"role": "user", "content": question}] for question in questions],
+            "function": functions
+        })
+        answers.append({
+            "id": sample_id,
+            "ground_truth": ground_truths[0] if num_turns == 1 else ground_truths
+        })
+    return samples, answers
+
+
+def write_dataset(output_dir: str, category: str, samples: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Write a suite using the same layout as the bundled data, so output_dir can be passed as data_dir to run_evaluation
+
+    Returns:
+        Tuple of (samples_path, answers_path)
+    """
+    samples_path = os.path.join(output_dir, "FC-samples", f"{category}_FC.json")
+    answers_path = os.path.join(output_dir, "FC-answers", f"{category}_FC_answers.json")
+    os.makedirs(os.path.dirname(samples_path), exist_ok=True)
+    os.makedirs(os.path.dirname(answers_path), exist_ok=True)
+    with open(samples_path, "w") as f:
+        json.dump(samples, f, indent=2)
+    with open(answers_path, "w") as f:
+        json.dump(answers, f, indent=2)
+    return samples_path, answers_path
+
+
+def _near_miss(rng: random.Random, ground_truth: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """Copy a ground truth entry with exactly one mistake in it."""
+    calls = json.loads(json.dumps(ground_truth if isinstance(ground_truth, list) else [ground_truth]))
+    call = rng.choice(calls)
+    function_name = list(call.keys())[0]
+    arguments = call[function_name]
+    mistake = rng.choice(["value", "name", "missing"] if arguments else ["name"])
+    if mistake == "name":
+        call[function_name + "_v2"] = call.pop(function_name)
+    elif mistake == "missing" and len(arguments) > 1:
+        arguments.pop(rng.choice(list(arguments)))
+    else:
+        key = rng.choice(list(arguments))
+        value = arguments[key]
+        if isinstance(value, bool):
+            arguments[key] = not value
+        elif isinstance(value, int):
+            arguments[key] = value + 1
+        elif isinstance(value, float):
+            arguments[key] = round(value * 1.5 + 1, 2)
+        else:
+            arguments[key] = rng.choice([s for s in STRING_VALUES if s != value])
+    return calls if isinstance(ground_truth, list) else calls[0]
+
+
+def _malformed(rng: random.Random, ground_truth: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
+    """Render an output that convert_output_to_json cannot turn into calls."""
+    correct = render_calls(ground_truth)
+    return rng.choice([
+        correct[1:-1],
+        correct[:-1],
+        f"Sure! I would call {correct[1:-1]} to answer that.",
+        "",
+    ])
+
+
+def _runaway(rng: random.Random, ground_truth: Union[Dict[str, Any], List[Dict[str, Any]]], tokens: int) -> str:
+    """Render a completion that rambles for about the given number of tokens before the calls."""
+    filler = rng.choice([
+        "Let me think about which function fits this request. ",
+        "First I will restate the request to be sure I understand it. ",
+        "There are several parameters to consider here, so let me go through them one by one. "
+    ])
+    return (filler * (tokens * 4 // len(filler) + 1))[:tokens * 4] + render_calls(ground_truth)
+
+
+def _truncate_message(message: Any, max_tokens: int) -> Tuple[Any, bool]:
+    """Cut a completion message down to max_tokens, like a provider stopping with finish_reason "length"."""
+    if max_tokens is None or StubClient.message_tokens(message) <= max_tokens:
+        return message, False
+    if not message.tool_calls:
+        return SimpleNamespace(role="assistant", content=message.content[:max_tokens * 4], tool_calls=None), True
+    tool_calls = []
+    remaining = max_tokens * 4
+    for call in message.tool_calls:
+        if remaining <= 0:
+            break
+        arguments = call.function.arguments[:max(remaining - len(call.function.name), 0)]
+        remaining -= len(call.function.name) + len(arguments)
+        tool_calls.append(SimpleNamespace(id=call.id, type=call.type, function=SimpleNamespace(name=call.function.name, arguments=arguments)))
+    return SimpleNamespace(role="assistant", content=None, tool_calls=tool_calls), True
+
+
+def _count_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class StubRateLimitError(Exception):
+    """Raised by StubClient above its concurrency limit, like an HTTP 429 from a provider."""
+    status_code = 429
+
+
+class StubClient:
+    """
+    Offline stand-in for the OpenAI client that answers from the ground truth
+
+    Each sample gets a correct, near-miss, malformed or runaway (rambling for
+    runaway_tokens before the calls) completion according to the configured
+    ratios. max_tokens is honoured by cutting the completion and reporting
+    finish_reason "length". With max_concurrency set, a request arriving while
+    that many are in flight fails with StubRateLimitError (HTTP 429). The choice is seeded by the sample id, so repeated
+    runs produce identical outputs. Only client.chat.completions.create is
+    implemented, returning objects shaped like the OpenAI response; when
+    tools= is passed the calls come back as native tool_calls.
+    """
+
+    def __init__(
+            self,
+            samples: List[Dict[str, Any]],
+            answers: List[Dict[str, Any]],
+            correct_ratio: float = 0.8,
+            near_miss_ratio: float = 0.1,
+            malformed_ratio: float = 0.1,
+            latency: float = 0.0,
+            seed: int = 0,
+            prompt_token_latency: float = 0.0,
+            output_token_latency: float = 0.0,
+            straggler_ratio: float = 0.0,
+            straggler_factor: float = 8.0,
+            runaway_ratio: float = 0.0,
+            runaway_tokens: int = 2000,
+            max_concurrency: int = None
+    ):
+        answer_table = {answer["id"]: answer["ground_truth"] for answer in answers}
+        self.by_question = {}
+        for sample in samples:
+            if sample["id"] in answer_table:
+                turns = sample["question"]
+                if len(turns) == 1:
+                    self.by_question[turns[0][0]["content"]] = (sample["id"], answer_table[sample["id"]])
+                    continue
+                # Multi-turn ground truth holds one entry per turn
+                for turn, (messages, ground_truth) in enumerate(zip(turns, answer_table[sample["id"]])):
+                    self.by_question[messages[-1]["content"]] = (f"{sample['id']}:turn{turn + 1}", ground_truth)
+        total = correct_ratio + near_miss_ratio + malformed_ratio + runaway_ratio
+        if total <= 0:
+            raise ValueError("At least one outcome ratio must be positive")
+        self.ratios = {
+            "correct": correct_ratio / total,
+            "near_miss": near_miss_ratio / total,
+            "malformed": malformed_ratio / total,
+            "runaway": runaway_ratio / total,
+        }
+        self.runaway_tokens = runaway_tokens
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        # Simulated latency: fixed overhead plus prefill and decode time per token
+        self.latency = latency
+        self.prompt_token_latency = prompt_token_latency
+        self.output_token_latency = output_token_latency
+        # A seeded share of calls (not samples) takes straggler_factor times as long, like a provider's slow tail
+        self.straggler_ratio = straggler_ratio
+        self.straggler_factor = straggler_factor
+        self.seed = seed
+        self.call_count = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        # Hashes of every tools + message prefix seen, to report prompt-cache hits like a provider would
+        self._seen_prefixes = set()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    @classmethod
+    def from_data_dir(cls, data_dir: str = "..", categories=CATEGORIES, **kwargs) -> "StubClient":
+        """Build a stub that answers every sample of the given categories in a data directory."""
+        samples = []
+        answers = []
+        for category in categories:
+            with open(os.path.join(data_dir, "FC-samples", f"{category}_FC.json"), "r") as f:
+                samples.extend(json.load(f))
+            with open(os.path.join(data_dir, "FC-answers", f"{category}_FC_answers.json"), "r") as f:
+                answers.extend(json.load(f))
+        return cls(samples, answers, **kwargs)
+
+    def outcome(self, sample_id: str, choice_index: int = 0) -> str:
+        """Return which kind of completion ("correct", "near_miss", "malformed", "runaway") a sample gets."""
+        rng = random.Random(f"{self.seed}:{sample_id}:{choice_index}")
+        return rng.choices(list(self.ratios.keys()), weights=list(self.ratios.values()))[0]
+
+    def completion_text(self, sample_id: str, ground_truth: Any, choice_index: int = 0) -> str:
+        """Render the completion text a sample gets for a given choice index."""
+        rng = random.Random(f"{self.seed}:{sample_id}:{choice_index}:text")
+        outcome = self.outcome(sample_id, choice_index)
+        if outcome == "correct":
+            return render_calls(ground_truth)
+        elif outcome == "near_miss":
+            return render_calls(_near_miss(rng, ground_truth))
+        elif outcome == "runaway":
+            return _runaway(rng, ground_truth, self.runaway_tokens)
+        return _malformed(rng, ground_truth)
+
+    def completion_message(self, sample_id: str, ground_truth: Any, choice_index: int = 0, native: bool = False) -> Any:
+        """Build the assistant message for a sample, as content text or as native tool_calls."""
+        if not native:
+            content = self.completion_text(sample_id, ground_truth, choice_index)
+            return SimpleNamespace(role="assistant", content=content, tool_calls=None)
+
+        rng = random.Random(f"{self.seed}:{sample_id}:{choice_index}:text")
+        outcome = self.outcome(sample_id, choice_index)
+        if outcome == "runaway":
+            return SimpleNamespace(role="assistant", content=_runaway(rng, ground_truth, self.runaway_tokens), tool_calls=None)
+        if outcome == "malformed" and rng.random() < 0.5:
+            return SimpleNamespace(role="assistant", content=_malformed(rng, ground_truth), tool_calls=None)
+        calls = _near_miss(rng, ground_truth) if outcome == "near_miss" else ground_truth
+        calls = calls if isinstance(calls, list) else [calls]
+        tool_calls = []
+        for i, call in enumerate(calls):
+            function_name = list(call.keys())[0]
+            arguments = json.dumps(call[function_name])
+            if outcome == "malformed":
+                arguments = arguments[:-1]
+            tool_calls.append(SimpleNamespace(
+                id=f"call_{i}",
+                type="function",
+                function=SimpleNamespace(name=function_name, arguments=arguments)
+            ))
+        return SimpleNamespace(role="assistant", content=None, tool_calls=tool_calls)
+
+    @staticmethod
+    def message_tokens(message: Any) -> int:
+        """Estimate completion tokens for a content or tool_calls message."""
+        if message.tool_calls:
+            return sum(_count_tokens(call.function.name + call.function.arguments) for call in message.tool_calls)
+        return _count_tokens(message.content)
+
+    def create(self, model: str = None, messages: List[Dict[str, Any]] = None, tools: List[Dict[str, Any]] = None, n: int = 1, temperature: float = 0.0, max_tokens: int = None, **kwargs) -> Any:
+        with self._lock:
+            self.call_count += 1
+            response_id = next(self._ids)
+            if self.max_concurrency is not None and self.in_flight >= self.max_concurrency:
+                raise StubRateLimitError(f"Rate limit reached: {self.max_concurrency} requests in flight")
+            self.in_flight += 1
+        try:
+            return self._respond(response_id, model, messages, tools, n, temperature, max_tokens)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _respond(self, response_id: int, model: str, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]], n: int, temperature: float, max_tokens: int) -> Any:
+
+        question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        messages_out = []
+        for choice_index in range(n):
+            if question in self.by_question:
+                sample_id, ground_truth = self.by_question[question]
+                # Greedy decoding gives every choice the same completion
+                messages_out.append(self.completion_message(sample_id, ground_truth, choice_index if temperature > 0 else 0, native=bool(tools)))
+            else:
+                messages_out.append(SimpleNamespace(role="assistant", content="I could not find a matching function for this request.", tool_calls=None))
+        truncations = [_truncate_message(message, max_tokens) for message in messages_out]
+        messages_out = [message for message, _ in truncations]
+
+        # Providers render the tools parameter into the prompt, so it is billed as prompt tokens
+        prompt_tokens = _count_tokens(json.dumps(tools, separators=(",", ":"))) if tools else 0
+        prefix = hashlib.sha256(json.dumps(tools, sort_keys=True).encode("utf-8"))
+        cached_tokens = 0
+        prefix_hashes = []
+        for message in messages:
+            prefix.update(json.dumps(message, sort_keys=True, default=str).encode("utf-8"))
+            prompt_tokens += _count_tokens(message.get("content") or "")
+            prefix_hashes.append((prefix.hexdigest(), prompt_tokens))
+        with self._lock:
+            # The longest message prefix already seen is served from the cache
+            for prefix_hash, prefix_tokens in prefix_hashes:
+                if prefix_hash in self._seen_prefixes:
+                    cached_tokens = prefix_tokens
+            self._seen_prefixes.update(prefix_hash for prefix_hash, _ in prefix_hashes)
+        completion_tokens = sum(self.message_tokens(message) for message in messages_out)
+        delay = self.latency + (prompt_tokens - cached_tokens) * self.prompt_token_latency + completion_tokens * self.output_token_latency
+        if self.straggler_ratio and random.Random(f"{self.seed}:call:{response_id}").random() < self.straggler_ratio:
+            delay *= self.straggler_factor
+        if delay:
+            time.sleep(delay)
+        return SimpleNamespace(
+            id=f"stub-{response_id}",
+            model=model,
+            choices=[
+                SimpleNamespace(
+                    index=choice_index,
+                    message=message,
+                    finish_reason="length" if truncated else "tool_calls" if message.tool_calls else "stop"
+                )
+                for choice_index, (message, truncated) in enumerate(truncations)
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic FC-samples / FC-answers suites")
+    parser.add_argument("--output-dir", default="../synthetic", help="Directory that receives FC-samples/ and FC-answers/")
+    parser.add_argument("--n", type=int, default=1000, help="Samples per category")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--num-functions", type=int, nargs=2, default=(2, 4), metavar=("MIN", "MAX"))
+    parser.add_argument("--num-params", type=int, nargs=2, default=(1, 4), metavar=("MIN", "MAX"))
+    parser.add_argument("--num-calls", type=int, nargs=2, default=(2, 3), metavar=("MIN", "MAX"),
+                        help="Calls per parallel/multiple sample")
+    parser.add_argument("--type-mix", type=json.loads, default=None,
+                        help='JSON weights, e.g. \'{"string": 0.5, "integer": 0.5}\'')
+    parser.add_argument("--num-turns", type=int, default=1, help="User turns per conversation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for category in args.categories:
+        samples, answers = generate_samples(
+            category,
+            args.n,
+            num_functions=tuple(args.num_functions),
+            num_params=tuple(args.num_params),
+            num_calls=tuple(args.num_calls),
+            type_mix=args.type_mix,
+            seed=args.seed,
+            num_turns=args.num_turns
+        )
+        samples_path, answers_path = write_dataset(args.output_dir, category, samples, answers)
+        print(f"{category}: wrote {len(samples)} samples to {samples_path} and answers to {answers_path}")
+
+
+if __name__ == "__main__":
+    main()
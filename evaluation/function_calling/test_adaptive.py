@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Offline tests for sequential early-stopping evaluation
+"""
+
+from function_calling.adaptive import wilson_interval, bayes_interval, run_adaptive_evaluation
+
+
+def test_intervals():
+    """Wilson matches the textbook value and the Beta posterior interval agrees roughly"""
+    low, high = wilson_interval(8, 10)
+    assert abs(low - 0.4902) < 1e-3 and abs(high - 0.9433) < 1e-3
+    low, high = bayes_interval(80, 100)
+    assert 0.70 < low < 0.73 and 0.86 < high < 0.88
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_early_stopping_saves_calls(make_suite):
+    """A wide target stops early, a baseline far away stops at the minimum sample count"""
+    suite = make_suite("simple", 200, seed=12)
+
+    stub = suite.stub(correct_ratio=0.9, near_miss_ratio=0.05, malformed_ratio=0.05)
+    report = run_adaptive_evaluation(["simple"], data_dir=suite.data_dir, api_client=stub, concurrency=10, target_width=0.2)
+    adaptive = report["simple"]["adaptive"]
+    assert adaptive["stop_reason"] == "narrow"
+    assert adaptive["interval"][1] - adaptive["interval"][0] <= 0.2
+    assert adaptive["api_calls_saved"] == 200 - stub.call_count > 0
+
+    stub = suite.perfect_stub()
+    report = run_adaptive_evaluation(["simple"], data_dir=suite.data_dir, api_client=stub, concurrency=5,
+                                     target_width=0.0, baseline={"simple": 0.3}, min_samples=10, method="bayes")
+    assert report["simple"]["adaptive"]["stop_reason"] == "above_baseline"
+    assert report["simple"]["total_count"] == 10
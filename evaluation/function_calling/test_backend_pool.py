@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the multi-backend pool with circuit breakers
+"""
+
+import time
+from types import SimpleNamespace
+
+from function_calling.backend_pool import Backend, BackendPool, CircuitBreaker
+from function_calling.results_store import ResultsStore
+
+
+class DownClient:
+    """A backend in an outage: every request fails"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise ConnectionError("endpoint down")
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class RejectingClient(DownClient):
+    """A healthy backend that rejects every request as malformed"""
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise BadRequest("invalid tool schema")
+
+
+def test_circuit_breaker_cycle():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one trial at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_pool_fails_over_and_records_the_backend(make_suite):
+    """An outage costs a few failed attempts, then its circuit opens; every sample still scores"""
+    suite = make_suite("simple", 80, seed=6)
+    plain = suite.run()
+
+    down = DownClient()
+    pool = BackendPool([
+        Backend("primary", suite.stub(), weight=3.0),
+        Backend("secondary", suite.stub(), weight=1.0),
+        Backend("outage", down, weight=4.0, failure_threshold=3, cooldown=60.0),
+    ])
+    report = suite.run(pool, concurrency=4)
+    assert report["accuracy"] == plain["accuracy"]
+    # Requests already choosing the backend when its circuit opened may still reach it
+    assert 3 <= down.calls < 8
+    assert sum(report["backends"].values()) == 80
+    assert set(report["backends"]) == {"primary", "secondary"}
+    assert report["backends"]["primary"] > report["backends"]["secondary"]
+
+    stats = pool.stats()
+    assert stats["outage"]["circuit"] == "open"
+    assert stats["primary"]["failures"] == 0
+
+
+def test_non_transient_errors_do_not_fail_over(make_suite):
+    """A rejected request says nothing about the backend: no failover, no breaker failure"""
+    suite = make_suite("simple", 10, seed=6)
+    rejecting = RejectingClient()
+    standby = suite.stub()
+    pool = BackendPool([
+        Backend("rejecting", rejecting, failure_threshold=1),
+        Backend("standby", standby, weight=1e-9),
+    ])
+    report = suite.run(pool, max_attempts=1)
+    assert rejecting.calls == 10 and standby.call_count == 0
+    assert report["infra_failure_count"] == 10
+    assert pool.stats()["rejecting"]["circuit"] == "closed"
+    assert pool.stats()["rejecting"]["failures"] == 0
+
+
+def test_rows_are_stored_under_the_served_model(make_suite, tmp_path):
+    suite = make_suite("simple", 10, seed=6)
+    pool = BackendPool([Backend("alias", suite.stub(), model="org/alias-model")])
+    store = ResultsStore(str(tmp_path / "results.db"))
+    suite.run(pool, store=store, run_id="run")
+    assert [row["model"] for row in store.run_summary("run")] == ["org/alias-model"]
+    store.close()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Offline tests for batch submission mode against the local batch stand-in
+"""
+
+import os
+import json
+from types import SimpleNamespace
+
+from function_calling.batch_mode import LocalBatchProcessor
+from function_calling.results_store import ResultsStore
+from function_calling.run_eval import run_evaluations
+
+
+def test_batch_mode_matches_live_mode(make_suite, tmp_path):
+    """Batch results are scored exactly like live responses to the same requests"""
+    suite = make_suite("parallel", 25, seed=7)
+    samples = suite.samples
+    batch_client = LocalBatchProcessor(suite.stub())
+
+    live = suite.run()
+    batch = suite.run(batch_client, batch=True, batch_dir=str(tmp_path / "batches"), batch_poll_interval=0.01)
+
+    assert batch["accuracy"] == live["accuracy"]
+    assert batch["token_usage"]["total_tokens"] == live["token_usage"]["total_tokens"]
+    assert batch_client.chat_client.call_count == 25
+
+    # The request file holds one chat completion body per sample, with the live messages
+    batch_files = os.listdir(tmp_path / "batches" / "parallel")
+    lines = [json.loads(line) for line in open(tmp_path / "batches" / "parallel" / batch_files[0])]
+    assert [line["custom_id"] for line in lines] == [sample["id"] for sample in samples]
+    assert lines[0]["body"]["messages"][1]["content"] == samples[0]["question"][0][0]["content"]
+
+
+def test_failed_batch_requests_are_reported(make_suite, tmp_path):
+    """Requests the batch could not serve count as infra failures instead of aborting the run"""
+    suite = make_suite("simple", 5, seed=8)
+    stub = suite.perfect_stub()
+    create = stub.create
+
+    def flaky_create(**kwargs):
+        if suite.samples[0]["question"][0][0]["content"] in kwargs["messages"][1]["content"]:
+            raise ConnectionError("upstream timeout")
+        return create(**kwargs)
+
+    stub.chat.completions.create = flaky_create
+    store = ResultsStore(str(tmp_path / "results.db"))
+    result = suite.run(LocalBatchProcessor(stub), batch=True, batch_dir=str(tmp_path / "batches"), batch_poll_interval=0.01, store=store, run_id="batch")
+    assert result["total_count"] == 4
+    assert result["error_count"] == 0
+    assert result["infra_failure_count"] == 1
+    # The store leaves infra failures out, as in live mode, and agrees with the report
+    summary, = store.run_summary("batch")
+    assert summary["total_count"] == 4 and summary["accuracy"] == result["accuracy"]
+    store.close()
+
+
+def test_failed_batch_leaves_the_other_categories(make_suite, tmp_path):
+    """A batch that expires as a whole turns its samples into infra failures; the next category's batch is still scored"""
+    make_suite("simple", 6, seed=9)
+    suite = make_suite("parallel", 8, seed=9)
+    batch_client = LocalBatchProcessor(suite.perfect_stub())
+    retrieve = batch_client.batches.retrieve
+    expired = {}
+
+    def expire_first_batch(batch_id):
+        if expired.setdefault("id", batch_id) == batch_id:
+            return SimpleNamespace(id=batch_id, status="expired", output_file_id=None, error_file_id=None)
+        return retrieve(batch_id)
+
+    batch_client.batches.retrieve = expire_first_batch
+    report = run_evaluations(["simple", "parallel"], data_dir=suite.data_dir, api_client=batch_client, batch=True,
+                             batch_dir=str(tmp_path / "batches"), batch_poll_interval=0.01)
+    assert report["simple"]["total_count"] == 0 and report["simple"]["infra_failure_count"] == 6
+    assert report["simple"]["batch_error"].startswith("RuntimeError: Batch batch-local-1 ended with status expired")
+    assert report["parallel"]["accuracy"] == 1.0 and report["parallel"]["infra_failure_count"] == 0
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the end-to-end harness benchmark and its regression gate
+"""
+
+
+from function_calling.benchmark import benchmark_suite, compare_to_baseline
+
+
+def test_fake_server_scores_like_the_stub(make_suite):
+    suite = make_suite("parallel", 30, seed=3)
+    direct = suite.run()
+
+    result = benchmark_suite(["parallel"], suite.data_dir, repeat=1)
+    assert result["samples"] == 30
+    assert result["accuracy"]["parallel"] == direct["accuracy"]
+    assert result["samples_per_second"] > 0
+    assert all(micros > 0 for micros in result["stage_us"].values())
+    assert result["calibration_us"] > 0
+
+
+def test_gate_flags_slowdowns_and_accuracy_changes():
+    baseline = {"suite": {"accuracy": {"simple": 0.8}, "samples_per_second": 1000.0, "stage_us": {"request": 900.0, "check": 5.0}, "calibration_us": 20.0}}
+    within = {"suite": {"accuracy": {"simple": 0.8}, "samples_per_second": 800.0, "stage_us": {"request": 1100.0, "check": 9.0}, "calibration_us": 20.0}}
+    assert compare_to_baseline(within, baseline, tolerance=0.3) == []
+
+    regressed = {"suite": {"accuracy": {"simple": 0.79}, "samples_per_second": 600.0, "stage_us": {"request": 1300.0, "check": 9.0}, "calibration_us": 20.0}}
+    regressions = compare_to_baseline(regressed, baseline, tolerance=0.3)
+    assert len(regressions) == 3
+    assert any("accuracy" in regression for regression in regressions)
+
+    # A host half as fast runs the calibration loop half as fast too: no regression
+    slower_host = {"suite": {"accuracy": {"simple": 0.8}, "samples_per_second": 500.0, "stage_us": {"request": 1800.0, "check": 10.0}, "calibration_us": 40.0}}
+    assert compare_to_baseline(slower_host, baseline, tolerance=0.3) == []
+    # The same timings on a host as fast as the baseline's are a regression
+    slower_host["suite"]["calibration_us"] = 20.0
+    assert len(compare_to_baseline(slower_host, baseline, tolerance=0.3)) == 2
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Offline tests for native function calling, prompt templates and the variant comparison reports
+"""
+
+from types import SimpleNamespace
+
+from function_calling.fc_utils import convert_tool_calls_to_json, build_messages, NATIVE_SYSTEM_MESSAGE
+from function_calling.synthetic_data import generate_samples
+from function_calling.comparison import compare_modes, compare_templates, cheapest_template
+
+
+def _tool_call(name, arguments):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_convert_tool_calls_to_json():
+    """tool_calls convert to the same shape convert_output_to_json returns"""
+    single = SimpleNamespace(content=None, tool_calls=[_tool_call("f", '{"a": 1, "b": "x"}')])
+    assert convert_tool_calls_to_json(single) == {"function_name": "f", "arguments": {"a": 1, "b": "x"}}
+
+    several = SimpleNamespace(content=None, tool_calls=[_tool_call("f", '{"a": 1}'), _tool_call("g", "{}")])
+    assert convert_tool_calls_to_json(several) == [
+        {"function_name": "f", "arguments": {"a": 1}},
+        {"function_name": "g", "arguments": {}},
+    ]
+
+    assert "error" in convert_tool_calls_to_json(SimpleNamespace(content="no calls", tool_calls=None))
+    assert "error" in convert_tool_calls_to_json(SimpleNamespace(content=None, tool_calls=[_tool_call("f", '{"a": 1')]))
+
+
+def test_native_prompt_omits_tool_descriptions():
+    """Native mode leaves the tool list to the tools parameter"""
+    samples, _ = generate_samples("simple", 1)
+    tools = [{"type": "function", "function": function} for function in samples[0]["function"]]
+    assert build_messages("question", tools, mode="native")[0]["content"] == NATIVE_SYSTEM_MESSAGE
+    assert samples[0]["function"][0]["name"] in build_messages("question", tools)[0]["content"]
+
+
+def test_compare_modes_on_same_samples(make_suite):
+    """Both modes score the same samples and native mode sends fewer prompt tokens"""
+    suite = make_suite("multiple", 15, seed=5)
+    stub = suite.perfect_stub()
+
+    report = compare_modes(["multiple"], suite.data_dir, stub)
+    assert report["multiple"]["text"]["accuracy"] == report["multiple"]["native"]["accuracy"] == 1.0
+    assert report["multiple"]["native"]["delta"]["input_tokens"] < 0
+    assert report["multiple"]["text"]["delta"]["accuracy"] == 0
+
+
+def test_compare_templates_reports_savings(make_suite):
+    """Shorter templates save prompt tokens and cost, and the cheapest one holding accuracy is picked"""
+    suite = make_suite("parallel", 10, seed=6)
+    stub = suite.perfect_stub()
+
+    report = compare_templates(["parallel"], suite.data_dir, stub)
+    full, compact, minimal = (report["parallel"][name] for name in ("full", "compact", "minimal"))
+    assert full["input_tokens"] > compact["input_tokens"] > minimal["input_tokens"]
+    assert minimal["delta"]["input_tokens_per_sample"] < compact["delta"]["input_tokens_per_sample"] < 0
+    assert minimal["delta"]["cost"] < 0
+    assert cheapest_template(report) == "minimal"
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Offline tests for pass@k / consistency evaluation with n choices per request
+"""
+
+
+from function_calling.consistency import run_consistency_evaluation, canonical_output
+
+
+def test_canonical_output_ignores_call_order():
+    first = [{"function_name": "a", "arguments": {"x": 1, "y": 2}}, {"function_name": "b", "arguments": {}}]
+    second = [{"function_name": "b", "arguments": {}}, {"function_name": "a", "arguments": {"y": 2, "x": 1}}]
+    assert canonical_output(first) == canonical_output(second)
+
+
+def test_one_request_per_sample(make_suite):
+    """k choices come from one call, and greedy decoding agrees with itself"""
+    suite = make_suite("parallel", 20, seed=5)
+
+    stub = suite.stub(correct_ratio=0.6, near_miss_ratio=0.2, malformed_ratio=0.2)
+    report = run_consistency_evaluation(["parallel"], k=5, temperature=0.7, data_dir=suite.data_dir, api_client=stub, concurrency=4)
+    result = report["parallel"]
+    assert stub.call_count == 20
+    assert result["pass@k"] >= result["majority_accuracy"] >= 0
+    assert result["pass@k"] > result["pass@1"]
+    assert result["agreement_rate"] < 1.0
+
+    stub = suite.stub(correct_ratio=0.6, near_miss_ratio=0.2, malformed_ratio=0.2)
+    greedy = run_consistency_evaluation(["parallel"], k=5, temperature=0.0, data_dir=suite.data_dir, api_client=stub)["parallel"]
+    assert greedy["agreement_rate"] == 1.0
+    assert greedy["pass@1"] == greedy["pass@k"] == greedy["majority_accuracy"]
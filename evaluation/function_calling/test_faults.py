@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Offline tests for per-sample fault isolation, the retry queue and the dead-letter file
+"""
+
+import json
+
+from function_calling.adaptive import run_adaptive_evaluation
+from function_calling.consistency import run_consistency_evaluation
+from function_calling.multi_turn import run_multi_turn_evaluation
+
+
+def test_bad_samples_are_isolated_and_dead_lettered(make_suite, tmp_path):
+    suite = make_suite("simple", 10, seed=2)
+    samples = suite.samples
+    stub = suite.perfect_stub()
+    # A sample without an answer and a parameter without a description fail while preparing
+    suite.answers = [answer for answer in suite.answers if answer["id"] != samples[0]["id"]]
+    del samples[1]["function"][0]["description"]
+    suite.write()
+
+    flaky = {samples[2]["question"][0][0]["content"]: 1}
+    broken = samples[3]["question"][0][0]["content"]
+    create = stub.create
+
+    def unreliable_create(**kwargs):
+        question = kwargs["messages"][-1]["content"]
+        if flaky.get(question):
+            flaky[question] -= 1
+            raise ConnectionError("connection reset")
+        if question == broken:
+            raise ValueError("unexpected response shape")
+        return create(**kwargs)
+
+    stub.chat.completions.create = unreliable_create
+    dead_letter_path = str(tmp_path / "dead_letter.jsonl")
+    result = suite.run(stub, retry_backoff=0.01, dead_letter_path=dead_letter_path)
+
+    # The flaky sample succeeds on its retry; the three others are infra failures, not model errors
+    assert result["infra_failure_count"] == 3
+    assert result["total_count"] == 7
+    assert result["accuracy"] == 1.0
+    dead_letters = [json.loads(line) for line in open(dead_letter_path)]
+    assert sorted(entry["sample_id"] for entry in dead_letters) == sorted(sample["id"] for sample in samples[:2] + samples[3:4])
+    assert {entry["stage"] for entry in dead_letters} == {"prepare", "request"}
+    assert all("Traceback" in entry["traceback"] for entry in dead_letters)
+
+
+def test_transient_failures_are_retried_until_attempts_run_out(make_suite):
+    suite = make_suite("simple", 4, seed=2)
+    stub = suite.stub()
+    calls = []
+
+    def down(**kwargs):
+        calls.append(1)
+        raise ConnectionError("endpoint unreachable")
+
+    stub.chat.completions.create = down
+    result = suite.run(stub, max_attempts=3, retry_backoff=0.01)
+    assert len(calls) == 12
+    assert result["infra_failure_count"] == 4
+    assert result["total_count"] == 0
+
+
+def test_other_runners_are_isolated(make_suite):
+    """The adaptive, consistency and multi-turn runners retry transient errors and survive permanent ones"""
+    suite = make_suite("simple", 12, seed=3)
+    runners = {
+        "adaptive": lambda stub: run_adaptive_evaluation(["simple"], data_dir=suite.data_dir, api_client=stub, min_samples=100, retry_backoff=0.01),
+        "consistency": lambda stub: run_consistency_evaluation(["simple"], k=2, data_dir=suite.data_dir, api_client=stub, retry_backoff=0.01),
+        "multi_turn": lambda stub: run_multi_turn_evaluation(["simple"], data_dir=suite.data_dir, api_client=stub, retry_backoff=0.01)
+    }
+    for name, run in runners.items():
+        stub = suite.perfect_stub()
+        flaky = {suite.samples[0]["question"][0][0]["content"]: 1}
+        broken = suite.samples[1]["question"][0][0]["content"]
+        create = stub.create
+
+        def unreliable_create(**kwargs):
+            question = kwargs["messages"][-1]["content"]
+            if flaky.get(question):
+                flaky[question] -= 1
+                raise ConnectionError("connection reset")
+            if question == broken:
+                raise ValueError("unexpected response shape")
+            return create(**kwargs)
+
+        stub.chat.completions.create = unreliable_create
+        result = run(stub)["simple"]
+        assert result["infra_failure_count"] == 1, name
+        assert flaky[suite.samples[0]["question"][0][0]["content"]] == 0, name
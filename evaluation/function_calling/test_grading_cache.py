@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the memoized grading cache and re-scoring of stored runs
+"""
+
+
+import pytest
+
+from function_calling.grading_cache import GradingCache
+from function_calling.results_store import ResultsStore
+from function_calling.rescore import rescore_run
+from function_calling.run_eval import run_evaluations
+from function_calling.synthetic_data import generate_samples
+
+
+def test_repeated_runs_are_graded_from_the_cache(make_suite, tmp_path):
+    suite = make_suite("multiple", 30, seed=4)
+    cache_path = str(tmp_path / "grades.db")
+    store = ResultsStore(str(tmp_path / "results.db"))
+
+    cache = GradingCache(cache_path)
+    first = run_evaluations(["multiple"], data_dir=suite.data_dir, api_client=suite.stub(), grading_cache=cache, store=store, run_id="first")
+    assert cache.stats()["misses"] == 30
+    cache.close()
+
+    # A new process reads the grades back from disk
+    cache = GradingCache(cache_path)
+    second = run_evaluations(["multiple"], data_dir=suite.data_dir, api_client=suite.stub(), grading_cache=cache)
+    assert second["multiple"]["accuracy"] == first["multiple"]["accuracy"]
+    assert cache.stats()["hits"] == 30 and cache.stats()["misses"] == 0
+
+    rescored = rescore_run(store, "first", suite.data_dir, grading_cache=cache)["multiple"]
+    assert rescored["accuracy"] == first["multiple"]["accuracy"]
+    assert rescored["changed_count"] == 0
+    assert cache.stats()["hits"] == 60
+
+    # Native outputs are re-parsed as tool calls, whatever mode is assumed for older rows
+    native = run_evaluations(["multiple"], data_dir=suite.data_dir, api_client=suite.stub(), mode="native", store=store, run_id="native")
+    rescored = rescore_run(store, "native", suite.data_dir)["multiple"]
+    assert rescored["accuracy"] == native["multiple"]["accuracy"] and rescored["changed_count"] == 0
+    with pytest.raises(ValueError):
+        rescore_run(store, "native", suite.data_dir, mode="text")
+    store.close()
+
+
+def test_keys_change_with_answers_and_checker_version():
+    samples, answers = generate_samples("simple", 2, seed=1)
+    cache = GradingCache(max_entries=1)
+    key = cache.key("simple", samples[0], answers[0]["ground_truth"], "text", " f(x=1) ")
+    assert key == cache.key("simple", samples[0], answers[0]["ground_truth"], "text", "f(x=1)")
+    assert key != cache.key("simple", samples[0], answers[1]["ground_truth"], "text", "f(x=1)")
+    cache.put(key, (True, None, None))
+    cache.version = "edited-checker"
+    assert cache.key("simple", samples[0], answers[0]["ground_truth"], "text", "f(x=1)") != key
+
+    # The LRU keeps max_entries grades
+    cache.put("other", (False, "Value mismatch", "simple_function_call"))
+    assert cache.get(key) is None
+    assert cache.get("other") == (False, "Value mismatch", "simple_function_call")
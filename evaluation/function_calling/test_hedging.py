@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Offline tests for hedged requests
+"""
+
+import time
+import threading
+from types import SimpleNamespace
+
+from function_calling.hedging import HedgedClient, LatencyTracker
+from function_calling.fc_utils import build_request, convert_functions_to_tools
+
+
+def test_latency_tracker_waits_for_history():
+    tracker = LatencyTracker(percentile=50, min_samples=3)
+    tracker.record(1.0)
+    tracker.record(3.0)
+    assert tracker.hedge_delay() is None
+    tracker.record(2.0)
+    assert tracker.hedge_delay() == 2.0
+
+
+class SlowFirstAttempt:
+    """Answers through the stub, but the first attempt at each slow question stalls for half a second"""
+
+    def __init__(self, stub, slow_questions):
+        self.stub = stub
+        self.slow_questions = set(slow_questions)
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        question = kwargs["messages"][-1]["content"]
+        with self.lock:
+            slow = question in self.slow_questions
+            self.slow_questions.discard(question)
+        if slow:
+            time.sleep(0.5)
+        return self.stub.chat.completions.create(**kwargs)
+
+
+def test_hedging_races_the_stragglers(make_suite):
+    """Each straggler after the warm-up is raced and beaten by its duplicate, and the duplicates' tokens are reported"""
+    suite = make_suite("simple", 40, seed=3)
+    requests = [
+        build_request(sample["question"][0][0]["content"], convert_functions_to_tools(sample["function"]))
+        for sample in suite.samples
+    ]
+    # One straggler inside the warm-up, which is never hedged, and three after it
+    slow = [requests[i]["messages"][-1]["content"] for i in (5, 15, 25, 35)]
+    client = SlowFirstAttempt(suite.stub(), slow)
+    hedged = HedgedClient(client, percentile=80, min_samples=10, min_delay=0.05)
+    for request in requests:
+        hedged.chat.completions.create(**request, stream=False)
+    # The losing attempts finish in the background
+    time.sleep(0.6)
+
+    stats = hedged.stats()
+    assert stats["requests"] == 40
+    assert stats["hedged"] == 3 and stats["hedge_wins"] == 3
+    assert stats["extra_input_tokens"] > 0
+
+    plain = suite.run(concurrency=4)
+    report = suite.run(suite.stub(latency=0.01, straggler_ratio=0.2), concurrency=4, hedge_percentile=90)
+    assert report["accuracy"] == plain["accuracy"]
+    assert report["hedging"]["requests"] == 40
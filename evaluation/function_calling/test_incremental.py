@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Offline tests for content-hash incremental re-evaluation
+"""
+
+from function_calling.results_store import ResultsStore
+from function_calling.batch_mode import LocalBatchProcessor
+
+
+def test_only_changed_samples_are_sent_or_regraded(make_suite, tmp_path):
+    suite = make_suite("simple", 20, seed=9)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    stub = suite.perfect_stub()
+    base = suite.run(stub, store=store, run_id="base")
+    assert stub.call_count == 20 and base["accuracy"] == 1.0
+
+    # Nothing changed: every result comes from the base run, live or batch
+    stub = suite.perfect_stub()
+    same = suite.run(stub, store=store, run_id="same", incremental_base="base")
+    assert stub.call_count == 0
+    assert same["incremental"] == {"base_run_id": "base", "reuse": 20, "regrade": 0, "send": 0}
+    assert same["accuracy"] == 1.0 and same["token_usage"] == base["token_usage"]
+    batch = suite.run(LocalBatchProcessor(stub), batch=True, batch_dir=str(tmp_path / "batches"), batch_poll_interval=0,
+                      store=store, run_id="batch", incremental_base="base")
+    assert stub.call_count == 0 and batch["incremental"]["reuse"] == 20
+
+    # One edited question is sent again, one edited answer only re-graded
+    suite.samples[0]["question"][0][0]["content"] += " Thanks."
+    suite.answers[1]["ground_truth"] = suite.answers[2]["ground_truth"]
+    suite.write()
+    stub = suite.perfect_stub()
+    edited = suite.run(stub, store=store, run_id="edited", incremental_base="same")
+    assert stub.call_count == 1
+    assert edited["incremental"] == {"base_run_id": "same", "reuse": 18, "regrade": 1, "send": 1}
+    assert edited["error_count"] == 1
+
+    # The edited run is a complete run, fit to be the next base
+    assert store.run_summary("edited")[0]["total_count"] == 20
+    assert store.regressions("base", "edited")[0]["sample_id"] == suite.samples[1]["id"]
+    store.close()
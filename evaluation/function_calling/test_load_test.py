@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the open-loop load generator
+"""
+
+import random
+
+from function_calling.load_test import arrival_offsets, run_load_test
+
+
+def test_arrival_offsets():
+    assert arrival_offsets(4, 2.0, "constant") == [0.0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75]
+    poisson = arrival_offsets(50, 100.0, "poisson", random.Random(1))
+    assert abs(len(poisson) - 5000) < 300
+    assert all(0 <= offset < 100.0 for offset in poisson)
+
+
+def test_latency_counts_queueing_from_the_intended_send_time(make_suite):
+    suite = make_suite("simple", 20, seed=4)
+    stub = suite.stub(latency=0.05)
+
+    # Two client threads serve 40 requests/second: fine at 10/s, saturated at 100/s
+    light, overload = run_load_test([10, 100], step_duration=0.4, process="constant", test_categories=["simple"],
+                                    data_dir=suite.data_dir, api_client=stub, max_in_flight=2)
+    assert light["offered"] == 4 and overload["offered"] == 40
+    assert light["error_rate"] == overload["error_rate"] == 0
+    assert light["latency (seconds)"]["p99"] < 0.1
+    # Service time stays flat while the queueing shows up in the latency from the intended send time
+    assert overload["service_latency (seconds)"]["p99"] < 0.1
+    assert overload["latency (seconds)"]["p99"] > 0.3
+    assert overload["throughput (requests/second)"] < 50
+    assert 0 < overload["accuracy"] <= 1
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the live metrics endpoint and progress line
+"""
+
+import io
+import urllib.request
+
+from function_calling.metrics import EvalMetrics, MetricsServer, ProgressLine
+from function_calling.records import EvalRecord
+
+
+def test_run_updates_the_metrics(make_suite):
+    suite = make_suite("parallel", 30, seed=6)
+    # More workers than the stub admits: some attempts are throttled and retried
+    stub = suite.stub(latency=0.01, max_concurrency=3)
+    metrics = EvalMetrics()
+    stream = io.StringIO()
+    with MetricsServer(metrics, port=0) as server, ProgressLine(metrics, interval=0.01, stream=stream):
+        result = suite.run(stub, concurrency=8, retry_backoff=0, max_attempts=10, metrics=metrics)
+        with urllib.request.urlopen(server.url) as response:
+            text = response.read().decode("utf-8")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["in_flight"] == 0 and snapshot["eta"] == 0
+    assert snapshot["completed"] == {"parallel": 30}
+    assert snapshot["accuracy"]["parallel"] == result["accuracy"]
+    assert snapshot["input_tokens"] == result["token_usage"]["total_input_tokens"]
+    assert snapshot["throttled"] >= snapshot["retries"] > 0
+    assert f'fc_eval_samples_total{{category="parallel",outcome="correct"}} {30 - result["error_count"]}' in text
+    assert 'fc_eval_request_latency_seconds_count{category="parallel"} 30' in text
+    assert stream.getvalue().splitlines()[-1].startswith("parallel 30/30 acc")
+
+
+def test_histogram_and_failures():
+    metrics = EvalMetrics(buckets=(0.5, 1.0))
+    metrics.expect("simple", 4)
+    metrics.observe("simple", EvalRecord("a", True, time_taken=0.5, input_tokens=10, output_tokens=2))
+    metrics.observe("simple", EvalRecord("b", False, "Value mismatch", "simple_function_call", time_taken=2.0))
+    metrics.observe("simple", EvalRecord("c", False, "ConnectionError: reset", "infra_error"))
+    text = metrics.render()
+    # Buckets are cumulative and include their upper bound; infra failures are not timed
+    assert 'fc_eval_request_latency_seconds_bucket{category="simple",le="0.5"} 1' in text
+    assert 'fc_eval_request_latency_seconds_bucket{category="simple",le="1.0"} 1' in text
+    assert 'fc_eval_request_latency_seconds_bucket{category="simple",le="+Inf"} 2' in text
+    assert 'fc_eval_samples_total{category="simple",outcome="failed"} 1' in text
+    assert 'fc_eval_accuracy{category="simple"} 0.5' in text
+    assert metrics.snapshot()["eta"] is not None
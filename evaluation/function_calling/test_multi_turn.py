@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Offline tests for multi-turn evaluation with conversation-prefix reuse
+"""
+
+import json
+from types import SimpleNamespace
+
+from function_calling.multi_turn import run_multi_turn_evaluation, follow_up_messages
+from function_calling.synthetic_data import generate_samples
+from function_calling.prepared import prepare_category, output_budget
+from function_calling.scheduler import predict_job_cost
+
+
+def test_single_turn_generation_unchanged():
+    single, _ = generate_samples("multiple", 5, seed=3)
+    again, _ = generate_samples("multiple", 5, seed=3, num_turns=1)
+    assert single == again
+    samples, answers = generate_samples("multiple", 5, seed=3, num_turns=3)
+    assert all(len(sample["question"]) == 3 for sample in samples)
+    assert all(len(answer["ground_truth"]) == 3 for answer in answers)
+
+
+def test_turns_reuse_the_cached_prefix(make_suite):
+    suite = make_suite("multiple", 10, seed=8, num_turns=3)
+    for mode in ("text", "native"):
+        stub = suite.stub(correct_ratio=1.0)
+        result = run_multi_turn_evaluation(["multiple"], data_dir=suite.data_dir, api_client=stub, mode=mode, concurrency=4)["multiple"]
+
+        assert stub.call_count == 30
+        assert result["turn_accuracy"] >= result["conversation_accuracy"] > 0
+        first, second, third = result["per_turn"]
+        # Nothing is cached on the first turn; later turns only pay for the new messages
+        assert first["cached_input_tokens"] == 0
+        assert 0 < second["uncached_input_tokens"] < second["cached_input_tokens"]
+        assert third["cached_input_tokens"] > second["cached_input_tokens"]
+        assert 0 < result["cache_hit_ratio"] < 1
+
+
+def test_text_tool_results_echo_the_parsed_arguments():
+    assistant, results = follow_up_messages(SimpleNamespace(content="[f(x=1, y=abc), g()]", tool_calls=None), "text")
+    assert assistant == {"role": "assistant", "content": "[f(x=1, y=abc), g()]"}
+    echoed = json.loads(results["content"][len("Function results: "):])
+    assert [result["result"]["echo"] for result in echoed] == [{"x": 1, "y": "abc"}, {}]
+
+
+def test_output_budget_and_cost_cover_every_turn(make_suite):
+    """A multi-turn ground truth holds one entry per turn; the cap fits the longest turn and the cost adds up all turns"""
+    suite = make_suite("parallel", 5, seed=4, num_turns=3)
+    prepared = prepare_category("parallel", suite.data_dir, max_tokens_factor=3.0)
+    for sample in prepared:
+        assert sample.max_tokens == max(output_budget(answer, 3.0) for answer in sample.possible_answer)
+        first_turn = dict(sample.function_description, question=sample.function_description["question"][:1])
+        assert predict_job_cost(sample.function_description, sample.possible_answer) > predict_job_cost(first_turn, sample.possible_answer[0])
+    result = run_multi_turn_evaluation(["parallel"], data_dir=suite.data_dir, api_client=suite.perfect_stub())["parallel"]
+    assert result["turns"] == 15 and result["turn_accuracy"] == 1.0
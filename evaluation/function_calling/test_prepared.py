@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the per-category preflight compilation into prepared samples
+"""
+
+import dataclasses
+
+import pytest
+
+from function_calling.prepared import prepare_category, output_budget
+from function_calling.fc_utils import build_request, convert_functions_to_tools
+from function_calling.run_eval import run_prepared, eval_runner
+
+
+def test_prepared_samples_match_the_per_sample_path(make_suite):
+    """Prepared requests are the ones eval_runner builds, and scoring agrees"""
+    suite = make_suite("multiple", 15, seed=8)
+    samples, answers = suite.samples, suite.answers
+    samples[2]["function"][0]["parameters"]["properties"]["lambda"] = {"type": "string"}
+    suite.write()
+
+    prepared = prepare_category("multiple", suite.data_dir, mode="native")
+    assert [sample.id for sample in prepared] == [sample["id"] for sample in samples]
+    first = prepared[0]
+    assert first.request == build_request(first.prompt, convert_functions_to_tools(samples[0]["function"]), mode="native")
+    assert set(first.function_lookup) == {function["name"] for function in samples[0]["function"]}
+    assert prepared[2].schema_errors and not first.schema_errors
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.request = {}
+
+    stub = suite.stub(correct_ratio=0.5, near_miss_ratio=0.25, malformed_ratio=0.25)
+    for sample, raw_sample, answer in zip(prepared, samples, answers):
+        fresh = eval_runner("multiple", raw_sample, answer["ground_truth"], stub, mode="native")
+        assert run_prepared(sample, stub).to_dict()["ast_result"] == fresh["ast_result"]
+
+    # The invalid schema is reported, and its sample is still evaluated
+    result = suite.run(stub, mode="native")
+    assert result["schema_error_count"] == 1 and result["total_count"] == 15
+
+
+def test_output_budget_flags_truncations_separately(make_suite):
+    suite = make_suite("parallel", 40, seed=2)
+    ground_truth = suite.answers[0]["ground_truth"]
+    assert output_budget(ground_truth, 6.0) > output_budget(ground_truth, 3.0)
+
+    def run(max_tokens_factor):
+        stub = suite.stub(correct_ratio=0.7, near_miss_ratio=0.1, malformed_ratio=0.0, runaway_ratio=0.2)
+        return suite.run(stub, max_tokens_factor=max_tokens_factor)
+
+    unbounded = run(None)
+    capped = run(3.0)
+    # The budget only cuts the runaway completions, so no correct answer is lost
+    assert unbounded["truncated_count"] == 0
+    assert capped["accuracy"] == unbounded["accuracy"]
+    assert 0 < capped["truncated_count"] <= capped["error_count"]
+    assert capped["token_usage"]["total_output_tokens"] < unbounded["token_usage"]["total_output_tokens"]
+    assert capped["output_budget"]["estimated_output_tokens_saved"] > 0
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Offline tests for compact result records and columnar aggregates
+"""
+
+import statistics
+
+import numpy as np
+
+from function_calling.records import EvalRecord, ResultColumns
+from function_calling.run_eval import aggregate_results
+
+
+def test_record_is_slotted_and_converts_to_the_dict_shape():
+    record = EvalRecord("simple_0", False, "Value mismatch", "simple_function_call", 100, 20, 0.5, content="f(x=1)")
+    assert not hasattr(record, "__dict__")
+    assert record.to_dict()["ast_result"] == {"isValid": False, "error": "Value mismatch", "type": "simple_function_call"}
+    assert record.to_dict()["token_usage"] == {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120}
+
+
+def test_columnar_aggregate_matches_the_per_record_statistics():
+    rng = np.random.default_rng(1)
+    records = [
+        EvalRecord(f"s{i}", bool(rng.random() < 0.7), input_tokens=int(rng.integers(50, 900)), output_tokens=int(rng.integers(5, 90)),
+                   time_taken=float(rng.random()), coalesced=i % 5 == 0)
+        for i in range(500)
+    ]
+    totals = [record.total_tokens for record in records]
+    report = aggregate_results(records)
+    assert report["accuracy"] == sum(record.is_valid for record in records) / 500
+    assert report["token_usage"]["total_tokens"] == sum(totals)
+    assert abs(report["token_usage"]["std_token_usage"] - statistics.stdev(totals)) < 1e-9
+    assert report["token_usage"]["percentile_95_token_usage"] == float(np.percentile(totals, 95))
+    assert abs(report["average_time_taken_per_call (seconds)"] - statistics.mean(record.time_taken for record in records)) < 1e-12
+
+    coalescing = ResultColumns.from_records(records).coalescing()
+    assert coalescing == {"hits": 100, "tokens_saved": sum(record.total_tokens for record in records if record.coalesced)}
+    assert aggregate_results([])["accuracy"] == 0
+
+
+def test_truncation_savings_fit_leaves_out_infra_failures():
+    # Scored results decode at 0.01 s per output token; a timed-out request has no output and a long latency
+    records = [EvalRecord(f"s{i}", True, output_tokens=tokens, time_taken=0.1 + 0.01 * tokens) for i, tokens in enumerate((10, 20, 40))]
+    records.append(EvalRecord("t", False, "Output truncated", "truncated", output_tokens=96, time_taken=1.06, truncated=True))
+    records.append(EvalRecord("f", False, "TimeoutError: timed out", "infra_error", time_taken=60.0))
+    savings = ResultColumns.from_records(records).truncation_savings(unbounded_output_tokens=196)
+    assert savings["estimated_output_tokens_saved"] == 100
+    assert abs(savings["estimated_decode_time_saved (seconds)"] - 1.0) < 1e-9
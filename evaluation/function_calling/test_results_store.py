@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the SQLite results warehouse
+"""
+
+
+from function_calling.results_store import ResultsStore, new_run_id
+from function_calling.records import EvalRecord
+
+
+def test_runs_are_recorded_and_queried(make_suite, tmp_path):
+    """Aggregates match the run's report, and regressions compare two runs sample by sample"""
+    suite = make_suite("simple", 40, seed=21)
+    store = ResultsStore(str(tmp_path / "results.db"), batch_size=7)
+
+    perfect = suite.perfect_stub()
+    suite.run(perfect, concurrency=4, store=store, run_id="base")
+    noisy = suite.stub(correct_ratio=0.5, near_miss_ratio=0.25, malformed_ratio=0.25, latency=0.001)
+    report = suite.run(noisy, concurrency=4, store=store, run_id="new")
+    # Recording the same run again replaces its rows instead of double counting
+    suite.run(noisy, concurrency=4, store=store, run_id="new")
+
+    summary, = store.run_summary("new")
+    assert summary["total_count"] == 40
+    assert summary["accuracy"] == report["accuracy"]
+    assert summary["total_input_tokens"] == report["token_usage"]["total_input_tokens"]
+    assert store.run_summary("base")[0]["accuracy"] == 1.0
+
+    regressions = store.regressions("base", "new")
+    assert len(regressions) == summary["error_count"] > 0
+    assert all(regression["error_type"] and regression["content"] is not None for regression in regressions)
+    assert store.regressions("new", "base") == []
+
+    slowest = store.slowest("new", limit=3)
+    assert len(slowest) == 3
+    assert slowest[0]["latency"] >= slowest[1]["latency"] >= slowest[2]["latency"]
+    store.close()
+
+
+def test_runs_are_compared_sample_by_sample(make_suite, tmp_path):
+    """The paired comparison of a perfect run against a noisy one on the same ids finds the drop"""
+    suite = make_suite("simple", 60, seed=22)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    perfect = suite.perfect_stub()
+    suite.run(perfect, store=store, run_id="base")
+    noisy = suite.stub(correct_ratio=0.4, near_miss_ratio=0.3, malformed_ratio=0.3)
+    report = suite.run(noisy, store=store, run_id="new")
+
+    comparison, = store.compare("base", "new")
+    assert comparison["category"] == "simple" and comparison["paired_count"] == 60
+    assert comparison["accuracy_b"] == report["accuracy"]
+    assert comparison["mcnemar"]["only_a_correct"] == report["error_count"]
+    assert comparison["mcnemar"]["p_value"] < 0.01 and comparison["bootstrap"]["interval"][1] < 0
+    store.close()
+
+
+def test_models_of_a_run_are_kept_apart(tmp_path):
+    """Regressions and comparisons pair each model's samples only with the same model's"""
+    store = ResultsStore(str(tmp_path / "results.db"))
+    for run_id, valid in (("base", {"model-a": True, "model-b": False}), ("new", {"model-a": False, "model-b": True})):
+        for model, is_valid in valid.items():
+            for i in range(5):
+                store.record(run_id, model, "simple", f"simple_{i}", EvalRecord(f"simple_{i}", is_valid, None if is_valid else "Value mismatch", None if is_valid else "simple_function_call"))
+    store.flush()
+
+    regressions = store.regressions("base", "new")
+    assert len(regressions) == 5 and {regression["model"] for regression in regressions} == {"model-a"}
+    comparisons = store.compare("base", "new")
+    assert [(comparison["model"], comparison["paired_count"]) for comparison in comparisons] == [("model-a", 5), ("model-b", 5)]
+    assert comparisons[0]["mcnemar"]["only_a_correct"] == 5 and comparisons[1]["mcnemar"]["only_b_correct"] == 5
+    store.close()
+
+    # Runs started in the same second still get their own ids
+    assert len({new_run_id() for _ in range(100)}) == 100
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline tests for overlapped, fair scheduling of all categories in one worker pool
+"""
+
+import time
+
+from function_calling.scheduler import fair_order, run_jobs, order_jobs, predict_job_cost
+from function_calling.synthetic_data import generate_samples, write_dataset, StubClient, CATEGORIES
+from function_calling.run_eval import run_evaluation, fc_score
+
+
+def test_fair_order_interleaves_categories():
+    """Categories take turns until each runs out"""
+    order = fair_order({"simple": [1, 2, 3], "parallel": [4], "multiple": [5, 6]})
+    assert order == [("simple", 1), ("parallel", 4), ("multiple", 5), ("simple", 2), ("multiple", 6), ("simple", 3)]
+
+
+def test_run_jobs_keeps_order_and_reports_early():
+    """Results line up with the jobs and every result is reported once"""
+    seen = []
+    results = run_jobs(fair_order({"a": [1, 2], "b": [3]}), lambda category, job: job * 10, 2,
+                       lambda category, job, result: seen.append((category, result)))
+    assert results == [10, 30, 20]
+    assert sorted(seen) == [("a", 10), ("a", 20), ("b", 30)]
+
+
+def test_fc_score_overlaps_categories(tmp_path):
+    """One overlapped run gives the same per-category accuracies as separate runs"""
+    samples, answers = [], []
+    for category in CATEGORIES:
+        category_samples, category_answers = generate_samples(category, 12, seed=10)
+        write_dataset(str(tmp_path), category, category_samples, category_answers)
+        samples += category_samples
+        answers += category_answers
+
+    separate = {
+        category: run_evaluation(category, data_dir=str(tmp_path), api_client=StubClient(samples, answers))["accuracy"]
+        for category in CATEGORIES
+    }
+
+    stub = StubClient(samples, answers)
+    requested = []
+    create = stub.create
+    stub.chat.completions.create = lambda **kwargs: requested.append(kwargs["messages"][1]["content"]) or create(**kwargs)
+    average_score = fc_score(data_dir=str(tmp_path), api_client=stub, concurrency=1)
+
+    assert abs(average_score - sum(separate.values()) / 3) < 1e-12
+    # With one worker the requests follow the round-robin order across categories
+    first_round = [stub.by_question[question][0] for question in requested[:3]]
+    assert first_round == ["simple_synth_0", "parallel_synth_0", "multiple_synth_0"]
+
+
+def test_longest_first_order_and_cost():
+    """More ground-truth calls and longer tool lists predict a higher cost, and those jobs go first"""
+    samples, answers = generate_samples("parallel", 2, num_calls=2, seed=11)
+    long_samples, long_answers = generate_samples("parallel", 1, num_calls=5, num_functions=6, seed=11)
+    short_cost = predict_job_cost(samples[0], answers[0]["ground_truth"])
+    long_cost = predict_job_cost(long_samples[0], long_answers[0]["ground_truth"])
+    assert long_cost > short_cost
+
+    order = order_jobs({"a": [1, 5], "b": [3, 2]}, "longest_first", lambda category, job: job)
+    assert order == [("a", 5), ("b", 3), ("b", 2), ("a", 1)]
+
+
+def test_longest_first_cuts_makespan():
+    """Starting the slow jobs first avoids a long tail behind an idle pool"""
+    jobs = {"short": [0.02] * 6, "long": [0.12]}
+
+    def makespan(policy):
+        start = time.time()
+        run_jobs(order_jobs(jobs, policy, lambda category, job: job), lambda category, job: time.sleep(job), 2)
+        return time.time() - start
+
+    assert makespan("longest_first") < makespan("fifo") - 0.03
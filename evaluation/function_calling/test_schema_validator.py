@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the one-pass bulk schema validator
+"""
+
+import json
+
+from json_processing.schema_validator import validate_sample_files, validate_functions, schema_hash
+from json_processing.json_translator import validate_translated_function
+from json_processing.fixed_check_function_format import function_format_check
+from function_calling.synthetic_data import generate_samples
+
+
+def test_shared_schemas_are_validated_once(tmp_path):
+    """Duplicates across samples and files collapse to one check, invalid ones list every sample using them"""
+    samples, _ = generate_samples("multiple", 10, seed=4)
+    broken = json.loads(json.dumps(samples[0]["function"][0]))
+    broken["parameters"]["properties"]["class"] = {"type": "string"}
+    samples[3]["function"].append(broken)
+    samples[7]["function"].append(dict(reversed(list(broken.items()))))
+    first = tmp_path / "first_FC.json"
+    second = tmp_path / "second_FC.json"
+    first.write_text(json.dumps(samples))
+    second.write_text(json.dumps(samples[:5]))
+
+    report = validate_sample_files([str(first), str(second)])
+    all_functions = [function for sample in samples + samples[:5] for function in sample["function"]]
+    assert report["total_functions"] == len(all_functions)
+    assert report["unique_schemas"] == len({schema_hash(function) for function in all_functions})
+    assert not report["valid"]
+    invalid, = report["invalid_schemas"]
+    assert invalid["error"] == "property class is a reserved keyword"
+    assert [occurrence["sample_id"] for occurrence in invalid["occurrences"]] == [samples[3]["id"], samples[7]["id"], samples[3]["id"]]
+
+    assert validate_sample_files([str(first), str(second)], processes=2) == report
+
+
+def test_translator_uses_the_same_checks():
+    function = {"name": "f", "description": "d", "parameters": {"type": "dict", "properties": {"x": {"type": "date"}}, "required": []}}
+    assert validate_translated_function(function) == function_format_check(function) == (False, "property x must contain a valid type")
+    assert validate_functions([function, dict(function)]) == {schema_hash(function): function_format_check(function)}
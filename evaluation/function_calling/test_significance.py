@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the bootstrap intervals and paired run comparisons
+"""
+
+
+import numpy as np
+
+from function_calling.significance import accuracy_ci, macro_accuracy_ci, percentile_ci, paired_bootstrap, mcnemar, compare_runs
+
+
+def test_intervals_match_a_looped_bootstrap():
+    """The shortcut resamples agree with resampling the values themselves"""
+    rng = np.random.default_rng(5)
+    latencies = rng.exponential(size=80)
+    correct = rng.random(80) < 0.7
+    indices = rng.integers(0, 80, size=(20000, 80))
+    for percentile in (50, 95):
+        expected = np.percentile(np.percentile(latencies[indices], percentile, axis=1), [2.5, 97.5])
+        assert np.allclose(percentile_ci(latencies, percentile, resamples=20000), expected, rtol=0.05)
+    assert np.allclose(accuracy_ci(correct, resamples=20000), np.percentile(correct[indices].mean(axis=1), [2.5, 97.5]), atol=0.0126)
+
+    low, high = macro_accuracy_ci([40, 30], [50, 50])
+    assert low < 0.7 < high
+    assert accuracy_ci(np.ones(50, dtype=bool)) == (1.0, 1.0)
+    assert percentile_ci([], 95) == (0.0, 0.0)
+
+
+def test_paired_tests():
+    correct_a = np.array([True] * 40 + [False] * 10)
+    correct_b = correct_a.copy()
+    correct_b[:12] = False
+    bootstrap = paired_bootstrap(correct_a, correct_b)
+    assert bootstrap["difference"] == -12 / 50
+    assert bootstrap["interval"][1] < 0 and bootstrap["p_value"] < 0.01
+    # 12 discordant pairs all one way: p = 2 * 0.5 ** 12
+    assert mcnemar(correct_a, correct_b) == {"only_a_correct": 12, "only_b_correct": 0, "p_value": 2 * 0.5 ** 12}
+    assert mcnemar(correct_a, correct_a)["p_value"] == 1.0
+
+    # Runs are paired by id, whatever their order and extra samples
+    ids = [f"simple_{i}" for i in range(50)]
+    comparison = compare_runs(ids, correct_a, ids[::-1] + ["extra"], np.append(correct_b[::-1], True))
+    assert comparison["paired_count"] == 50
+    assert comparison["mcnemar"]["only_a_correct"] == 12
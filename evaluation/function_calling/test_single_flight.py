@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Offline tests for single-flight coalescing of identical in-flight requests
+"""
+
+import time
+import threading
+
+from function_calling.single_flight import SingleFlight
+from function_calling.synthetic_data import generate_samples, write_dataset, StubClient
+from function_calling.run_eval import run_evaluation
+
+
+def _run_together(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_single_flight_shares_one_call():
+    """Concurrent callers with the same key share a single call and its errors"""
+    single_flight = SingleFlight()
+    executions = []
+    results = []
+
+    def slow_call():
+        executions.append(1)
+        time.sleep(0.1)
+        return "response"
+
+    _run_together(8, lambda: results.append(single_flight.do("key", slow_call)))
+    assert len(executions) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert single_flight.stats() == {"calls": 1, "hits": 7}
+
+    errors = []
+
+    def failing_call():
+        time.sleep(0.1)
+        raise ConnectionError("boom")
+
+    def call_and_record():
+        try:
+            single_flight.do("other", failing_call)
+        except ConnectionError as e:
+            errors.append(e)
+
+    _run_together(4, call_and_record)
+    assert len(errors) == 4
+
+    # Nothing is cached once the call has returned
+    assert single_flight.do("key", lambda: "fresh") == ("fresh", False)
+
+
+def test_duplicate_samples_are_coalesced(tmp_path):
+    """Byte-identical samples evaluated concurrently cost one API call"""
+    samples, answers = generate_samples("simple", 5, seed=9)
+    duplicated_samples = []
+    duplicated_answers = []
+    for copy in range(4):
+        for sample, answer in zip(samples, answers):
+            duplicated_samples.append(dict(sample, id=f"{sample['id']}_copy{copy}"))
+            duplicated_answers.append(dict(answer, id=f"{answer['id']}_copy{copy}"))
+    write_dataset(str(tmp_path), "simple", duplicated_samples, duplicated_answers)
+
+    stub = StubClient(duplicated_samples, duplicated_answers, latency=0.2)
+    plain = run_evaluation("simple", data_dir=str(tmp_path), api_client=stub, concurrency=20)
+    assert stub.call_count == 20
+
+    stub = StubClient(duplicated_samples, duplicated_answers, latency=0.2)
+    coalesced = run_evaluation("simple", data_dir=str(tmp_path), api_client=stub, concurrency=20, coalesce=True)
+    assert stub.call_count == 5
+    assert coalesced["coalescing"]["hits"] == 15
+    assert coalesced["coalescing"]["tokens_saved"] > 0
+    assert coalesced["accuracy"] == plain["accuracy"]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the synthetic dataset generator and the stub model
+"""
+
+import os
+
+from function_calling.synthetic_data import generate_samples, StubClient, CATEGORIES
+from function_calling.run_eval import run_evaluation
+from json_processing.fixed_check_function_format import function_format_check
+
+
+def test_generated_functions_pass_format_check():
+    """Every generated function passes function_format_check and answers line up with samples"""
+    for category in CATEGORIES:
+        samples, answers = generate_samples(category, 30, num_functions=(2, 5), num_params=(1, 5), num_calls=(2, 4), seed=1)
+        assert len(samples) == len(answers) == 30
+        for sample, answer in zip(samples, answers):
+            assert set(sample) == {"id", "question", "function"}
+            assert set(answer) == {"id", "ground_truth"}
+            assert sample["id"] == answer["id"]
+            for function in sample["function"]:
+                is_valid, message = function_format_check(function)
+                assert is_valid, message
+
+
+def test_generation_is_deterministic():
+    """The same seed produces the same suite"""
+    assert generate_samples("multiple", 5, seed=3) == generate_samples("multiple", 5, seed=3)
+    assert generate_samples("multiple", 5, seed=3) != generate_samples("multiple", 5, seed=4)
+
+
+def test_stub_outcomes_score_as_expected(make_suite):
+    """Correct completions all pass, near-miss and malformed completions all fail"""
+    for category in CATEGORIES:
+        suite = make_suite(category, 20, seed=2)
+        assert suite.run(suite.perfect_stub())["accuracy"] == 1.0
+        near_miss = suite.stub(correct_ratio=0.0, near_miss_ratio=1.0, malformed_ratio=0.0)
+        assert suite.run(near_miss)["accuracy"] == 0.0
+        malformed = suite.stub(correct_ratio=0.0, near_miss_ratio=0.0, malformed_ratio=1.0)
+        assert suite.run(malformed)["accuracy"] == 0.0
+        assert malformed.call_count == 20
+
+
+def test_stub_on_bundled_suite():
+    """The stub answers the bundled samples from their ground truth; the misses are the bundled answers the checker rejects"""
+    data_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Errors per category are fixed by the bundled data, the stub itself is deterministic
+    expected = {"simple": (51, 5), "parallel": (50, 9), "multiple": (50, 8)}
+    for category, (total_count, error_count) in expected.items():
+        stub = StubClient.from_data_dir(data_dir, [category], correct_ratio=1.0, near_miss_ratio=0.0, malformed_ratio=0.0)
+        result = run_evaluation(category, data_dir=data_dir, api_client=stub)
+        assert (result["total_count"], result["error_count"]) == (total_count, error_count)
+        assert result["accuracy"] == (total_count - error_count) / total_count
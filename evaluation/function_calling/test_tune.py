@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the concurrency sweep auto-tuner
+"""
+
+
+from function_calling.tune import tune, find_knee, tuned_concurrency, profile_key
+
+
+def test_knee_stops_at_plateau_or_errors():
+    def level(concurrency, requests_per_second, error_rate=0.0):
+        return {"concurrency": concurrency, "requests_per_second": requests_per_second, "error_rate": error_rate}
+
+    assert find_knee([level(1, 10), level(2, 19), level(4, 20), level(8, 40)])["concurrency"] == 2
+    assert find_knee([level(1, 10), level(2, 19), level(4, 37, error_rate=0.2)])["concurrency"] == 2
+    assert find_knee([level(1, 10, error_rate=0.5)])["concurrency"] == 1
+
+
+def test_tune_finds_the_rate_limit_and_saves_the_profile(make_suite, tmp_path):
+    suite = make_suite("simple", 16, seed=6)
+    stub = suite.stub(latency=0.02, max_concurrency=6)
+    profiles_path = str(tmp_path / "profiles.json")
+
+    profile = tune([1, 2, 4, 8, 16], sample_size=16, test_categories=["simple"], data_dir=suite.data_dir, api_client=stub, profiles_path=profiles_path)
+    # Throughput doubles up to 4 in flight; at 8 the stub starts answering 429
+    assert profile["concurrency"] == 4
+    assert profile["sweep"][-1]["concurrency"] == 8
+    assert profile["sweep"][-1]["rate_limited_rate"] > 0
+    assert tuned_concurrency(stub, path=profiles_path) == 4
+    assert tuned_concurrency(stub, model="other-model", path=profiles_path) is None
+    assert profile_key(stub).startswith("StubClient|")
@@ -0,0 +1,200 @@
+import json
+import sys
+import os
+import time
+import argparse
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function_calling.fc_utils import CATEGORIES, MODEL_NAME, client, send_request, PROMPT_TEMPLATES
+from function_calling.prepared import prepare_category
+from function_calling.scheduler import fair_order, run_jobs
+from function_calling.backend_pool import load_backend_pool
+
+DEFAULT_PROFILES_PATH = "../results/concurrency_profiles.json"
+DEFAULT_LEVELS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def profile_key(api_client: Any = None, model: str = MODEL_NAME) -> str:
+    """
+    Profile name of an endpoint and model: "{base_url}|{model}"
+
+    A BackendPool is named after its backends, other clients without a base_url
+    (such as StubClient) after their class.
+    """
+    api_client = api_client or client
+    if hasattr(api_client, "backends"):
+        endpoint = "pool:" + ",".join(backend.name for backend in api_client.backends)
+    else:
+        endpoint = str(getattr(api_client, "base_url", type(api_client).__name__)).rstrip("/")
+    return f"{endpoint}|{model}"
+
+
+def load_profiles(path: str = DEFAULT_PROFILES_PATH) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_profile(key: str, profile: Dict[str, Any], path: str = DEFAULT_PROFILES_PATH):
+    profiles = load_profiles(path)
+    profiles[key] = profile
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def tuned_concurrency(api_client: Any = None, model: str = MODEL_NAME, path: str = DEFAULT_PROFILES_PATH) -> int:
+    """
+    The concurrency chosen by the last tune of this endpoint and model, None if it was never tuned
+    """
+    profile = load_profiles(path).get(profile_key(api_client, model))
+    return profile["concurrency"] if profile else None
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def measure_level(samples: List[Any], concurrency: int, api_client: Any = None) -> Dict[str, Any]:
+    """
+    Send every sample with concurrency requests in flight and measure the level
+
+    Returns:
+        Dictionary with requests/sec and tokens/sec of successful requests, p99 latency,
+        the share of requests rejected with HTTP 429 and the share of other errors
+    """
+    def send(category, sample):
+        start_time = time.time()
+        try:
+            response = send_request(sample.request, api_client)
+        except Exception as e:
+            return {"latency": time.time() - start_time, "tokens": 0, "error": "rate_limited" if is_rate_limited(e) else type(e).__name__}
+        return {"latency": time.time() - start_time, "tokens": response.usage.prompt_tokens + response.usage.completion_tokens, "error": None}
+
+    start_time = time.time()
+    outcomes = run_jobs([(sample.category, sample) for sample in samples], send, concurrency)
+    wall_time = time.time() - start_time
+    successes = [outcome for outcome in outcomes if outcome["error"] is None]
+    return {
+        "concurrency": concurrency,
+        "requests": len(outcomes),
+        "requests_per_second": len(successes) / wall_time if wall_time else 0,
+        "tokens_per_second": sum(outcome["tokens"] for outcome in successes) / wall_time if wall_time else 0,
+        "p99_latency (seconds)": float(np.percentile([outcome["latency"] for outcome in successes], 99)) if successes else None,
+        "rate_limited_rate": sum(1 for outcome in outcomes if outcome["error"] == "rate_limited") / len(outcomes),
+        "error_rate": sum(1 for outcome in outcomes if outcome["error"] is not None) / len(outcomes)
+    }
+
+
+def find_knee(measurements: List[Dict[str, Any]], min_gain: float = 0.1, max_error_rate: float = 0.01) -> Dict[str, Any]:
+    """
+    The level to run at: the last one before errors begin or throughput stops improving
+
+    A level is past the knee when more than max_error_rate of its requests fail or its
+    requests/sec is less than min_gain above the best level so far.
+    """
+    best = None
+    for measurement in measurements:
+        if measurement["error_rate"] > max_error_rate:
+            break
+        if best is not None and measurement["requests_per_second"] < best["requests_per_second"] * (1 + min_gain):
+            break
+        best = measurement
+    return best or measurements[0]
+
+
+def tune(
+        levels: List[int] = DEFAULT_LEVELS,
+        sample_size: int = 64,
+        test_categories: List[str] = CATEGORIES,
+        data_dir: str = "..",
+        api_client: Any = None,
+        mode: str = "text",
+        template: str = "full",
+        min_gain: float = 0.1,
+        max_error_rate: float = 0.01,
+        profiles_path: str = DEFAULT_PROFILES_PATH
+) -> Dict[str, Any]:
+    """
+    Sweep increasing concurrency levels on a short sample and remember the knee
+
+    Every level sends the same sample_size samples, drawn round-robin from the
+    categories and repeated when a level needs more requests than the sample has
+    (at least four per request slot). The sweep stops at the first level past the
+    knee (see find_knee), and the chosen level is saved as the profile of this
+    (base_url, model) so that later runs start at it.
+
+    Returns:
+        The saved profile: the chosen concurrency, its measurement and every level measured
+    """
+    samples = [sample for _, sample in fair_order({
+        category: prepare_category(category, data_dir, mode, template) for category in test_categories
+    })][:sample_size]
+    if not samples:
+        raise ValueError("No samples to send")
+
+    measurements = []
+    for concurrency in sorted(levels):
+        level_samples = [samples[i % len(samples)] for i in range(max(len(samples), 4 * concurrency))]
+        measurement = measure_level(level_samples, concurrency, api_client)
+        print(measurement)
+        measurements.append(measurement)
+        if measurement["error_rate"] > max_error_rate or find_knee(measurements, min_gain, max_error_rate) is not measurement:
+            break
+
+    chosen = find_knee(measurements, min_gain, max_error_rate)
+    profile = {
+        "concurrency": chosen["concurrency"],
+        "measurement": chosen,
+        "sweep": measurements,
+        "tuned_at": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    key = profile_key(api_client)
+    save_profile(key, profile, profiles_path)
+    print(f"Concurrency for {key}: {chosen['concurrency']} (saved to {profiles_path})")
+    return profile
+
+
+def main():
+    from function_calling.synthetic_data import StubClient
+
+    parser = argparse.ArgumentParser(description="Find the concurrency where throughput stops improving and save it per endpoint and model")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS), help="Concurrency levels to try, in increasing order")
+    parser.add_argument("--sample-size", type=int, default=64, help="Samples sent at each level")
+    parser.add_argument("--categories", nargs="+", default=list(CATEGORIES), choices=CATEGORIES)
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/ and FC-answers/")
+    parser.add_argument("--mode", default="text", choices=["text", "native"])
+    parser.add_argument("--template", default="full", choices=list(PROMPT_TEMPLATES))
+    parser.add_argument("--min-gain", type=float, default=0.1, help="Smallest throughput gain over the best level that still counts as improving")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error share (429s included) above which a level is past the knee")
+    parser.add_argument("--profiles", default=DEFAULT_PROFILES_PATH, help="JSON file of saved profiles")
+    parser.add_argument("--backends", default=None, help="JSON file of backends to spread requests over (BACKENDS in config.py by default)")
+    parser.add_argument("--stub", action="store_true", help="Answer from the ground truth with StubClient instead of the API")
+    args = parser.parse_args()
+
+    if args.stub:
+        api_client = StubClient.from_data_dir(args.data_dir, args.categories, latency=0.05, max_concurrency=12)
+    else:
+        api_client = load_backend_pool(args.backends)
+    tune(
+        args.levels,
+        sample_size=args.sample_size,
+        test_categories=args.categories,
+        data_dir=args.data_dir,
+        api_client=api_client,
+        mode=args.mode,
+        template=args.template,
+        min_gain=args.min_gain,
+        max_error_rate=args.max_error_rate,
+        profiles_path=args.profiles
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -25,13 +25,14 @@ def ast_checker(
         model_output,
         possible_answer,
         test_category,
+        function_lookup=None,
 ):
     if "simple" in test_category:
         return simple_ast_checker(function_description, model_output, possible_answer, test_category)
     elif "parallel" in test_category:
         return parallel_ast_checker(function_description, model_output, possible_answer )
     elif "multiple" in test_category:
-        return multiple_ast_checker(function_description, model_output, possible_answer)
+        return multiple_ast_checker(function_description, model_output, possible_answer, function_lookup)
     else:
         return {
             "isValid": False,
@@ -257,10 +258,14 @@ def multiple_ast_checker(
         function_description,
         model_output,
         possible_answer,
+        function_lookup=None,
 ):
     
     """
     Check multiple function calls where different functions are called
+
+    function_lookup optionally maps function names to their descriptions, so they
+    are not searched for every call and possible answer.
     """
     result = {
         "isValid": True,
@@ -292,7 +297,10 @@ def multiple_ast_checker(
                 continue
                 
             function_name = list(possible_call.keys())[0]
-            function_description_copy = find_function_description(function_description, function_name)
+            if function_lookup is not None:
+                function_description_copy = function_lookup.get(function_name)
+            else:
+                function_description_copy = find_function_description(function_description, function_name)
             
             # Check if function description was found
             if function_description_copy is None:
@@ -1,6 +1,11 @@
 import json
+import sys
+import os
 from keyword import kwlist
 
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 TYPE_MAP = {
     "int": int,
     "float": float,
@@ -100,65 +105,10 @@ def function_format_check(function_description: dict):
     return True, "function is correctly formatted"
 
 def main():
-    """Test the fixed validation function with the existing JSON files."""
-    
-    # Test with simple_FC.json
-    print("Testing simple_FC.json...")
-    try:
-        with open("simple_FC.json", "r") as f:
-            data = json.load(f)
-        
-        # Extract functions from the data structure
-        for item in data:
-            if "function" in item:
-                for func in item["function"]:
-                    is_valid, message = function_format_check(func)
-                    if is_valid:
-                        print(f"✓ Function '{func['name']}' is correctly formatted")
-                    else:
-                        print(f"✗ Function '{func['name']}': {message}")
-    except Exception as e:
-        print(f"Error reading simple_FC.json: {e}")
-    
-    print("\n" + "="*50 + "\n")
+    """Validate every sample file under ../FC-samples in one pass."""
+    from json_processing.schema_validator import validate_sample_files, sample_file_paths, print_report
     
-    # Test with multiple_FC.json
-    print("Testing multiple_FC.json...")
-    try:
-        with open("multiple_FC.json", "r") as f:
-            data = json.load(f)
-        
-        # Extract functions from the data structure
-        for item in data:
-            if "function" in item:
-                for func in item["function"]:
-                    is_valid, message = function_format_check(func)
-                    if is_valid:
-                        print(f"✓ Function '{func['name']}' is correctly formatted")
-                    else:
-                        print(f"✗ Function '{func['name']}': {message}")
-    except Exception as e:
-        print(f"Error reading multiple_FC.json: {e}")
-    
-    print("\n" + "="*50 + "\n")
-    
-    # Test with parallel_FC.json
-    print("Testing parallel_FC.json...")
-    try:
-        with open("parallel_FC.json", "r") as f:
-            data = json.load(f)
-        
-        # Extract functions from the data structure
-        for item in data:
-            if "function" in item:
-                for func in item["function"]:
-                    is_valid, message = function_format_check(func)
-                    if is_valid:
-                        print(f"✓ Function '{func['name']}' is correctly formatted")
-                    else:
-                        print(f"✗ Function '{func['name']}': {message}")
-    except Exception as e:
-        print(f"Error reading parallel_FC.json: {e}")
+    print_report(validate_sample_files(sample_file_paths("..")))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
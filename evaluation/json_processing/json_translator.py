@@ -1,30 +1,14 @@
 import json
+import sys
+import os
 from keyword import kwlist
-from typing import Dict, Any, List, Tuple, Union
+from typing import Dict, Any, List, Tuple
 
-# Updated TYPE_MAP to match the validation expectations
-TYPE_MAP = {
-    "int": dict,
-    "float": dict,
-    "str": dict,
-    "bool": dict,
-    "list": dict,
-    "dict": dict,
-    "tuple": dict,
-    "boolean": dict,
-    "Boolean": dict,
-    "Number": dict,
-    "number": dict,
-    "string": dict,
-    "String": dict,
-    "array": dict,
-    "Array": dict,
-    "object": dict,
-    "Object": dict,
-    "null": dict,
-    "integer": dict,
-    "any": dict,
-}
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_processing.fixed_check_function_format import function_format_check
+from json_processing.schema_validator import validate_functions, schema_hash
 
 AVAILABLE_TYPES = {
     "boolean",
@@ -197,58 +181,7 @@ def validate_translated_function(function_desc: Dict[str, Any]) -> Tuple[bool, s
     """
     Validate a translated function using the original validation logic (with fixes).
     """
-    if type(function_desc) != dict:
-        return False, "function description must be a dictionary"
-    
-    if "name" not in function_desc:
-        return False, "function description must contain a name"
-    
-    if "description" not in function_desc:
-        return False, "function description must contain a description"
-    
-    if "parameters" not in function_desc:
-        return False, "function description must contain at least one parameter"
-    
-    if len(function_desc) != 3:
-        return False, "function description must contain exactly three fields: name, description, and parameters"
-    
-    parameters = function_desc["parameters"]
-    if type(parameters) != dict:
-        return False, "parameters must be a dictionary"
-    
-    if "type" not in parameters:
-        return False, "parameters must contain a type field"
-    
-    if "required" not in parameters:
-        return False, "parameters must contain a required field"
-    
-    if type(parameters["required"]) != list:
-        return False, "required field must be a list"
-    
-    if "properties" not in parameters:
-        return False, "parameters must contain a properties field"
-    
-    if len(parameters) != 3:
-        return False, "parameters must contain exactly three fields: type, required, and properties"
-    
-    properties = parameters["properties"]
-    if type(properties) != dict:
-        return False, "properties must be a dictionary"
-    
-    for key, value in properties.items():
-        if key in kwlist:
-            return False, f"property {key} is a reserved keyword"
-        
-        if type(value) != dict:
-            return False, f"property {key} must be a dictionary"
-        
-        if "type" not in value:
-            return False, f"property {key} must contain a type field"
-        
-        if value["type"] not in AVAILABLE_TYPES:
-            return False, f"property {key} must contain a valid type"
-    
-    return True, "function is correctly formatted"
+    return function_format_check(function_desc)
 
 def main():
     """Example usage of the translator."""
@@ -259,10 +192,11 @@ def main():
         translated = translate_batch("simple_FC.json")
         print(f"Successfully translated {len(translated)} functions")
         
-        # Validate the translated functions
+        # Validate the translated functions, each distinct schema once
+        checks = validate_functions(translated)
         valid_count = 0
         for func in translated:
-            is_valid, message = validate_translated_function(func)
+            is_valid, message = checks[schema_hash(func)]
             if is_valid:
                 valid_count += 1
             else:
@@ -278,10 +212,11 @@ def main():
         translated = translate_batch("multiple_FC.json")
         print(f"Successfully translated {len(translated)} functions")
         
-        # Validate the translated functions
+        # Validate the translated functions, each distinct schema once
+        checks = validate_functions(translated)
         valid_count = 0
         for func in translated:
-            is_valid, message = validate_translated_function(func)
+            is_valid, message = checks[schema_hash(func)]
             if is_valid:
                 valid_count += 1
             else:
@@ -15,7 +15,8 @@ def parse_output(output:dict):
 
 def parse_query_response_FC(api_response: any) -> dict:
     return {
-        "model_responses": api_response,
         "input_token": api_response.usage.prompt_tokens,      # ← API provides this
         "output_token": api_response.usage.completion_tokens, # ← API provides this
+        # Prompt tokens served from the provider's prefix cache, when it reports them
+        "cached_input_token": getattr(getattr(api_response.usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0,
     }
@@ -0,0 +1,133 @@
+import sys
+import os
+import json
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+# Add parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_processing.fixed_check_function_format import function_format_check
+
+
+def schema_hash(function_description: Any) -> str:
+    """
+    Content hash of a function schema; equal schemas hash equal regardless of key order
+    """
+    body = json.dumps(function_description, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def validate_functions(function_descriptions: List[Any], processes: int = 1) -> Dict[str, Tuple[bool, str]]:
+    """
+    Validate each distinct schema once
+
+    Args:
+        function_descriptions: Function schemas, duplicates allowed
+        processes: Worker processes for the unique schemas (1 validates in this process)
+
+    Returns:
+        Schema hash -> (is_valid, message) from function_format_check
+    """
+    unique = {}
+    for function_description in function_descriptions:
+        unique.setdefault(schema_hash(function_description), function_description)
+    hashes = list(unique)
+    if processes > 1 and len(hashes) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            checks = list(executor.map(function_format_check, unique.values(), chunksize=max(1, len(hashes) // (4 * processes))))
+    else:
+        checks = [function_format_check(function_description) for function_description in unique.values()]
+    return dict(zip(hashes, checks))
+
+
+def validate_sample_files(paths: List[str], processes: int = 1) -> Dict[str, Any]:
+    """
+    Validate every function schema of one or more sample files in one pass
+
+    Each file is read once, schemas shared by several samples or files are
+    validated once, and every invalid schema lists the samples that use it.
+
+    Args:
+        paths: FC-samples files ({"id", "question", "function"} entries)
+        processes: Worker processes for validating the unique schemas
+
+    Returns:
+        Report with per-file counts, the number of unique schemas and the invalid ones
+    """
+    files = {}
+    occurrences = {}
+    schemas = {}
+    for path in paths:
+        with open(path, "r") as f:
+            samples = json.load(f)
+        function_count = 0
+        for sample in samples:
+            for function_description in sample.get("function", []):
+                key = schema_hash(function_description)
+                schemas.setdefault(key, function_description)
+                occurrences.setdefault(key, []).append({"file": path, "sample_id": sample.get("id")})
+                function_count += 1
+        files[path] = {"samples": len(samples), "functions": function_count}
+
+    checks = validate_functions(list(schemas.values()), processes)
+    invalid_schemas = [
+        {
+            "hash": key,
+            "name": schemas[key].get("name") if isinstance(schemas[key], dict) else None,
+            "error": message,
+            "occurrences": occurrences[key]
+        }
+        for key, (is_valid, message) in checks.items()
+        if not is_valid
+    ]
+    return {
+        "valid": not invalid_schemas,
+        "files": files,
+        "total_functions": sum(counts["functions"] for counts in files.values()),
+        "unique_schemas": len(schemas),
+        "invalid_schemas": invalid_schemas
+    }
+
+
+def sample_file_paths(data_dir: str = ".", categories: List[str] = None) -> List[str]:
+    """
+    Sample files of the given categories under data_dir/FC-samples, or all of them
+    """
+    if categories:
+        return [os.path.join(data_dir, "FC-samples", f"{category}_FC.json") for category in categories]
+    return sorted(glob.glob(os.path.join(data_dir, "FC-samples", "*_FC.json")))
+
+
+def print_report(report: Dict[str, Any]):
+    for path, counts in report["files"].items():
+        print(f"{path}: {counts['samples']} samples, {counts['functions']} functions")
+    print(f"{report['unique_schemas']} unique schemas out of {report['total_functions']} functions")
+    for schema in report["invalid_schemas"]:
+        sample_ids = ", ".join(str(occurrence["sample_id"]) for occurrence in schema["occurrences"])
+        print(f"✗ Function '{schema['name']}': {schema['error']} (samples: {sample_ids})")
+    if report["valid"]:
+        print("✓ All functions are correctly formatted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate every function schema of the sample files in one pass")
+    parser.add_argument("paths", nargs="*", help="Sample files, every FC-samples/*_FC.json under --data-dir by default")
+    parser.add_argument("--data-dir", default="..", help="Directory holding FC-samples/")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = validate_sample_files(args.paths or sample_file_paths(args.data_dir), args.processes)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    sys.exit(0 if report["valid"] else 1)
+
+
+if __name__ == "__main__":
+    main()